@@ -0,0 +1,192 @@
+"""
+Measures the import time of snap_simp.py with python -X importtime and asserts that printing help stays within
+a startup budget without importing BeautifulSoup or any parsing or analysis module. A parse of a synthetic export
+whose files are all cached is then timed and asserted to never import BeautifulSoup. Every failed check is
+printed and the script exits with status 1, so it can gate a CI job.
+
+Run from the snapsimp directory: python -m benchmarks.cli_startup [--budget-ms 100] [--rows 100000]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.parser_backends import MY_NAME, write_export
+
+DEFAULT_BUDGET_MS = 100
+DEFAULT_ROWS = 100_000
+HEAVY_MODULES = (
+    "bs4",
+    "soup.account_parsing",
+    "soup.snap_history_parsing",
+    "soup.chat_history_parsing",
+    "chats.conversation_generator",
+    "snaps.statistics",
+)
+COMMANDS = (
+    "--help",
+    "parse --help",
+    "conversations --help",
+    "stats --help",
+    "export --help",
+)
+
+
+def write_account(directory: str) -> None:
+    """
+    Writes a synthetic account.html file for MY_NAME with a single device and login.
+    """
+    with open(os.path.join(directory, "account.html"), "w") as f:
+        f.write(
+            "<html><body><h3>Basic Information</h3><table>"
+            f"<tr><th><b>Username</b></th><th> {MY_NAME} </th></tr>"
+            "<tr><th><b>Name</b></th><th>Me</th></tr>"
+            "<tr><th><b>Creation Date</b></th><th>2016-05-01 10:00:00 UTC</th></tr></table>"
+            "<h3>Device Information</h3><table>"
+            + "".join(
+                f"<tr><th><b>{label}</b></th><th>{value}</th></tr>"
+                for label, value in (
+                    ("Make", "Apple"),
+                    ("Model ID", "iPhone14,2"),
+                    ("Model Name", "iPhone 13 Pro"),
+                    ("User Agent", "Snapchat/12"),
+                    ("Language", "en"),
+                    ("OS Type", "iOS"),
+                    ("OS Version", "16.5"),
+                    ("Connection Type", "WIFI, CELL"),
+                )
+            )
+            + "</table><h3>Device History</h3><table><tr><td><b>Make:</b> Apple<br><b>Model:</b> iPhone0<br>"
+            "<b>Start Time:</b> 2021-02-24 05:55:12 UTC<br><b>Device Type:</b> PHONE</td></tr></table>"
+            "<h3>Login History</h3><table><tr><td><b>IP:</b> 10.0.0.0<br><b>Country:</b> US<br>"
+            "<b>Created:</b> 2022-09-13 13:35:49 UTC<br><b>Status:</b> success<br><b>Device:</b> iPhone</td></tr>"
+            "</table></body></html>"
+        )
+
+
+def get_parse_command(directory: str) -> str:
+    """
+    :return: the arguments parsing the synthetic export of the directory through a cache inside it
+    """
+    return (
+        f"parse -af {os.path.join(directory, 'account.html')} "
+        f"-shf {os.path.join(directory, 'snap_history.html')} "
+        f"-chf {os.path.join(directory, 'chat_history.html')} "
+        f"-cd {os.path.join(directory, 'cache')}"
+    )
+
+
+def run_snap_simp(command: str, *options: str) -> subprocess.CompletedProcess:
+    """
+    Runs snap_simp.py with the provided interpreter options, failing if it exits with an error.
+
+    :param command: the arguments passed to snap_simp.py
+    :param options: the options passed to the interpreter such as -X importtime
+    :return: the completed process with its captured output
+    """
+    return subprocess.run(
+        [sys.executable, *options, "snap_simp.py", *command.split()],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def measure_imports(command: str):
+    """
+    Runs snap_simp.py with python -X importtime and returns the cumulative import time of each top level import.
+
+    :param command: the arguments passed to snap_simp.py
+    :return: a dictionary of module name, indented by its nesting depth, to cumulative microseconds
+    """
+    completed = run_snap_simp(command, "-X", "importtime")
+
+    cumulative_microseconds = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line[len("import time:") :].split("|")
+        cumulative_microseconds[name[1:].rstrip()] = int(cumulative)
+
+    return cumulative_microseconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--budget-ms",
+        help="The most milliseconds the imports of snap_simp.py may take",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+    )
+    parser.add_argument(
+        "--rows",
+        help="The number of rows of the synthetic export parsed from the cache",
+        type=int,
+        default=DEFAULT_ROWS,
+    )
+    args = parser.parse_args()
+
+    failures = []
+    for command in COMMANDS:
+        imports = measure_imports(command)
+        imported_modules = {name.strip() for name in imports}
+        heavy_imports = [
+            module for module in HEAVY_MODULES if module in imported_modules
+        ]
+        if heavy_imports:
+            failures.append(
+                f"snap_simp.py {command} imported {', '.join(heavy_imports)}"
+            )
+
+        # Top level imports are those without leading indentation in the module name column.
+        # Nested imports are already counted in the cumulative time of their top level import.
+        total_ms = (
+            sum(
+                microseconds
+                for name, microseconds in imports.items()
+                if name == name.lstrip()
+            )
+            / 1000
+        )
+        print(f"snap_simp.py {command:<22} {total_ms:8.1f}ms of imports")
+        if total_ms > args.budget_ms:
+            failures.append(
+                f"snap_simp.py {command} spent {total_ms:.1f}ms importing, over the {args.budget_ms}ms budget"
+            )
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_export(directory, args.rows)
+        write_account(directory)
+        command = get_parse_command(directory)
+
+        start_time = time.perf_counter()
+        run_snap_simp(command)
+        print(
+            f"snap_simp.py parse, cold cache {time.perf_counter() - start_time:8.2f}s"
+        )
+
+        start_time = time.perf_counter()
+        run_snap_simp(command)
+        print(
+            f"snap_simp.py parse, warm cache {time.perf_counter() - start_time:8.2f}s"
+        )
+
+        imported_modules = {name.strip() for name in measure_imports(command)}
+        if "bs4" in imported_modules:
+            failures.append(
+                "snap_simp.py parse imported bs4 although every export file was cached"
+            )
+
+    if failures:
+        for failure in failures:
+            print(f"FAILED {failure}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
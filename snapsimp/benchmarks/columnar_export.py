@@ -0,0 +1,210 @@
+"""
+Times writing the parsed events of a synthetic export with each available columnar backend and asserts every
+file reads back to the events it was written from. When pyarrow is importable the Arrow IPC files are written and
+checked too, including that dictionary encoded columns keep their unsigned code types. Packed files must also
+close while a string column is only partly read.
+
+Run from the snapsimp directory: python -m benchmarks.columnar_export [--rows 200000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.parser_backends import MY_NAME, write_export
+from common.columnar_backend import ColumnarBackend, is_pyarrow_available
+from common.columnar_export import (
+    UINT8,
+    UINT32,
+    PackedColumnarFile,
+    create_chats_table,
+    create_logins_table,
+    create_snaps_table,
+    write_columnar_export,
+)
+from common.login_history import LoginHistory
+from common.time_helpers import parse_snapchat_timestamp
+from soup.chat_history_parsing import extract_chat_history
+from soup.parser_backend import ParserBackend
+from soup.snap_history_parsing import extract_snap_history
+
+DEFAULT_ROWS = 200_000
+NUM_LOGINS = 1_000
+# A string column of each table that has one, read partway before closing its packed file
+STRING_COLUMNS = {"chats": "text", "logins": "ip"}
+
+
+def create_login_history(count: int):
+    return [
+        LoginHistory(
+            f"10.0.{index % 256}.{index // 256}",
+            random.choice(("US", "CA", None)),
+            random.choice(("2022-09-13 13:35:49 UTC", "not a timestamp", None)),
+            random.choice(("success", "failure")),
+            "iPhone",
+        )
+        for index in range(count)
+    ]
+
+
+def get_expected_columns(events, texts: bool):
+    """
+    :return: a dictionary of column name to the values the columnar files should read back as
+    """
+    columns = {
+        "sender": [event.sender for event in events],
+        "receiver": [event.receiver for event in events],
+        "type": [event.type.value for event in events],
+        "timestamp": [event.timestamp for event in events],
+    }
+    if texts:
+        columns["text"] = [event.text for event in events]
+
+    return columns
+
+
+def get_expected_login_columns(login_history):
+    """
+    :return: a dictionary of column name to the values the logins files should read back as
+    """
+    created = []
+    for login in login_history:
+        try:
+            created.append(parse_snapchat_timestamp(login.created))
+        except (TypeError, ValueError):
+            created.append(None)
+
+    columns = {"ip": [str(login.ip) for login in login_history], "created": created}
+    for name in ("country", "status", "device"):
+        columns[name] = [getattr(login, name) for login in login_history]
+
+    return columns
+
+
+def read_packed_columns(file_path: str):
+    packed_file = PackedColumnarFile(file_path)
+    try:
+        return {name: packed_file.get_values(name) for name in packed_file.column_names}
+    finally:
+        packed_file.close()
+
+
+def check_partial_string_iteration(file_path: str, name: str) -> None:
+    """
+    Asserts a packed file can be closed while one of its string columns is only partly read.
+    """
+    packed_file = PackedColumnarFile(file_path)
+    strings = packed_file.iter_strings(name)
+    next(strings, None)
+    packed_file.close()
+    strings.close()
+
+
+def check_arrow_file(file_path: str, table, expected_columns) -> None:
+    """
+    Asserts an Arrow IPC file holds the expected columns and that each dictionary encoded column's codes use the
+    Arrow integer type matching the table's column type.
+    """
+    import pyarrow as pa
+
+    code_types = {UINT8: pa.uint8(), UINT32: pa.uint32()}
+
+    with pa.memory_map(file_path) as source:
+        arrow_table = pa.ipc.open_file(source).read_all()
+
+    for name, column_type, _, dictionary in table.columns:
+        arrow_type = arrow_table.schema.field(name).type
+        if dictionary is not None and arrow_type.index_type != code_types[column_type]:
+            raise AssertionError(
+                f"{file_path} column {name} has {arrow_type.index_type} codes, expected {code_types[column_type]}"
+            )
+
+    if arrow_table.to_pydict() != expected_columns:
+        raise AssertionError(f"{file_path} does not hold the written events")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rows",
+        help="The number of rows of the synthetic snap and chat histories",
+        type=int,
+        default=DEFAULT_ROWS,
+    )
+    args = parser.parse_args()
+
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as directory:
+        write_export(directory, args.rows)
+        snaps = [
+            snap
+            for snaps in extract_snap_history(
+                os.path.join(directory, "snap_history.html"),
+                MY_NAME,
+                backend=ParserBackend.MAPPED,
+            )
+            for snap in snaps
+        ]
+        chats = [
+            chat
+            for chats in extract_chat_history(
+                os.path.join(directory, "chat_history.html"),
+                MY_NAME,
+                backend=ParserBackend.MAPPED,
+            )
+            for chat in chats
+        ]
+        login_history = create_login_history(NUM_LOGINS)
+
+        tables = {
+            "snaps": (
+                create_snaps_table(snaps, MY_NAME),
+                get_expected_columns(snaps, texts=False),
+            ),
+            "chats": (
+                create_chats_table(chats, MY_NAME),
+                get_expected_columns(chats, texts=True),
+            ),
+        }
+        tables["logins"] = (
+            create_logins_table(login_history, MY_NAME),
+            get_expected_login_columns(login_history),
+        )
+
+        backends = [ColumnarBackend.PACKED]
+        if is_pyarrow_available():
+            backends.append(ColumnarBackend.ARROW)
+        else:
+            print("pyarrow is not installed, only the packed backend is checked")
+
+        for backend in backends:
+            output_folder = os.path.join(directory, backend.value)
+
+            start_time = time.perf_counter()
+            file_paths = write_columnar_export(
+                output_folder, MY_NAME, snaps, chats, login_history, backend
+            )
+            elapsed = time.perf_counter() - start_time
+            num_bytes = sum(os.path.getsize(file_path) for file_path in file_paths)
+            print(
+                f"write {backend.value:<8} {elapsed:8.2f}s {num_bytes / 1024 / 1024:8.1f}MiB"
+            )
+
+            for file_path in file_paths:
+                name = os.path.basename(file_path).split(".")[0]
+                table, expected_columns = tables[name]
+
+                if backend == ColumnarBackend.ARROW:
+                    check_arrow_file(file_path, table, expected_columns)
+                elif read_packed_columns(file_path) != expected_columns:
+                    raise AssertionError(
+                        f"{file_path} does not hold the written events"
+                    )
+                elif name in STRING_COLUMNS:
+                    check_partial_string_iteration(file_path, STRING_COLUMNS[name])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Compares rebuilding chat conversations by parsing a synthetic chat history HTML file, with the fastest parser
+backend, against loading the conversations saved from it in each conversation file format, and asserts the
+loaded conversations are identical.
+
+Run from the snapsimp directory: python -m benchmarks.conversation_loading [--rows 200000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.parser_backends import MY_NAME, write_export
+from chats.conversation_file_format import ConversationFileFormat
+from chats.conversation_generator import (
+    generate_and_save_all_conversations,
+    generate_conversations,
+)
+from common.conversation_loader import load_all_conversations
+from soup.chat_history_parsing import extract_chat_history
+from soup.parser_backend import ParserBackend
+
+DEFAULT_ROWS = 200_000
+
+
+def to_comparable(conversations):
+    return sorted(
+        (
+            sorted(conversation.users),
+            [
+                (chat.sender, chat.receiver, chat.type, chat.text, chat.timestamp)
+                for chat in conversation.chats
+            ],
+        )
+        for conversation in conversations
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rows",
+        help="The number of rows of the synthetic chat history",
+        type=int,
+        default=DEFAULT_ROWS,
+    )
+    args = parser.parse_args()
+
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as directory:
+        write_export(directory, args.rows)
+
+        start_time = time.perf_counter()
+        received_chats, sent_chats = extract_chat_history(
+            os.path.join(directory, "chat_history.html"),
+            MY_NAME,
+            backend=ParserBackend.MAPPED,
+        )
+        expected = to_comparable(
+            generate_conversations(MY_NAME, sent_chats, received_chats)
+        )
+        print(
+            f"{'parse html and generate':<34} {time.perf_counter() - start_time:8.2f}s"
+        )
+
+        for file_format in ConversationFileFormat:
+            save_folder_path = os.path.join(directory, file_format.name.lower())
+            generate_and_save_all_conversations(
+                MY_NAME,
+                sent_chats,
+                received_chats,
+                save_folder_path,
+                max_workers=1,
+                file_format=file_format,
+            )
+
+            for max_workers in (1, None):
+                start_time = time.perf_counter()
+                conversations = load_all_conversations(save_folder_path, max_workers)
+                elapsed = time.perf_counter() - start_time
+
+                label = f"load {file_format.value} {'serially' if max_workers == 1 else 'in a pool'}"
+                print(f"{label:<34} {elapsed:8.2f}s")
+
+                if to_comparable(conversations.values()) != expected:
+                    raise AssertionError(
+                        f"Loading {file_format.value} conversations did not reproduce the parsed conversations"
+                    )
+
+
+if __name__ == "__main__":
+    main()
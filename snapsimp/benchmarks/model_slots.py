@@ -0,0 +1,121 @@
+"""
+Measures the memory and throughput of the slotted Snap model against the previous property based model
+for filtering.get_by_sending_user and statistics.order_by_time_in_ascending_order.
+
+Run from the snapsimp directory: python -m benchmarks.model_slots
+"""
+
+import random
+import timeit
+import sys
+from datetime import datetime, timedelta
+
+import snaps.filtering as filtering
+import snaps.statistics as statistics
+from snaps.snap import Snap
+from snaps.snap_type import SnapType
+
+NUM_SNAPS = 1_000_000
+USERNAMES = [f"friend{i}" for i in range(200)]
+
+
+class PropertySnap:
+    """
+    The previous Snap model, a per instance dictionary with each field wrapped in a forwarding property.
+    """
+
+    def __init__(self, sender, receiver, type, timestamp):
+        self.sender = sender
+        self.receiver = receiver
+        self.type = type
+        self.timestamp = timestamp
+
+    @property
+    def sender(self):
+        return self._sender
+
+    @sender.setter
+    def sender(self, sender):
+        self._sender = sender
+
+    @property
+    def receiver(self):
+        return self._receiver
+
+    @receiver.setter
+    def receiver(self, receiver):
+        self._receiver = receiver
+
+    @property
+    def type(self):
+        return self._type
+
+    @type.setter
+    def type(self, type):
+        self._type = type
+
+    @property
+    def timestamp(self):
+        return self._timestamp
+
+    @timestamp.setter
+    def timestamp(self, timestamp):
+        self._timestamp = timestamp
+
+
+def generate_fields(count: int):
+    start = datetime(2020, 1, 1)
+    return [
+        (
+            random.choice(USERNAMES),
+            "me",
+            random.choice([SnapType.IMAGE, SnapType.VIDEO]),
+            (start + timedelta(seconds=random.randrange(0, 86400 * 365))).strftime(
+                "%Y-%m-%d %H:%M:%S UTC"
+            ),
+        )
+        for _ in range(count)
+    ]
+
+
+def instance_size(item) -> int:
+    """
+    Returns the bytes used by a model instance itself, including its attribute dictionary if it has one.
+    """
+    return sys.getsizeof(item) + (
+        sys.getsizeof(item.__dict__) if hasattr(item, "__dict__") else 0
+    )
+
+
+def report(label: str, items):
+    by_sender = timeit.timeit(
+        lambda: filtering.get_by_sending_user(items, USERNAMES[0]), number=5
+    )
+    ordering = timeit.timeit(
+        lambda: statistics.order_by_time_in_ascending_order(items), number=1
+    )
+    print(
+        f"{label:<15} {instance_size(items[0]):4d} B/item"
+        f"  get_by_sending_user {by_sender / 5:6.3f}s"
+        f"  order_by_time_in_ascending_order {ordering:6.3f}s"
+    )
+
+
+def main():
+    random.seed(0)
+    fields = generate_fields(NUM_SNAPS)
+    print(f"{NUM_SNAPS} snaps")
+
+    slotted = [Snap(*field) for field in fields]
+    report("slotted Snap", slotted)
+
+    legacy = [
+        PropertySnap(snap.sender, snap.receiver, snap.type, snap.timestamp)
+        for snap in slotted
+    ]
+    del slotted
+    report("property Snap", legacy)
+
+
+if __name__ == "__main__":
+    main()
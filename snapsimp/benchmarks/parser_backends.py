@@ -0,0 +1,155 @@
+"""
+Times every available parser backend on synthetic snap and chat history files of increasing size and
+asserts that all backends extract identical snaps and chats.
+
+Run from the snapsimp directory: python -m benchmarks.parser_backends [--sizes 10000,100000,1000000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from soup.chat_history_parsing import extract_chat_history
+from soup.parser_backend import ParserBackend
+from soup.snap_history_parsing import extract_snap_history
+
+DEFAULT_SIZES = "10000,100000,1000000"
+MY_NAME = "me"
+FRIENDS = [f"friend{i}" for i in range(50)] + ["ampersand &amp; friend"]
+CHAT_TABLE_HEADERS = (
+    "Received Saved Chat History",
+    "Sent Saved Chat History",
+    "Received Unsaved Chat History",
+    "Sent Unsaved Chat History",
+)
+
+
+def random_timestamp() -> str:
+    offset = timedelta(seconds=random.randrange(86400 * 365 * 3))
+    return (datetime(2020, 1, 1) + offset).strftime("%Y-%m-%d %H:%M:%S UTC")
+
+
+def write_table(f, header_cells, rows) -> None:
+    f.write("<table><tbody><tr>")
+    f.write("".join(f"<th><b>{cell}</b></th>" for cell in header_cells))
+    f.write("</tr>\n")
+    f.writelines(rows)
+    f.write("</tbody></table>\n")
+
+
+def snap_rows(count: int):
+    for _ in range(count):
+        yield (
+            f"<tr><td>{random.choice(FRIENDS)}</td><td>{random.choice(('IMAGE', 'VIDEO'))}</td>"
+            f"<td>{random_timestamp()}</td></tr>\n"
+        )
+
+
+def chat_rows(count: int):
+    for _ in range(count):
+        chat_type = random.choice(("TEXT", "TEXT", "MEDIA"))
+        yield (
+            f"<tr><td>{random.choice(FRIENDS)}</td><td>{chat_type}</td>"
+            f"<td>{random_timestamp()}</td></tr>\n"
+        )
+        if chat_type == "TEXT":
+            yield f'<tr><td colspan="3"> hey &lt;3 <b>{random.randrange(1000)}</b>\n</td></tr>\n'
+
+
+def write_export(directory: str, num_rows: int) -> None:
+    """
+    Writes synthetic snap_history.html and chat_history.html files with num_rows rows split across their tables.
+    """
+    with open(os.path.join(directory, "snap_history.html"), "w") as f:
+        f.write("<html><body><h4>Received Snaps</h4>")
+        write_table(f, ("From", "Media Type", "Date"), snap_rows(num_rows // 2))
+        f.write("<h4>Sent Snaps</h4>")
+        write_table(f, ("To", "Media Type", "Date"), snap_rows(num_rows // 2))
+        f.write("</body></html>")
+
+    with open(os.path.join(directory, "chat_history.html"), "w") as f:
+        f.write("<html><body>")
+        for header in CHAT_TABLE_HEADERS:
+            f.write(f"<h4>{header}</h4>")
+            write_table(
+                f,
+                ("From", "Media Type", "Created"),
+                chat_rows(num_rows // len(CHAT_TABLE_HEADERS)),
+            )
+        f.write("</body></html>")
+
+
+def to_comparable(history):
+    return [
+        [
+            (
+                item.sender,
+                item.receiver,
+                item.type,
+                item.timestamp,
+                getattr(item, "text", None),
+            )
+            for item in items
+        ]
+        for items in history
+    ]
+
+
+def benchmark(label: str, extract, path: str, backends) -> None:
+    expected = None
+
+    for backend in backends:
+        start_time = time.perf_counter()
+        history = extract(path, MY_NAME, backend=backend)
+        elapsed = time.perf_counter() - start_time
+        print(f"  {label:<13} {backend.value:<12} {elapsed:8.2f}s")
+
+        comparable = to_comparable(history)
+        if expected is None:
+            expected = comparable
+        elif comparable != expected:
+            raise AssertionError(
+                f"{backend.value} extracted a different {label} than {backends[0].value}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        help="Comma separated row counts of the synthetic exports",
+        default=DEFAULT_SIZES,
+    )
+    args = parser.parse_args()
+
+    random.seed(0)
+    backends = [
+        backend
+        for backend in ParserBackend
+        if backend != ParserBackend.AUTO and backend.is_available()
+    ]
+    print(f"Backends: {', '.join(backend.value for backend in backends)}")
+
+    for num_rows in (int(size) for size in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as directory:
+            write_export(directory, num_rows)
+            print(f"{num_rows} rows")
+            benchmark(
+                "snap history",
+                extract_snap_history,
+                os.path.join(directory, "snap_history.html"),
+                backends,
+            )
+            benchmark(
+                "chat history",
+                extract_chat_history,
+                os.path.join(directory, "chat_history.html"),
+                backends,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Checks that skipping the rest of a table with skip_table yields the same rows, and counts the same tables, for the
+memory mapped reader and for the streaming reader at every chunk size, so a chunk ending partway through a tag
+never loses the table after a skipped one.
+
+Run from the snapsimp directory: python -m benchmarks.table_row_skipping
+"""
+
+import os
+import tempfile
+
+from soup.mapped_table_row_reader import MappedTableRowReader
+from soup.table_row_reader import TableRowReader
+
+NUM_TABLES = 4
+NUM_ROWS = 3
+
+
+def write_document(file_path: str) -> None:
+    with open(file_path, "w") as f:
+        f.write("<html><body>")
+        for table_index in range(NUM_TABLES):
+            f.write(
+                f"<h4>Table {table_index}</h4><table><tbody><tr><th>Header</th></tr>"
+            )
+            for row_index in range(NUM_ROWS):
+                f.write(
+                    f"<tr><td>{table_index}-{row_index}</td><td>a &amp; <b>b</b></td></tr>\n"
+                )
+            f.write("</tbody></table>")
+        f.write("</body></html>")
+
+
+def read_skipping_even_tables(reader):
+    """
+    Reads every row, skipping the rest of each even table once its first row is read.
+
+    :return: the rows read and the number of tables the reader counted
+    """
+    rows = []
+    for row in reader:
+        rows.append(row)
+        if row.table_index % 2 == 0:
+            reader.skip_table()
+
+    return rows, reader.table_count
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "tables.html")
+        write_document(file_path)
+
+        all_rows = list(TableRowReader(file_path))
+        # Only the first row, the header row, of each even table is read before the rest is skipped
+        expected_rows = []
+        for row in all_rows:
+            if row.table_index % 2 or not any(
+                expected.table_index == row.table_index for expected in expected_rows
+            ):
+                expected_rows.append(row)
+        expected = (expected_rows, NUM_TABLES)
+
+        if read_skipping_even_tables(MappedTableRowReader(file_path)) != expected:
+            raise AssertionError("MappedTableRowReader skipped the wrong rows")
+
+        file_size = os.path.getsize(file_path)
+        for chunk_size in range(1, file_size + 2):
+            if (
+                read_skipping_even_tables(TableRowReader(file_path, chunk_size))
+                != expected
+            ):
+                raise AssertionError(
+                    f"TableRowReader skipped the wrong rows with a chunk size of {chunk_size}"
+                )
+
+        print(
+            f"skip_table matched for the mapped reader and chunk sizes 1 to {file_size + 1}"
+        )
+
+
+if __name__ == "__main__":
+    main()
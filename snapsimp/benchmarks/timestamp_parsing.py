@@ -0,0 +1,63 @@
+"""
+Compares datetime.strptime, which the Snap and Chat constructors previously used, against
+parse_snapchat_timestamp on unique and on repeated Snapchat timestamps.
+
+Run from the snapsimp directory: python -m benchmarks.timestamp_parsing
+"""
+
+import random
+import timeit
+from datetime import datetime, timedelta
+
+from common.time_helpers import SNAPCHAT_TIMESTAMP_FORMAT, parse_snapchat_timestamp
+from snaps.snap import Snap
+from snaps.snap_type import SnapType
+
+NUM_TIMESTAMPS = 200_000
+NUM_DISTINCT_SECONDS = 20_000
+
+
+def generate_timestamps(count: int, distinct: int):
+    """
+    Generates time ordered timestamps, as found in an export, drawn from a fixed number of distinct seconds.
+    """
+    start = datetime(2020, 1, 1)
+    seconds = [random.randrange(0, 86400 * 365 * 3) for _ in range(distinct)]
+    offsets = sorted(random.choice(seconds) for _ in range(count))
+    return [
+        (start + timedelta(seconds=offset)).strftime("%Y-%m-%d %H:%M:%S UTC")
+        for offset in offsets
+    ]
+
+
+def time_call(label: str, function, timestamps) -> float:
+    parse_snapchat_timestamp.cache_clear()
+    elapsed = timeit.timeit(lambda: [function(t) for t in timestamps], number=1)
+    print(f"{label:<45} {elapsed:8.3f}s")
+    return elapsed
+
+
+def main():
+    random.seed(0)
+    unique = generate_timestamps(NUM_TIMESTAMPS, NUM_TIMESTAMPS)
+    repeated = generate_timestamps(NUM_TIMESTAMPS, NUM_DISTINCT_SECONDS)
+
+    print(f"{NUM_TIMESTAMPS} timestamps per run")
+
+    strptime = lambda t: datetime.strptime(t, SNAPCHAT_TIMESTAMP_FORMAT)
+    baseline = time_call("strptime (unique)", strptime, unique)
+    fast = time_call(
+        "parse_snapchat_timestamp (unique)", parse_snapchat_timestamp, unique
+    )
+    cached = time_call(
+        "parse_snapchat_timestamp (repeated)", parse_snapchat_timestamp, repeated
+    )
+
+    print(f"speedup unique: {baseline / fast:.1f}x, repeated: {baseline / cached:.1f}x")
+
+    snap_constructor = lambda t: Snap("me", "them", SnapType.IMAGE, t)
+    time_call("Snap constructor (repeated)", snap_constructor, repeated)
+
+
+if __name__ == "__main__":
+    main()
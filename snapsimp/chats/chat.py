@@ -1,16 +1,20 @@
-from datetime import datetime
+import datetime
 import json
 
 from chats.chat_type import ChatType
 from chats.chat_helpers import json_chat_encoder
 from common.json_constants import INDENT
+from common.time_helpers import parse_snapchat_timestamp
 
 
 class Chat:
     """
     A chat represents a singular chat of a specific type sent from a singular sender to a singular receiver.
+    Chats are slotted so attribute reads in hot loops are direct and no per instance dictionary is allocated.
     """
 
+    __slots__ = ("sender", "receiver", "type", "text", "timestamp")
+
     def __init__(self, sender, receiver, type, text, timestamp):
         """
         Creates a new Chat object.
@@ -19,53 +23,18 @@ class Chat:
         :param receiver: the username of the receiver of the chat
         :param type: the chat type such as video or image
         :param text: the string content of the text if the type is of text
-        :param timestamp: the time at which the chat was sent by the sender's device
+        :param timestamp: the time at which the chat was sent by the sender's device, either a datetime or
+        a timestamp string from a Snapchat export
         """
         self.sender = sender
         self.receiver = receiver
         self.type = ChatType(type)
         self.text = text
-        self.timestamp = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S %Z")
-
-    @property
-    def sender(self):
-        return self._sender
-
-    @sender.setter
-    def sender(self, sender):
-        self._sender = sender
-
-    @property
-    def receiver(self):
-        return self._receiver
-
-    @receiver.setter
-    def receiver(self, receiver):
-        self._receiver = receiver
-
-    @property
-    def type(self):
-        return self._type
-
-    @type.setter
-    def type(self, type):
-        self._type = type
-
-    @property
-    def text(self):
-        return self._text
-
-    @text.setter
-    def text(self, text):
-        self._text = text
-
-    @property
-    def timestamp(self):
-        return self._timestamp
-
-    @timestamp.setter
-    def timestamp(self, timestamp):
-        self._timestamp = timestamp
+        self.timestamp = (
+            timestamp
+            if isinstance(timestamp, datetime.datetime)
+            else parse_snapchat_timestamp(timestamp)
+        )
 
     def to_json(self, file_path):
         """
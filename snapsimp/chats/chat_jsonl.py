@@ -0,0 +1,200 @@
+import datetime
+import gzip
+import io
+import json
+from json.encoder import encode_basestring_ascii
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+
+from chats.chat import Chat
+from common.file_helpers import open_file_atomically
+from common.json_constants import CHAT_CONVERSATION_FORMAT, CHAT_CONVERSATION_VERSION
+
+GZIP_SUFFIX = ".gz"
+GZIP_COMPRESS_LEVEL = 6
+
+# Every chat is written as one line in this layout. Usernames, chat types, and texts are JSON encoded
+# strings and the ISO timestamp never needs escaping, so lines are built without a per chat dictionary.
+_CHAT_LINE_FORMAT = '{"sender":%s,"receiver":%s,"type":%s,"text":%s,"timestamp":"%s"}\n'
+
+
+def is_gzip_path(file_path: str) -> bool:
+    """
+    :return: whether the file is gzip compressed, as indicated by its .gz suffix
+    """
+    return file_path.endswith(GZIP_SUFFIX)
+
+
+def __format_chat_lines(chats: Iterable[Chat]) -> Iterator[str]:
+    """
+    Formats each chat as a line of JSON. Usernames and chat types repeat across every chat of a conversation so
+    each distinct value is encoded once. Chats sharing a second are adjacent in a conversation so the ISO
+    timestamp of the previous chat is reused, keeping memory use flat.
+
+    :param chats: the chats to format
+    :return: a generator of the line of each chat in order
+    """
+    encoded_strings = {}
+    last_timestamp = None
+    iso_timestamp = None
+
+    for chat in chats:
+        sender = encoded_strings.get(chat.sender)
+        if sender is None:
+            sender = encoded_strings[chat.sender] = encode_basestring_ascii(chat.sender)
+
+        receiver = encoded_strings.get(chat.receiver)
+        if receiver is None:
+            receiver = encoded_strings[chat.receiver] = encode_basestring_ascii(
+                chat.receiver
+            )
+
+        chat_type = encoded_strings.get(chat.type)
+        if chat_type is None:
+            chat_type = encoded_strings[chat.type] = encode_basestring_ascii(
+                chat.type.value
+            )
+
+        if chat.timestamp != last_timestamp:
+            last_timestamp = chat.timestamp
+            iso_timestamp = last_timestamp.isoformat()
+
+        yield _CHAT_LINE_FORMAT % (
+            sender,
+            receiver,
+            chat_type,
+            encode_basestring_ascii(chat.text),
+            iso_timestamp,
+        )
+
+
+def write_chats_jsonl(
+    file_path: str,
+    users: List[str],
+    chats: Iterable[Chat],
+    num_chats: int,
+    compress: Optional[bool] = None,
+) -> None:
+    """
+    Streams a conversation to a JSON Lines file. The first line is a header holding the format, version, users, and
+    number of chats, and every following line holds one chat. Chats are formatted and written one at a time so no
+    intermediate list or dictionary of the whole conversation is built. The file is written atomically.
+
+    :param file_path: the path to the JSON Lines file
+    :param users: the users of the conversation
+    :param chats: the chats of the conversation in order
+    :param num_chats: the number of chats, recorded in the header
+    :param compress: whether to gzip the file, inferred from a .gz suffix by default
+    """
+    compress = is_gzip_path(file_path) if compress is None else compress
+    header = {
+        "format": CHAT_CONVERSATION_FORMAT,
+        "version": CHAT_CONVERSATION_VERSION,
+        "users": users,
+        "num_chats": num_chats,
+    }
+
+    with open_file_atomically(file_path, "wb") as raw_file:
+        binary_file = (
+            gzip.GzipFile(
+                fileobj=raw_file, mode="wb", compresslevel=GZIP_COMPRESS_LEVEL
+            )
+            if compress
+            else raw_file
+        )
+
+        f = io.TextIOWrapper(binary_file, encoding="utf-8")
+        f.write(json.dumps(header) + "\n")
+        f.writelines(__format_chat_lines(chats))
+
+        # Detaching flushes the text wrapper without closing the file beneath it. Closing the gzip stream writes
+        # its trailer but leaves the underlying file open for open_file_atomically to close and rename into place.
+        f.detach()
+        if compress:
+            binary_file.close()
+
+
+def open_jsonl(file_path: str) -> IO[str]:
+    """
+    Opens a JSON Lines file for reading, decompressing it if it has a .gz suffix.
+
+    :param file_path: the path to the JSON Lines file
+    :return: the file opened in text mode
+    """
+    if is_gzip_path(file_path):
+        return gzip.open(file_path, "rt", encoding="utf-8")
+
+    return open(file_path, "r", encoding="utf-8")
+
+
+def __parse_header(line: str, file_path: str) -> dict:
+    header = json.loads(line) if line else {}
+
+    if header.get("format") != CHAT_CONVERSATION_FORMAT:
+        raise ValueError(f"{file_path} is not a chat conversation JSON Lines file")
+    if header.get("version") != CHAT_CONVERSATION_VERSION:
+        raise ValueError(
+            f"{file_path} has unsupported version {header.get('version')}, expected {CHAT_CONVERSATION_VERSION}"
+        )
+
+    return header
+
+
+def read_jsonl_header(file_path: str) -> dict:
+    """
+    Reads only the header line of a chat conversation JSON Lines file.
+
+    :param file_path: the path to the JSON Lines file
+    :return: the header holding the format, version, users, and number of chats
+    """
+    with open_jsonl(file_path) as f:
+        return __parse_header(f.readline(), file_path)
+
+
+def __parse_chat_lines(lines: Iterable[str]) -> Iterator[Chat]:
+    """
+    Decodes each chat line of a JSON Lines file following its header. Adjacent chats sharing a timestamp
+    share a single datetime.
+    """
+    last_iso_timestamp = None
+    timestamp = None
+
+    for line in lines:
+        chat = json.loads(line)
+
+        if chat["timestamp"] != last_iso_timestamp:
+            last_iso_timestamp = chat["timestamp"]
+            timestamp = datetime.datetime.fromisoformat(last_iso_timestamp)
+
+        yield Chat(
+            chat["sender"],
+            chat["receiver"],
+            chat["type"],
+            chat["text"],
+            timestamp,
+        )
+
+
+def iter_jsonl_chats(file_path: str) -> Iterator[Chat]:
+    """
+    Lazily reads the chats of a chat conversation JSON Lines file. Only one line is decoded at a time so
+    memory use stays flat regardless of the size of the conversation. Adjacent chats sharing a timestamp
+    share a single datetime.
+
+    :param file_path: the path to the JSON Lines file
+    :return: a generator of the chats in the order they were written
+    """
+    with open_jsonl(file_path) as f:
+        __parse_header(f.readline(), file_path)
+        yield from __parse_chat_lines(f)
+
+
+def read_jsonl(file_path: str) -> Tuple[dict, List[Chat]]:
+    """
+    Reads the header and every chat of a chat conversation JSON Lines file in a single pass over the file.
+
+    :param file_path: the path to the JSON Lines file
+    :return: the header holding the format, version, users, and number of chats, and the chats in the order they were written
+    """
+    with open_jsonl(file_path) as f:
+        header = __parse_header(f.readline(), file_path)
+        return header, list(__parse_chat_lines(f))
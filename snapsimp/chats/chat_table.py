@@ -0,0 +1,54 @@
+from typing import Iterable, List
+
+from common.event_table import EventRow, EventTable
+from chats.chat import Chat
+from chats.chat_type import ChatType
+
+
+class ChatRow(EventRow):
+    """
+    A zero-copy view of a single chat stored within a ChatTable. It quacks like a Chat.
+    """
+
+    __slots__ = ()
+
+    @property
+    def text(self) -> str:
+        return self._table.texts[self._index]
+
+    def __repr__(self):
+        return f"Chat(sender='{self.sender}', receiver='{self.receiver}', type={self.type}, timestamp='{self.timestamp}', text='{self.text}')"
+
+
+class ChatTable(EventTable):
+    """
+    A columnar container of chats. In addition to the 17 bytes per chat of the shared columns, a text column
+    holds a reference to each chat's text. Iterating or indexing the table yields ChatRow views which may be
+    passed anywhere a Chat is expected by the filtering and statistics functions.
+    """
+
+    EVENT_TYPES = list(ChatType)
+    ROW_CLASS = ChatRow
+
+    def __init__(self):
+        super().__init__()
+        self.texts: List[str] = []
+
+    def append(self, event: Chat) -> None:
+        """
+        Appends the provided chat to the end of this table.
+
+        :param event: the chat to append
+        """
+        super().append(event)
+        self.texts.append(event.text)
+
+    @classmethod
+    def from_chats(cls, chats: Iterable[Chat]) -> "ChatTable":
+        """
+        Creates a new ChatTable containing the provided chats.
+
+        :param chats: the chats to store
+        :return: the new ChatTable
+        """
+        return cls.from_events(chats)
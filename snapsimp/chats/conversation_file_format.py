@@ -0,0 +1,15 @@
+from common.snap_simp_enum import SnapSimpEnum
+
+
+class ConversationFileFormat(SnapSimpEnum):
+    """
+    The file format chat conversations are saved in. Each value is also the file extension of the format.
+
+    - JSON: a single indented JSON document per conversation, as written by SnapchatChatConversation.to_json
+    - JSONL: a header line followed by one compact JSON line per chat, streamed by SnapchatChatConversation.to_jsonl
+    - JSONL_GZIP: the JSONL format compressed with gzip
+    """
+
+    JSON = "json"
+    JSONL = "jsonl"
+    JSONL_GZIP = "jsonl.gz"
@@ -1,14 +1,26 @@
+import json
 import os
-from typing import List
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from heapq import merge
+from typing import Dict, List, Optional
 from chats.snapchat_chat_conversation import SnapchatChatConversation
 from chats.chat import Chat
+from chats.conversation_file_format import ConversationFileFormat
 from snaps.filtering import (
     get_by_receiving_user,
     get_by_sending_user,
     get_top_receiver_username,
     get_top_sender_username,
 )
-from snaps.statistics import get_count
+from snaps.statistics import order_by_time_in_ascending_order
+from common.file_helpers import write_file_atomically
+from common.json_constants import INDENT
+from common.parallel_helpers import get_map_chunksize
+
+# Conversations with at least this many chats are written to their files in this process rather than copied to a
+# worker process, so the largest conversations are never held in memory twice
+IN_PROCESS_CONVERSATION_MIN_CHATS = 10_000
 
 
 def generate_conversation_with(
@@ -70,11 +82,49 @@ def generate_conversation_with_top_receiver(
     return SnapchatChatConversation(all_chats)
 
 
+def partition_chats_by_counterparty(
+    my_name: str, sent_chats: List[Chat], received_chats: List[Chat]
+) -> Dict[str, List[Chat]]:
+    """
+    Partitions your sent and received chats by the other snapchatter of each chat in a single pass over each list.
+    Both lists are ordered by time once so every bucket is already sorted, and the sent and received buckets of each
+    snapchatter are merged rather than re-sorted. Ties keep your sent chats before their received chats.
+
+    :param my_name: your snapchat username
+    :param sent_chats: the list of chats you've sent
+    :param received_chats: the list of chats you've received
+    :return: a dictionary of the other snapchatters' usernames to their time ordered chats with you
+    """
+
+    chats_to_them = defaultdict(list)
+    for chat in order_by_time_in_ascending_order(sent_chats):
+        chats_to_them[chat.receiver].append(chat)
+
+    chats_from_them = defaultdict(list)
+    for chat in order_by_time_in_ascending_order(received_chats):
+        chats_from_them[chat.sender].append(chat)
+
+    usernames = dict.fromkeys(list(chats_to_them) + list(chats_from_them))
+    usernames.pop(my_name, None)
+
+    return {
+        username: list(
+            merge(
+                chats_to_them.get(username, []),
+                chats_from_them.get(username, []),
+                key=lambda chat: chat.timestamp,
+            )
+        )
+        for username in usernames
+    }
+
+
 def generate_conversations(
     my_name: str, sent_chats: List[Chat], received_chats: List[Chat]
 ) -> List[SnapchatChatConversation]:
     """
     Generates all snapchat chat conversations between all unique sender and receiver pairs.
+    The chats are partitioned by the other snapchatter in a single pass rather than scanned once per snapchatter.
 
     :param my_name: your snapchat username
     :param sent_chats: the list of chats you've received
@@ -82,22 +132,40 @@ def generate_conversations(
     :return: all snapchat chat conversation objects for all unique sender and receiver pairs
     """
 
-    sender_counts, receiver_counts = get_count(sent_chats + received_chats)
-    all_usernames = list(sender_counts.keys()) + list(receiver_counts.keys())
-    unique_usernames = list(set(all_usernames))
+    partitioned_chats = partition_chats_by_counterparty(
+        my_name, sent_chats, received_chats
+    )
 
-    ret = []
+    return [
+        SnapchatChatConversation(chats, is_sorted=True)
+        for chats in partitioned_chats.values()
+    ]
 
-    for unique_username in unique_usernames:
-        if unique_username == my_name:
-            continue
 
-        conversation = generate_conversation_with(
-            unique_username, sent_chats, received_chats
-        )
-        ret.append(conversation)
+def __save_conversation_json(
+    file_path: str, conversation: SnapchatChatConversation
+) -> None:
+    """
+    Encodes a conversation to JSON and atomically writes it to the provided path.
+
+    :param file_path: the path to the JSON file
+    :param conversation: the conversation to save
+    """
+    write_file_atomically(
+        file_path, json.dumps(conversation.to_json_dict(), indent=INDENT)
+    )
+
+
+def __save_conversation_jsonl(
+    file_path: str, conversation: SnapchatChatConversation
+) -> None:
+    """
+    Streams a conversation to a JSON Lines file, gzip compressed if the path ends in .gz.
 
-    return ret
+    :param file_path: the path to the JSON Lines file
+    :param conversation: the conversation to save
+    """
+    conversation.to_jsonl(file_path)
 
 
 def generate_and_save_all_conversations(
@@ -105,15 +173,25 @@ def generate_and_save_all_conversations(
     sent_chats: List[Chat],
     received_chats: List[Chat],
     save_folder_path: str,
-) -> None:
+    max_workers: Optional[int] = None,
+    file_format: ConversationFileFormat = ConversationFileFormat.JSON,
+) -> int:
     """
     Generates all snapchat chat conversations between all unique sender and receiver pairs and serializes and saves all objects
     to JSON format to the provided save_folder_path. If this folder does not exist, it will be created.
 
+    Conversations are encoded and written across a pool of worker processes, each worker encoding only the
+    conversations it saves. Those with at least IN_PROCESS_CONVERSATION_MIN_CHATS chats are written by this process
+    as the workers run, so they are not copied into a worker.
+    Each file is written to a temporary file first and renamed into place.
+
     :param my_name: your snapchat username
     :param sent_chats: the list of chats you've sent
     :param received_chats: the list of chats you've received
     :param save_folder_path: the location to save all the serialized conversations to
+    :param max_workers: the number of worker processes, None for one per core or 1 to save serially in this process
+    :param file_format: the format conversations are saved in, named {username}.{format value}
+    :return: the number of conversations saved
     """
 
     if not os.path.exists(save_folder_path):
@@ -121,8 +199,47 @@ def generate_and_save_all_conversations(
 
     conversations = generate_conversations(my_name, sent_chats, received_chats)
 
+    save_function = (
+        __save_conversation_json
+        if file_format == ConversationFileFormat.JSON
+        else __save_conversation_jsonl
+    )
+
+    file_paths = []
+    worker_conversations = []
+    in_process_saves = []
+
     for conversation in conversations:
         first_chat = conversation.chats[0]
         users = [first_chat.sender, first_chat.receiver]
         users.remove(my_name)
-        conversation.to_json(os.path.join(save_folder_path, f"{users[0]}.json"))
+        file_path = os.path.join(save_folder_path, f"{users[0]}.{file_format.value}")
+
+        if (
+            max_workers == 1
+            or len(conversation.chats) >= IN_PROCESS_CONVERSATION_MIN_CHATS
+        ):
+            in_process_saves.append((file_path, conversation))
+        else:
+            file_paths.append(file_path)
+            worker_conversations.append(conversation)
+
+    if not file_paths:
+        for file_path, conversation in in_process_saves:
+            save_function(file_path, conversation)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            saves = executor.map(
+                save_function,
+                file_paths,
+                worker_conversations,
+                chunksize=get_map_chunksize(len(file_paths), max_workers),
+            )
+
+            # The large conversations are written while the workers save the rest
+            for file_path, conversation in in_process_saves:
+                save_function(file_path, conversation)
+
+            list(saves)
+
+    return len(conversations)
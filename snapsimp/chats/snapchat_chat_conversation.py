@@ -1,14 +1,22 @@
 from datetime import timedelta, datetime
 import json
-from statistics import mean
-from typing import List, Set
+from typing import Dict, List, Optional, Set
 from collections import Counter
 
 from chats.chat import Chat
-from common.descriptive_stats import DescriptiveStatsTimedelta
+from chats.chat_jsonl import read_jsonl, write_chats_jsonl
+from common.descriptive_stats import (
+    DescriptiveStatsTimedelta,
+    ResponseTimeDistribution,
+)
+from common.response_times import compute_response_time_distributions
 from chats.chat_type import ChatType
-from chats.chat_helpers import json_chat_encoder
-from common.json_constants import INDENT
+from common.json_constants import (
+    CHAT_CONVERSATION_FORMAT,
+    CHAT_CONVERSATION_VERSION,
+    INDENT,
+)
+from common.time_helpers import parse_iso_timestamp
 
 
 class SnapchatChatConversation:
@@ -16,20 +24,33 @@ class SnapchatChatConversation:
     A snapchat chat conversation stores a list of chats between two users for a designated period of time.
     """
 
-    def __init__(self, chats: List[Chat]):
+    def __init__(
+        self,
+        chats: List[Chat],
+        is_sorted: bool = False,
+        users: Optional[Set[str]] = None,
+    ):
         """
         Initializes a SnapchatChatConversation instance.
 
         :param chats: the list of Chat objects for this conversation.
         It is expected that this list contains chats between two and only two users
+        :param is_sorted: whether the chats are already in ascending timestamp order, skipping the sort
+        :param users: the users of this conversation if already known, such as from the header of a saved
+        conversation, skipping the pass over the chats that collects and validates them
         """
-        sending_users = {chat.sender for chat in chats}
-        receiving_users = {chat.receiver for chat in chats}
+        if users is None:
+            sending_users = {chat.sender for chat in chats}
+            receiving_users = {chat.receiver for chat in chats}
 
-        self.__check_initialization_constraints(sending_users, receiving_users)
+            self.__check_initialization_constraints(sending_users, receiving_users)
+            users = sending_users.union(receiving_users)
 
-        self.chats = sorted(chats, key=lambda chat: chat.timestamp)
-        self.users = sending_users.union(receiving_users)
+        self.chats = (
+            list(chats) if is_sorted else sorted(chats, key=lambda chat: chat.timestamp)
+        )
+        self.__response_time_distributions = None
+        self.users = set(users)
 
     def __check_initialization_constraints(
         self, sending_users: Set[str], receiving_users: Set[str]
@@ -189,19 +210,23 @@ class SnapchatChatConversation:
         received_chats_by_user = self.get_received_chats_by_user(username)
         return len(received_chats_by_user) if received_chats_by_user else 0
 
-    def __get_switching_chats(self) -> List[Chat]:
-        switching_chats = []
-
-        for i in range(len(self.chats) - 1):
-            current_chat = self.chats[i]
-            next_chat = self.chats[i + 1]
+    def calculate_response_time_distributions(
+        self,
+    ) -> Dict[str, ResponseTimeDistribution]:
+        """
+        Computes and returns the response time distributions of both users in a single pass over this conversation.
+        Besides the minimum, average, and maximum, each distribution holds the standard deviation, the 50th, 90th,
+        and 99th percentiles, and a histogram. The result is cached on this conversation.
 
-            if current_chat.sender != next_chat.sender:
-                switching_chats.append(current_chat)
+        :return: a dictionary of usernames to their response time distributions, users without a response are omitted
+        """
 
-        switching_chats.append(self.chats[-1])
+        if self.__response_time_distributions is None:
+            self.__response_time_distributions = compute_response_time_distributions(
+                self.chats
+            )
 
-        return switching_chats
+        return self.__response_time_distributions
 
     def calculate_descriptive_response_stats_of_receiver(
         self, receiver: str
@@ -216,26 +241,14 @@ class SnapchatChatConversation:
         if receiver not in self.users:
             raise AssertionError(f"{receiver} should be in list of users: {self.users}")
 
-        latest_chats_before_sender_switch = self.__get_switching_chats()
+        distribution = self.calculate_response_time_distributions().get(receiver)
 
-        # Extract the timestamps of chats sent by the receiver
-        receiver_chat_times = [
-            chat.timestamp
-            for chat in latest_chats_before_sender_switch
-            if chat.sender == receiver
-        ]
-        # Pair each chat time with the next one (if it exists)
-        paired_chat_times = list(zip(receiver_chat_times, receiver_chat_times[1:]))
-        # Compute the time differences
-        awaiting_response_times = [(t2 - t1) for t1, t2 in paired_chat_times]
-
-        min_diff = min(awaiting_response_times)
-        max_diff = max(awaiting_response_times)
-        avg_diff = timedelta(
-            seconds=mean([diff.total_seconds() for diff in awaiting_response_times])
-        )
+        if distribution is None:
+            raise ValueError(f"{receiver} has not responded within this conversation")
 
-        return DescriptiveStatsTimedelta(min_diff, avg_diff, max_diff)
+        return DescriptiveStatsTimedelta(
+            distribution.minimum, distribution.average, distribution.maximum
+        )
 
     def print_formatted_conversation(self):
         last_sender = None
@@ -253,31 +266,118 @@ class SnapchatChatConversation:
             last_sender = chat.sender
             print()
 
-    def to_json(self, file_path):
+    def to_json_dict(self) -> dict:
         """
-        Saves the chat conversation to a JSON file.
+        Returns this chat conversation as a dictionary of JSON primitives. Timestamps and chat types are
+        pre-encoded so the dictionary can be dumped without a default encoder callback. The format and version
+        header marks the chats as sorted and between the listed users, so from_json_dict can trust them.
 
-        :param file_path: the path to the JSON file
+        :return: a dictionary containing the format, version, users, and chats of this conversation
         """
 
         chats_list = [
             {
                 "sender": chat.sender,
                 "receiver": chat.receiver,
-                "type": chat.type,
+                "type": chat.type.value,
                 "text": chat.text,
-                "timestamp": chat.timestamp,
+                "timestamp": chat.timestamp.isoformat(),
             }
             for chat in self.chats
         ]
 
-        conversation_dict = {
+        return {
+            "format": CHAT_CONVERSATION_FORMAT,
+            "version": CHAT_CONVERSATION_VERSION,
             "users": list(self.users),
             "chats": chats_list,
         }
 
+    @classmethod
+    def from_json_dict(cls, json_dict: dict) -> "SnapchatChatConversation":
+        """
+        Creates a chat conversation from a dictionary returned by to_json_dict. Dictionaries carrying the format
+        and version header skip the sort and the validation of their users. Dictionaries saved before the header
+        was added are sorted and validated.
+
+        :param json_dict: the dictionary containing the users and chats of the conversation
+        :return: the chat conversation
+        """
+
+        is_trusted = "format" in json_dict
+        if is_trusted and (
+            json_dict["format"] != CHAT_CONVERSATION_FORMAT
+            or json_dict.get("version") != CHAT_CONVERSATION_VERSION
+        ):
+            raise ValueError(
+                f"Unsupported chat conversation format {json_dict['format']} version {json_dict.get('version')}"
+            )
+
+        chats = [
+            Chat(
+                chat["sender"],
+                chat["receiver"],
+                chat["type"],
+                chat["text"],
+                parse_iso_timestamp(chat["timestamp"]),
+            )
+            for chat in json_dict["chats"]
+        ]
+
+        return cls(
+            chats,
+            is_sorted=is_trusted,
+            users=set(json_dict["users"]) if is_trusted else None,
+        )
+
+    @classmethod
+    def from_json(cls, file_path: str) -> "SnapchatChatConversation":
+        """
+        Loads a chat conversation saved by to_json.
+
+        :param file_path: the path to the JSON file
+        :return: the chat conversation
+        """
+
+        with open(file_path, "r") as f:
+            return cls.from_json_dict(json.load(f))
+
+    def to_json(self, file_path):
+        """
+        Saves the chat conversation to a JSON file.
+
+        :param file_path: the path to the JSON file
+        """
+
         with open(file_path, "w") as f:
-            json.dump(conversation_dict, f, default=json_chat_encoder, indent=INDENT)
+            json.dump(self.to_json_dict(), f, indent=INDENT)
+
+    def to_jsonl(self, file_path: str, compress: Optional[bool] = None) -> None:
+        """
+        Streams the chat conversation to a JSON Lines file, a header line followed by one compact line per chat.
+        Unlike to_json no dictionary of the whole conversation is built, so memory use does not grow with the
+        number of chats. The chats can be read back lazily with chats.chat_jsonl.iter_jsonl_chats.
+
+        :param file_path: the path to the JSON Lines file
+        :param compress: whether to gzip the file, inferred from a .gz suffix by default
+        """
+
+        write_chats_jsonl(
+            file_path, list(self.users), self.chats, len(self.chats), compress
+        )
+
+    @classmethod
+    def from_jsonl(cls, file_path: str) -> "SnapchatChatConversation":
+        """
+        Loads a chat conversation saved by to_jsonl. The header of a JSON Lines file is always present,
+        so the chats are trusted to be sorted and between its users.
+
+        :param file_path: the path to the JSON Lines file
+        :return: the chat conversation
+        """
+
+        header, chats = read_jsonl(file_path)
+        return cls(chats, is_sorted=True, users=set(header["users"]))
 
     def __str__(self):
         return f"SnapchatChatConversation(users={self.users}, num_chats={len(self.chats)}, earliest_chat_date={self.get_earlist_chat_date()}, latest_chat_date={self.get_latest_chat_date()})"
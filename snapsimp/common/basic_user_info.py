@@ -1,4 +1,4 @@
-from datetime import datetime
+from common.time_helpers import parse_snapchat_timestamp
 
 
 class BasicUserInfo:
@@ -14,13 +14,13 @@ class BasicUserInfo:
     :type creation_date: str
 
     The creation_date is a string in the format '%Y-%m-%d %H:%M:%S %Z' and it will be converted
-    to a datetime object upon object instantiation.
+    to a timezone aware UTC datetime object upon object instantiation.
     """
 
     def __init__(self, username: str, name: str, creation_date: str):
         self.username = username
         self.name = name
-        self.creation_date = datetime.strptime(creation_date, "%Y-%m-%d %H:%M:%S %Z")
+        self.creation_date = parse_snapchat_timestamp(creation_date)
 
     def __str__(self):
         return f"BasicUserInfo(username='{self.username}', name='{self.name}', creation_date='{self.creation_date}')"
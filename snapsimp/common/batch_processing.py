@@ -0,0 +1,316 @@
+import json
+import multiprocessing
+import os
+import time
+import traceback
+from collections import deque
+from multiprocessing.connection import Connection, wait
+from typing import Dict, List, Optional, Tuple
+
+from chats.conversation_file_format import ConversationFileFormat
+from chats.conversation_generator import generate_and_save_all_conversations
+from common.file_helpers import write_file_atomically
+from common.json_constants import INDENT
+from common.parse_cache import ParseCache, get_or_parse
+from soup.account_parsing import parse_all
+from soup.chat_history_parsing import extract_chat_history
+from soup.parser_backend import ParserBackend
+from soup.snap_history_parsing import extract_snap_history
+
+ACCOUNT_FILE_NAME = "account.html"
+SNAP_HISTORY_FILE_NAME = "snap_history.html"
+CHAT_HISTORY_FILE_NAME = "chat_history.html"
+EXPORT_HTML_FOLDER_NAME = "html"
+CONVERSATIONS_FOLDER_NAME = "all-chat-conversations"
+SUMMARY_FILE_NAME = "batch_summary.json"
+MANIFEST_COMMENT_PREFIX = "#"
+
+
+class ExportResult:
+    """
+    The outcome of processing a single export of a batch.
+    """
+
+    def __init__(
+        self,
+        export_folder: str,
+        username: Optional[str] = None,
+        output_folder: Optional[str] = None,
+        num_snaps: int = 0,
+        num_chats: int = 0,
+        stage_timings: Optional[Dict[str, float]] = None,
+        error: Optional[str] = None,
+    ):
+        self.export_folder = export_folder
+        self.username = username
+        self.output_folder = output_folder
+        self.num_snaps = num_snaps
+        self.num_chats = num_chats
+        self.stage_timings = stage_timings or {}
+        self.error = error
+
+    def succeeded(self) -> bool:
+        return self.error is None
+
+    def to_json_dict(self) -> dict:
+        return {
+            "export_folder": self.export_folder,
+            "username": self.username,
+            "output_folder": self.output_folder,
+            "num_snaps": self.num_snaps,
+            "num_chats": self.num_chats,
+            "stage_timings": self.stage_timings,
+            "error": self.error,
+        }
+
+    def __repr__(self):
+        return (
+            f"ExportResult(export_folder={self.export_folder}, username={self.username}, "
+            f"stage_timings={self.stage_timings}, error={self.error})"
+        )
+
+
+def find_export_folders(path: str) -> List[str]:
+    """
+    Finds the export folders of a batch. The path is either a manifest file listing one export folder per line,
+    relative to the manifest's folder, with blank and # lines ignored, or a folder whose sub folders are exports.
+
+    :param path: the path to the manifest file or the folder of exports
+    :return: the export folders in a stable order
+    """
+    if os.path.isfile(path):
+        manifest_folder = os.path.dirname(os.path.abspath(path))
+        with open(path, "r") as f:
+            lines = [line.strip() for line in f]
+
+        return [
+            os.path.join(manifest_folder, line)
+            for line in lines
+            if line and not line.startswith(MANIFEST_COMMENT_PREFIX)
+        ]
+
+    if not os.path.isdir(path):
+        raise ValueError(f"Batch path is neither a manifest file nor a folder: {path}")
+
+    return sorted(
+        entry.path
+        for entry in os.scandir(path)
+        if entry.is_dir() and not entry.name.startswith(".")
+    )
+
+
+def resolve_export_files(export_folder: str) -> Tuple[str, str, str]:
+    """
+    Returns the account, snap history, and chat history files of an export folder. The files are looked for
+    in the export's html folder, as laid out by Snapchat, and then in the export folder itself.
+
+    :param export_folder: the path to the export folder
+    :return: the paths to the account, snap history, and chat history files
+    """
+    for folder in (
+        os.path.join(export_folder, EXPORT_HTML_FOLDER_NAME),
+        export_folder,
+    ):
+        files = tuple(
+            os.path.join(folder, file_name)
+            for file_name in (
+                ACCOUNT_FILE_NAME,
+                SNAP_HISTORY_FILE_NAME,
+                CHAT_HISTORY_FILE_NAME,
+            )
+        )
+        if all(os.path.isfile(file) for file in files):
+            return files
+
+    raise ValueError(
+        f"Export folder is missing one of {ACCOUNT_FILE_NAME}, {SNAP_HISTORY_FILE_NAME}, or {CHAT_HISTORY_FILE_NAME}: {export_folder}"
+    )
+
+
+def process_export(
+    export_folder: str,
+    output_folder: str,
+    backend: ParserBackend = ParserBackend.AUTO,
+    cache: Optional[ParseCache] = None,
+    file_format: ConversationFileFormat = ConversationFileFormat.JSON,
+) -> ExportResult:
+    """
+    Parses a single export and saves its chat conversations under a folder named after the account's username
+    within the output folder. Errors are captured in the result rather than raised so a batch is never aborted.
+
+    :param export_folder: the path to the export folder
+    :param output_folder: the folder each account's results are saved under
+    :param backend: the parser backend used for each file
+    :param cache: an optional cache of previously parsed files
+    :param file_format: the format the conversations are saved in
+    :return: the result of processing the export
+    """
+    result = ExportResult(export_folder)
+
+    try:
+        account_file, snap_history_file, chat_history_file = resolve_export_files(
+            export_folder
+        )
+
+        start_time = time.perf_counter()
+        basic_user_info = get_or_parse(cache, account_file, parse_all, backend=backend)[
+            0
+        ]
+        result.username = basic_user_info.username
+        received_snaps, sent_snaps = get_or_parse(
+            cache,
+            snap_history_file,
+            extract_snap_history,
+            result.username,
+            backend=backend,
+        )
+        received_chats, sent_chats = get_or_parse(
+            cache,
+            chat_history_file,
+            extract_chat_history,
+            result.username,
+            backend=backend,
+        )
+        result.stage_timings["parse"] = time.perf_counter() - start_time
+        result.num_snaps = len(received_snaps) + len(sent_snaps)
+        result.num_chats = len(received_chats) + len(sent_chats)
+
+        start_time = time.perf_counter()
+        result.output_folder = os.path.join(output_folder, result.username)
+        generate_and_save_all_conversations(
+            result.username,
+            sent_chats,
+            received_chats,
+            os.path.join(result.output_folder, CONVERSATIONS_FOLDER_NAME),
+            max_workers=1,
+            file_format=file_format,
+        )
+        result.stage_timings["analysis"] = time.perf_counter() - start_time
+    except Exception:
+        result.error = traceback.format_exc(limit=-1).strip()
+
+    return result
+
+
+def __process_export_in_child(
+    connection: Connection,
+    export_folder: str,
+    output_folder: str,
+    backend: ParserBackend,
+    cache: Optional[ParseCache],
+    file_format: ConversationFileFormat,
+) -> None:
+    """
+    Processes a single export in a child process and sends its result back to the parent.
+    """
+    connection.send(
+        process_export(export_folder, output_folder, backend, cache, file_format)
+    )
+    connection.close()
+
+
+def process_exports(
+    export_folders: List[str],
+    output_folder: str,
+    max_workers: Optional[int] = None,
+    backend: ParserBackend = ParserBackend.AUTO,
+    cache: Optional[ParseCache] = None,
+    file_format: ConversationFileFormat = ConversationFileFormat.JSON,
+) -> List[ExportResult]:
+    """
+    Processes many exports, each in its own child process with at most max_workers running at once. The memory
+    of one large export is returned to the system when its process exits, before the next is parsed. An export
+    that fails, or whose process dies such as when killed for running out of memory, is recorded as failed in
+    its result, with the exit code of a dead process, and the rest of the batch continues unaffected.
+    A summary is written to the output folder.
+
+    :param export_folders: the paths to the export folders
+    :param output_folder: the folder each account's results and the batch summary are saved under
+    :param max_workers: the number of exports processed at once, one per core by default
+    :param backend: the parser backend used for each file
+    :param cache: an optional cache of previously parsed files
+    :param file_format: the format each export's conversations are saved in
+    :return: the results of each export in the order of export_folders
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    results = {}
+    pending_folders = deque(export_folders)
+    running = {}
+
+    while pending_folders or running:
+        while pending_folders and len(running) < max_workers:
+            export_folder = pending_folders.popleft()
+            parent_connection, child_connection = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(
+                target=__process_export_in_child,
+                args=(
+                    child_connection,
+                    export_folder,
+                    output_folder,
+                    backend,
+                    cache,
+                    file_format,
+                ),
+            )
+            process.start()
+            # Closing the parent's copy of the child's end lets a dead child be seen as the end of the pipe.
+            child_connection.close()
+            running[parent_connection] = (export_folder, process)
+
+        for connection in wait(list(running)):
+            export_folder, process = running.pop(connection)
+            try:
+                results[export_folder] = connection.recv()
+            except EOFError:
+                results[export_folder] = None
+            connection.close()
+            process.join()
+
+            if results[export_folder] is None:
+                results[export_folder] = ExportResult(
+                    export_folder,
+                    error=f"Worker process exited with code {process.exitcode} before finishing the export",
+                )
+
+    ordered_results = [results[export_folder] for export_folder in export_folders]
+    write_file_atomically(
+        os.path.join(output_folder, SUMMARY_FILE_NAME),
+        json.dumps(
+            [result.to_json_dict() for result in ordered_results], indent=INDENT
+        ),
+    )
+
+    return ordered_results
+
+
+def format_summary(results: List[ExportResult]) -> str:
+    """
+    Formats the results of a batch as a human readable summary with one line per export.
+
+    :param results: the results of the batch
+    :return: the summary
+    """
+    lines = []
+
+    for result in results:
+        if result.succeeded():
+            timings = ", ".join(
+                f"{stage} {seconds:.2f}s"
+                for stage, seconds in result.stage_timings.items()
+            )
+            lines.append(
+                f"OK     {result.username} ({result.num_snaps} snaps, {result.num_chats} chats): {timings}"
+            )
+        else:
+            lines.append(
+                f"FAILED {result.export_folder}: {result.error.splitlines()[-1]}"
+            )
+
+    num_failed = sum(1 for result in results if not result.succeeded())
+    lines.append(
+        f"Processed {len(results)} exports, {len(results) - num_failed} succeeded, {num_failed} failed"
+    )
+
+    return "\n".join(lines)
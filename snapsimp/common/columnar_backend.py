@@ -0,0 +1,62 @@
+from importlib.util import find_spec
+
+from common.snap_simp_enum import SnapSimpEnum
+
+ARROW_FILE_EXTENSION = "arrow"
+PACKED_FILE_EXTENSION = "snapcol"
+
+
+class ColumnarBackend(SnapSimpEnum):
+    """
+    The ways parsed events may be written to columnar files.
+
+    - AUTO: ARROW if pyarrow is installed and PACKED otherwise
+    - ARROW: Arrow IPC files written by pyarrow, which must be installed
+    - PACKED: snap simp's self describing struct packed column files, read by common.columnar_export.PackedColumnarFile
+    """
+
+    AUTO = "auto"
+    ARROW = "arrow"
+    PACKED = "packed"
+
+    def is_available(self) -> bool:
+        """
+        :return: whether the libraries this backend depends on are installed
+        """
+        return self != ColumnarBackend.ARROW or is_pyarrow_available()
+
+    def resolve(self) -> "ColumnarBackend":
+        """
+        Returns the concrete backend to write with, resolving AUTO to the fastest available backend.
+
+        :return: ARROW or PACKED
+        """
+        if self == ColumnarBackend.AUTO:
+            return (
+                ColumnarBackend.ARROW
+                if is_pyarrow_available()
+                else ColumnarBackend.PACKED
+            )
+        if not self.is_available():
+            raise ValueError(
+                "The arrow columnar backend was requested but pyarrow is not installed"
+            )
+
+        return self
+
+    def get_file_extension(self) -> str:
+        """
+        :return: the extension of the files written by this backend once resolved, such as 'arrow'
+        """
+        return (
+            ARROW_FILE_EXTENSION
+            if self.resolve() == ColumnarBackend.ARROW
+            else PACKED_FILE_EXTENSION
+        )
+
+
+def is_pyarrow_available() -> bool:
+    """
+    :return: whether pyarrow is installed, without importing it
+    """
+    return find_spec("pyarrow") is not None
@@ -0,0 +1,539 @@
+import datetime
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from chats.chat import Chat
+from chats.chat_table import ChatTable
+from common.columnar_backend import ColumnarBackend
+from common.event_table import EventTable
+from common.file_helpers import open_file_atomically
+from common.login_history import LoginHistory
+from common.time_helpers import parse_snapchat_timestamp
+from snaps.snap import Snap
+from snaps.snap_table import SnapTable
+
+COLUMNAR_FORMAT = "snapsimp-columnar"
+COLUMNAR_VERSION = 1
+SNAPS_TABLE_NAME = "snaps"
+CHATS_TABLE_NAME = "chats"
+LOGINS_TABLE_NAME = "logins"
+USERNAMES_DICTIONARY = "usernames"
+
+# Column types. Dictionary encoded columns hold UINT8 or UINT32 codes into a named dictionary of values.
+UINT8 = "uint8"
+UINT32 = "uint32"
+INT64 = "int64"
+TIMESTAMP = "timestamp"
+STRING = "string"
+
+# Timestamps are int64 epoch seconds in UTC. Login times that are missing or unparsable are stored as this value.
+NULL_TIMESTAMP = -(2**63)
+
+# A packed file is the magic bytes and the length of a JSON header, the header describing the dictionaries and
+# columns, and then every column buffer starting on an 8 byte boundary. Numbers are little endian.
+_PACKED_MAGIC = b"SNAPCOL1"
+_PACKED_PRELUDE = struct.Struct("<8sI")
+_PACKED_ALIGNMENT = 8
+_ARRAY_TYPECODES = {UINT8: "B", UINT32: "I", INT64: "q", TIMESTAMP: "q"}
+
+
+class ColumnarTable:
+    """
+    The columns of a single table of events ready to be written, independent of the file format. Numeric and
+    dictionary code columns are arrays, string columns are lists, and dictionaries are shared between columns.
+    """
+
+    def __init__(self, name: str, num_rows: int, metadata: Dict[str, str]):
+        self.name = name
+        self.num_rows = num_rows
+        self.metadata = metadata
+        self.columns: List[
+            Tuple[str, str, array | bytes | List[str], Optional[str]]
+        ] = []
+        self.dictionaries: Dict[str, List[Optional[str]]] = {}
+
+    def add_column(
+        self,
+        name: str,
+        column_type: str,
+        values: array | bytes | List[str],
+        dictionary: Optional[str] = None,
+    ) -> None:
+        """
+        Adds a column to this table.
+
+        :param name: the name of the column
+        :param column_type: one of UINT8, UINT32, INT64, TIMESTAMP, or STRING
+        :param values: the values, or dictionary codes, of every row
+        :param dictionary: the name of the dictionary the codes of this column index into, if dictionary encoded
+        """
+        if len(values) != self.num_rows:
+            raise ValueError(
+                f"Column {name} has {len(values)} values but table {self.name} has {self.num_rows} rows"
+            )
+        if dictionary is not None and dictionary not in self.dictionaries:
+            raise ValueError(f"Unknown dictionary {dictionary} for column {name}")
+
+        self.columns.append((name, column_type, values, dictionary))
+
+    def __repr__(self):
+        return f"ColumnarTable(name={self.name}, num_rows={self.num_rows}, columns={[column[0] for column in self.columns]})"
+
+
+def __create_table(name: str, num_rows: int, my_name: str) -> ColumnarTable:
+    return ColumnarTable(
+        name,
+        num_rows,
+        {
+            "format": COLUMNAR_FORMAT,
+            "version": str(COLUMNAR_VERSION),
+            "table": name,
+            "my_name": my_name,
+            "timestamp_unit": "s",
+        },
+    )
+
+
+def __add_event_table_columns(table: ColumnarTable, event_table: EventTable) -> None:
+    """
+    Adds the sender, receiver, type, and timestamp columns of an EventTable, whose interned username ids and type
+    codes are already dictionary codes, so the columns are used as they are without another pass over the events.
+    """
+    table.dictionaries[USERNAMES_DICTIONARY] = event_table.usernames
+    table.dictionaries["types"] = [
+        event_type.value for event_type in event_table.EVENT_TYPES
+    ]
+
+    table.add_column("sender", UINT32, event_table.senders, USERNAMES_DICTIONARY)
+    table.add_column("receiver", UINT32, event_table.receivers, USERNAMES_DICTIONARY)
+    table.add_column("type", UINT8, event_table.types, "types")
+    table.add_column("timestamp", TIMESTAMP, event_table.timestamps)
+
+
+def create_snaps_table(snaps: List[Snap], my_name: str) -> ColumnarTable:
+    """
+    Creates the columnar table of the provided snaps.
+
+    :param snaps: the received and sent snaps
+    :param my_name: your snapchat username, recorded in the table's metadata
+    :return: a table with sender, receiver, type, and timestamp columns
+    """
+    snap_table = SnapTable.from_snaps(snaps)
+    table = __create_table(SNAPS_TABLE_NAME, len(snap_table), my_name)
+    __add_event_table_columns(table, snap_table)
+
+    return table
+
+
+def create_chats_table(chats: List[Chat], my_name: str) -> ColumnarTable:
+    """
+    Creates the columnar table of the provided chats.
+
+    :param chats: the received and sent chats
+    :param my_name: your snapchat username, recorded in the table's metadata
+    :return: a table with sender, receiver, type, timestamp, and text columns
+    """
+    chat_table = ChatTable.from_chats(chats)
+    table = __create_table(CHATS_TABLE_NAME, len(chat_table), my_name)
+    __add_event_table_columns(table, chat_table)
+    table.add_column("text", STRING, chat_table.texts)
+
+    return table
+
+
+def __dictionary_encode(values: List[Optional[str]]) -> Tuple[array, List[str]]:
+    """
+    :return: the codes of each value and the dictionary of distinct values in order of first appearance
+    """
+    value_codes = {}
+    codes = array("I")
+
+    for value in values:
+        code = value_codes.get(value)
+        if code is None:
+            code = value_codes[value] = len(value_codes)
+        codes.append(code)
+
+    return codes, list(value_codes)
+
+
+def __login_timestamp(created: Optional[str]) -> int:
+    try:
+        return int(parse_snapchat_timestamp(created).timestamp())
+    except (TypeError, ValueError):
+        return NULL_TIMESTAMP
+
+
+def create_logins_table(
+    login_history: List[LoginHistory], my_name: str
+) -> ColumnarTable:
+    """
+    Creates the columnar table of the provided login history.
+
+    :param login_history: the login history of the account
+    :param my_name: your snapchat username, recorded in the table's metadata
+    :return: a table with ip, country, created, status, and device columns
+    """
+    table = __create_table(LOGINS_TABLE_NAME, len(login_history), my_name)
+    table.add_column("ip", STRING, [str(login.ip) for login in login_history])
+
+    for name in ("country", "status", "device"):
+        codes, table.dictionaries[name] = __dictionary_encode(
+            [getattr(login, name) for login in login_history]
+        )
+        table.add_column(name, UINT32, codes, name)
+
+    table.add_column(
+        "created",
+        TIMESTAMP,
+        array("q", (__login_timestamp(login.created) for login in login_history)),
+    )
+
+    return table
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _PACKED_ALIGNMENT) * _PACKED_ALIGNMENT
+
+
+def __to_little_endian(values: array | bytes) -> array | bytes:
+    if sys.byteorder == "little" or not isinstance(values, array):
+        return values
+
+    swapped = array(values.typecode, values)
+    swapped.byteswap()
+    return swapped
+
+
+def __get_column_buffers(column_type: str, values) -> List[array | bytes]:
+    """
+    :return: the buffers of a column, its values for numeric columns or its int64 offsets and UTF-8 data for strings
+    """
+    if column_type != STRING:
+        return [__to_little_endian(values)]
+
+    encoded_values = [value.encode("utf-8") for value in values]
+    offsets = array("q", [0])
+    offsets.extend(accumulate(len(value) for value in encoded_values))
+
+    return [__to_little_endian(offsets), b"".join(encoded_values)]
+
+
+def write_packed_table(file_path: str, table: ColumnarTable) -> None:
+    """
+    Writes a table to a self describing packed column file. The file holds a JSON header with the table's
+    metadata, dictionaries, and the offset and size of every column buffer, followed by the 8 byte aligned
+    little endian buffers, so a reader can memory map the file and view any column without decoding the others.
+
+    :param file_path: the path to the packed column file
+    :param table: the table to write
+    """
+    column_buffers = [
+        __get_column_buffers(column_type, values)
+        for _, column_type, values, _ in table.columns
+    ]
+
+    column_headers = []
+    offset = 0
+    for (name, column_type, _, dictionary), buffers in zip(
+        table.columns, column_buffers
+    ):
+        buffer_ranges = []
+        for buffer in buffers:
+            size = len(buffer) * (buffer.itemsize if isinstance(buffer, array) else 1)
+            buffer_ranges.append([offset, size])
+            offset = _align(offset + size)
+
+        column_headers.append(
+            {
+                "name": name,
+                "type": column_type,
+                "dictionary": dictionary,
+                "buffers": buffer_ranges,
+            }
+        )
+
+    header = json.dumps(
+        {
+            "num_rows": table.num_rows,
+            "metadata": table.metadata,
+            "dictionaries": table.dictionaries,
+            "columns": column_headers,
+        }
+    ).encode("utf-8")
+    data_start = _align(_PACKED_PRELUDE.size + len(header))
+
+    with open_file_atomically(file_path, "wb") as f:
+        f.write(_PACKED_PRELUDE.pack(_PACKED_MAGIC, len(header)))
+        f.write(header)
+        f.write(bytes(data_start - f.tell()))
+
+        for buffers, column_header in zip(column_buffers, column_headers):
+            for buffer, (buffer_offset, _) in zip(buffers, column_header["buffers"]):
+                f.write(bytes(data_start + buffer_offset - f.tell()))
+                f.write(buffer)
+
+
+def __to_arrow_table(table: ColumnarTable):
+    """
+    Converts a table to a pyarrow Table. Dictionary encoded columns become Arrow dictionary arrays over the same
+    codes, and numeric columns wrap their arrays' memory without a copy.
+    """
+    import pyarrow as pa
+
+    dictionaries = {
+        name: pa.array(values, pa.string())
+        for name, values in table.dictionaries.items()
+    }
+    arrow_types = {
+        UINT8: pa.uint8(),
+        UINT32: pa.uint32(),
+        INT64: pa.int64(),
+        TIMESTAMP: pa.timestamp("s", tz="UTC"),
+    }
+
+    arrays = []
+    for _, column_type, values, dictionary in table.columns:
+        if column_type == STRING:
+            arrays.append(pa.array(values, pa.string()))
+            continue
+
+        if column_type == TIMESTAMP and NULL_TIMESTAMP in values:
+            column = pa.array(
+                [None if value == NULL_TIMESTAMP else value for value in values],
+                arrow_types[TIMESTAMP],
+            )
+        else:
+            column = pa.Array.from_buffers(
+                arrow_types[column_type],
+                len(values),
+                [None, pa.py_buffer(__to_little_endian(values))],
+            )
+
+        arrays.append(
+            pa.DictionaryArray.from_arrays(column, dictionaries[dictionary])
+            if dictionary is not None
+            else column
+        )
+
+    return pa.Table.from_arrays(
+        arrays,
+        names=[column[0] for column in table.columns],
+        metadata=table.metadata,
+    )
+
+
+def write_arrow_table(file_path: str, table: ColumnarTable) -> None:
+    """
+    Writes a table to an Arrow IPC file, which pyarrow and most analytics tools can memory map.
+    pyarrow must be installed.
+
+    :param file_path: the path to the Arrow IPC file
+    :param table: the table to write
+    """
+    import pyarrow as pa
+
+    arrow_table = __to_arrow_table(table)
+
+    with open_file_atomically(file_path, "wb") as f:
+        with pa.ipc.new_file(f, arrow_table.schema) as writer:
+            writer.write_table(arrow_table)
+
+
+def write_columnar_export(
+    output_folder: str,
+    my_name: str,
+    snaps: List[Snap],
+    chats: List[Chat],
+    login_history: List[LoginHistory],
+    backend: ColumnarBackend = ColumnarBackend.AUTO,
+) -> List[str]:
+    """
+    Writes all parsed events of an export to one columnar file per table, snaps, chats, and logins, in the output
+    folder. Usernames, event types, and login fields are dictionary encoded and timestamps are int64 epoch
+    seconds, so downstream jobs can memory map and scan the files instead of reparsing the export.
+
+    :param output_folder: the folder to write the files to, created if it does not exist
+    :param my_name: your snapchat username, recorded in each table's metadata
+    :param snaps: the received and sent snaps
+    :param chats: the received and sent chats
+    :param login_history: the login history of the account
+    :param backend: the columnar file format to write
+    :return: the paths of the files written
+    """
+    backend = backend.resolve()
+    write_table = (
+        write_arrow_table if backend == ColumnarBackend.ARROW else write_packed_table
+    )
+    os.makedirs(output_folder, exist_ok=True)
+
+    file_paths = []
+    for table in (
+        create_snaps_table(snaps, my_name),
+        create_chats_table(chats, my_name),
+        create_logins_table(login_history, my_name),
+    ):
+        file_path = os.path.join(
+            output_folder, f"{table.name}.{backend.get_file_extension()}"
+        )
+        write_table(file_path, table)
+        file_paths.append(file_path)
+
+    return file_paths
+
+
+class PackedColumnarFile:
+    """
+    A reader of packed column files that memory maps the file and views each column in place. Numeric and
+    dictionary code columns are returned as memoryviews over the map, so only the columns and rows actually
+    scanned are read from disk. Views returned by get_column must be released before the file is closed.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Opens and memory maps a packed column file.
+
+        :param file_path: the path to the packed column file
+        """
+        self.file_path = file_path
+        self.__file = open(file_path, "rb")
+        self.__contents = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, header_length = _PACKED_PRELUDE.unpack_from(self.__contents, 0)
+        if magic != _PACKED_MAGIC:
+            self.close()
+            raise ValueError(f"{file_path} is not a packed column file")
+
+        header_end = _PACKED_PRELUDE.size + header_length
+        header = json.loads(self.__contents[_PACKED_PRELUDE.size : header_end])
+
+        self.num_rows: int = header["num_rows"]
+        self.metadata: Dict[str, str] = header["metadata"]
+        self.dictionaries: Dict[str, List[Optional[str]]] = header["dictionaries"]
+        self.__columns = {column["name"]: column for column in header["columns"]}
+        self.__data_start = _align(header_end)
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self.__columns)
+
+    def __get_column_header(self, name: str) -> dict:
+        column = self.__columns.get(name)
+        if column is None:
+            raise ValueError(f"{self.file_path} has no column named {name}")
+
+        return column
+
+    def __view_buffer(self, buffer_range: List[int], typecode: str) -> memoryview:
+        offset, size = buffer_range
+        start = self.__data_start + offset
+        view = memoryview(self.__contents)[start : start + size].cast(typecode)
+
+        if sys.byteorder == "little" or typecode == "B":
+            return view
+
+        values = array(typecode, view)
+        values.byteswap()
+        view.release()
+        return memoryview(values)
+
+    def get_column(self, name: str) -> memoryview:
+        """
+        Returns the values of a numeric column, or the dictionary codes of a dictionary encoded column, in place.
+
+        :param name: the name of the column
+        :return: a memoryview of the column's values, epoch seconds for timestamp columns
+        """
+        column = self.__get_column_header(name)
+        if column["type"] == STRING:
+            raise ValueError(
+                f"Column {name} holds strings, use iter_strings to read it"
+            )
+
+        return self.__view_buffer(
+            column["buffers"][0], _ARRAY_TYPECODES[column["type"]]
+        )
+
+    def get_dictionary(self, name: str) -> Optional[List[Optional[str]]]:
+        """
+        :param name: the name of the column
+        :return: the dictionary the column's codes index into or None if the column is not dictionary encoded
+        """
+        dictionary = self.__get_column_header(name)["dictionary"]
+        return None if dictionary is None else self.dictionaries[dictionary]
+
+    def iter_strings(self, name: str) -> Iterator[str]:
+        """
+        Lazily decodes the values of a string column.
+
+        :param name: the name of the column
+        :return: a generator of the column's values in row order
+        """
+        column = self.__get_column_header(name)
+        if column["type"] != STRING:
+            raise ValueError(f"Column {name} does not hold strings")
+
+        # The offsets are copied out of the map so a partially consumed generator does not keep the file from closing
+        with self.__view_buffer(column["buffers"][0], "q") as view:
+            offsets = array("q", view)
+        data_offset, _ = column["buffers"][1]
+        data_start = self.__data_start + data_offset
+
+        for index in range(self.num_rows):
+            yield self.__contents[
+                data_start + offsets[index] : data_start + offsets[index + 1]
+            ].decode("utf-8")
+
+    def get_values(self, name: str) -> List:
+        """
+        Decodes every value of a column into Python objects. Dictionary codes are replaced by their values
+        and timestamps become timezone aware UTC datetimes, or None for missing timestamps.
+
+        :param name: the name of the column
+        :return: the list of the column's values in row order
+        """
+        column = self.__get_column_header(name)
+        if column["type"] == STRING:
+            return list(self.iter_strings(name))
+
+        with self.get_column(name) as view:
+            dictionary = self.get_dictionary(name)
+            if dictionary is not None:
+                return [dictionary[code] for code in view]
+            if column["type"] != TIMESTAMP:
+                return view.tolist()
+
+            datetimes = {}
+            for seconds in view:
+                if seconds not in datetimes:
+                    datetimes[seconds] = (
+                        None
+                        if seconds == NULL_TIMESTAMP
+                        else datetime.datetime.fromtimestamp(
+                            seconds, datetime.timezone.utc
+                        )
+                    )
+
+            return [datetimes[seconds] for seconds in view]
+
+    def close(self) -> None:
+        self.__contents.close()
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def __repr__(self):
+        return f"PackedColumnarFile(file_path={self.file_path}, num_rows={self.num_rows}, columns={self.column_names})"
@@ -0,0 +1,111 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from chats.snapchat_chat_conversation import SnapchatChatConversation
+from common.json_constants import SNAP_CONVERSATION_FORMAT
+from common.parallel_helpers import get_map_chunksize
+from snaps.snapchat_snap_conversation import SnapchatSnapConversation
+
+JSON_SUFFIX = ".json"
+CONVERSATION_FILE_SUFFIXES = (".jsonl.gz", ".jsonl", JSON_SUFFIX)
+
+
+def get_conversation_name(file_path: str) -> Optional[str]:
+    """
+    Returns the name of a saved conversation file without its suffix, which is the other snapchatter's username
+    for conversations saved by generate_and_save_all_conversations.
+
+    :param file_path: the path to the conversation file
+    :return: the file name without its suffix or None if the file is not a conversation file
+    """
+    file_name = os.path.basename(file_path)
+
+    for suffix in CONVERSATION_FILE_SUFFIXES:
+        if file_name.endswith(suffix) and not file_name.startswith("."):
+            return file_name[: -len(suffix)]
+
+    return None
+
+
+def load_conversation(
+    file_path: str,
+) -> SnapchatChatConversation | SnapchatSnapConversation:
+    """
+    Loads a saved chat or snap conversation without parsing any HTML. JSON Lines files, optionally gzipped, hold
+    chat conversations. JSON files hold a chat or snap conversation as told by their format header, or by their
+    snaps key for files saved before the header was added.
+
+    :param file_path: the path to the conversation file
+    :return: the chat or snap conversation
+    """
+    if not file_path.endswith(JSON_SUFFIX):
+        return SnapchatChatConversation.from_jsonl(file_path)
+
+    with open(file_path, "r") as f:
+        json_dict = json.load(f)
+
+    if json_dict.get("format") == SNAP_CONVERSATION_FORMAT or "snaps" in json_dict:
+        return SnapchatSnapConversation.from_json_dict(json_dict)
+
+    return SnapchatChatConversation.from_json_dict(json_dict)
+
+
+def find_conversation_files(folder_path: str) -> List[str]:
+    """
+    Finds the saved conversation files of a folder, ignoring any other files and temporary files left by an
+    interrupted save. Conversations are named after the other snapchatter, so two files of the same name in
+    different formats, such as bob.json and bob.jsonl.gz, are rejected rather than one silently replacing the other.
+
+    :param folder_path: the folder the conversations were saved to
+    :return: the paths to the conversation files in a stable order
+    """
+    file_paths = sorted(
+        entry.path
+        for entry in os.scandir(folder_path)
+        if entry.is_file() and get_conversation_name(entry.name) is not None
+    )
+
+    file_paths_by_name = {}
+    for file_path in file_paths:
+        name = get_conversation_name(file_path)
+        if name in file_paths_by_name:
+            raise ValueError(
+                f"Conversation {name} was saved more than once, {file_paths_by_name[name]} and {file_path}"
+            )
+        file_paths_by_name[name] = file_path
+
+    return file_paths
+
+
+def load_all_conversations(
+    folder_path: str, max_workers: Optional[int] = None
+) -> Dict[str, SnapchatChatConversation | SnapchatSnapConversation]:
+    """
+    Loads every saved conversation of a folder, such as one written by generate_and_save_all_conversations, so
+    analysis can start again without parsing the export's HTML. Files are decoded across a pool of worker
+    processes.
+
+    :param folder_path: the folder the conversations were saved to
+    :param max_workers: the number of worker processes, None for one per core or 1 to load serially in this process
+    :return: a dictionary of each file's name without its suffix, the other snapchatter's username, to its conversation
+    """
+    file_paths = find_conversation_files(folder_path)
+
+    if max_workers == 1:
+        conversations = [load_conversation(file_path) for file_path in file_paths]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            conversations = list(
+                executor.map(
+                    load_conversation,
+                    file_paths,
+                    chunksize=get_map_chunksize(len(file_paths), max_workers),
+                )
+            )
+
+    return {
+        get_conversation_name(file_path): conversation
+        for file_path, conversation in zip(file_paths, conversations)
+    }
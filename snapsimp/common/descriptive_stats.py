@@ -1,4 +1,5 @@
 from datetime import timedelta
+from typing import Dict, List, Tuple
 
 
 class DescriptiveStats:
@@ -26,3 +27,38 @@ class DescriptiveStatsFloat(DescriptiveStats):
 class DescriptiveStatsTimedelta(DescriptiveStats):
     def __init__(self, minimum: timedelta, average: timedelta, maximum: timedelta):
         super().__init__(minimum, average, maximum)
+
+
+class ResponseTimeDistribution(DescriptiveStatsTimedelta):
+    """
+    The distribution of a user's response times. In addition to the minimum, average, and maximum this holds the
+    number of responses, the standard deviation, approximate percentiles, and a histogram of response times.
+    """
+
+    def __init__(
+        self,
+        minimum: timedelta,
+        average: timedelta,
+        maximum: timedelta,
+        count: int,
+        standard_deviation: timedelta,
+        percentiles: Dict[int, timedelta],
+        histogram: List[Tuple[timedelta, timedelta, int]],
+    ):
+        super().__init__(minimum, average, maximum)
+        self.count = count
+        self.standard_deviation = standard_deviation
+        self.percentiles = percentiles
+        self.histogram = histogram
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(minimum={self.minimum}, average={self.average}, maximum={self.maximum}, "
+            f"count={self.count}, standard_deviation={self.standard_deviation}, percentiles={self.percentiles})"
+        )
+
+    def __str__(self):
+        percentiles = ", ".join(
+            f"P{percentile}: {value}" for percentile, value in self.percentiles.items()
+        )
+        return f"{super().__str__()}, StdDev: {self.standard_deviation}, {percentiles}"
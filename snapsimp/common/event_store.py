@@ -0,0 +1,258 @@
+import datetime
+import hashlib
+import sqlite3
+from collections import Counter
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from snaps.snap import Snap
+from chats.chat import Chat
+from common.time_helpers import format_snapchat_timestamp, parse_snapchat_timestamp
+from soup.snap_history_parsing import iter_snap_history
+from soup.chat_history_parsing import iter_chat_history
+
+SNAP_KIND = "snap"
+CHAT_KIND = "chat"
+DEFAULT_OVERLAP = datetime.timedelta(days=1)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    kind TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    receiver TEXT NOT NULL,
+    type TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    occurrence INTEGER NOT NULL,
+    text TEXT,
+    PRIMARY KEY (kind, sender, receiver, type, timestamp, text_hash, occurrence)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS events_kind_timestamp ON events (kind, timestamp);
+"""
+
+
+def _hash_text(text: Optional[str]) -> str:
+    """
+    Hashes the text of a chat for use in the event key, snaps have no text and hash to an empty string.
+
+    :param text: the text of the chat or None for snaps
+    :return: the hex digest of the text
+    """
+    if not text:
+        return ""
+
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class EventStore:
+    """
+    A persistent SQLite store of snaps and chats which outlives Snapchat's retention window. Each event is keyed on
+    its sender, receiver, type, timestamp, and text hash, plus an occurrence number separating identical events
+    sent within the same second, so ingesting an overlapping export only inserts the events not yet stored.
+
+    Only the rows of an export at or after the store's watermark, the latest stored timestamp, minus an overlap
+    window are parsed. Every event of a given second is either entirely inside or outside of the window, which
+    keeps the occurrence numbers of re-ingested events identical to those already stored.
+    """
+
+    def __init__(self, database_path: str):
+        """
+        Opens, creating if necessary, the event store at the provided path.
+
+        :param database_path: the path to the SQLite database file
+        """
+        self.database_path = database_path
+        self.connection = sqlite3.connect(database_path)
+        self.connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """
+        Closes the underlying database connection.
+        """
+        self.connection.close()
+
+    def __enter__(self) -> "EventStore":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def get_watermark(self, kind: str) -> Optional[datetime.datetime]:
+        """
+        Returns the timestamp of the latest stored event of the provided kind.
+
+        :param kind: SNAP_KIND or CHAT_KIND
+        :return: the latest timestamp or None if no events of the kind are stored
+        """
+        (timestamp,) = self.connection.execute(
+            "SELECT MAX(timestamp) FROM events WHERE kind = ?", (kind,)
+        ).fetchone()
+
+        return parse_snapchat_timestamp(timestamp) if timestamp else None
+
+    def get_ingest_cutoff(
+        self, kind: str, overlap: datetime.timedelta = DEFAULT_OVERLAP
+    ) -> Optional[datetime.datetime]:
+        """
+        Returns the time from which an export must be parsed to pick up every event not yet stored.
+
+        :param kind: SNAP_KIND or CHAT_KIND
+        :param overlap: how far before the watermark to re-read, guarding against events stored from a partial day
+        :return: the cutoff or None if the whole export must be parsed
+        """
+        watermark = self.get_watermark(kind)
+        if watermark is None:
+            return None
+
+        # Truncate to the second so the cutoff never splits the events of a single second
+        return (watermark - overlap).replace(microsecond=0)
+
+    def __add_events(self, kind: str, rows: Iterable[Tuple]) -> int:
+        """
+        Inserts the provided (sender, receiver, type, timestamp, text) rows, ignoring those already stored.
+
+        :param kind: SNAP_KIND or CHAT_KIND
+        :param rows: the rows to insert
+        :return: the number of newly inserted events
+        """
+
+        occurrences = Counter()
+
+        def keyed_rows() -> Iterator[Tuple]:
+            for sender, receiver, event_type, timestamp, text in rows:
+                text_hash = _hash_text(text)
+                key = (sender, receiver, event_type, timestamp, text_hash)
+                occurrence = occurrences[key]
+                occurrences[key] += 1
+                yield kind, *key, occurrence, text
+
+        with self.connection:
+            total_changes = self.connection.total_changes
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                keyed_rows(),
+            )
+            return self.connection.total_changes - total_changes
+
+    def add_snaps(self, snaps: Iterable[Snap]) -> int:
+        """
+        Inserts the provided snaps, ignoring those already stored.
+
+        :param snaps: the snaps to insert, which must cover every snap of each second they contain
+        :return: the number of newly inserted snaps
+        """
+        return self.__add_events(
+            SNAP_KIND,
+            (
+                (
+                    snap.sender,
+                    snap.receiver,
+                    snap.type.value,
+                    format_snapchat_timestamp(snap.timestamp),
+                    None,
+                )
+                for snap in snaps
+            ),
+        )
+
+    def add_chats(self, chats: Iterable[Chat]) -> int:
+        """
+        Inserts the provided chats, ignoring those already stored.
+
+        :param chats: the chats to insert, which must cover every chat of each second they contain
+        :return: the number of newly inserted chats
+        """
+        return self.__add_events(
+            CHAT_KIND,
+            (
+                (
+                    chat.sender,
+                    chat.receiver,
+                    chat.type.value,
+                    format_snapchat_timestamp(chat.timestamp),
+                    chat.text,
+                )
+                for chat in chats
+            ),
+        )
+
+    def ingest_snap_history(
+        self,
+        snap_history_file_name: str,
+        my_name: str,
+        overlap: datetime.timedelta = DEFAULT_OVERLAP,
+    ) -> int:
+        """
+        Streams the snaps of a snap history file sent since the ingest cutoff into this store.
+
+        :param snap_history_file_name: the path to the local snap_history.html file
+        :param my_name: your snapchat account username
+        :param overlap: how far before the watermark to re-read
+        :return: the number of newly inserted snaps
+        """
+        cutoff = self.get_ingest_cutoff(SNAP_KIND, overlap)
+        return self.add_snaps(
+            iter_snap_history(snap_history_file_name, my_name, cutoff)
+        )
+
+    def ingest_chat_history(
+        self,
+        chat_history_file_name: str,
+        my_name: str,
+        overlap: datetime.timedelta = DEFAULT_OVERLAP,
+    ) -> int:
+        """
+        Streams the chats of a chat history file sent since the ingest cutoff into this store.
+
+        :param chat_history_file_name: the path to the local chat_history.html file
+        :param my_name: your snapchat account username
+        :param overlap: how far before the watermark to re-read
+        :return: the number of newly inserted chats
+        """
+        cutoff = self.get_ingest_cutoff(CHAT_KIND, overlap)
+        return self.add_chats(
+            iter_chat_history(chat_history_file_name, my_name, cutoff)
+        )
+
+    def get_snaps(self, my_name: str) -> Tuple[List[Snap], List[Snap]]:
+        """
+        Returns every stored snap in descending timestamp order, the order of a snap history file.
+
+        :param my_name: your snapchat account username
+        :return: two lists of snap objects, the first is the received snaps, the second is the sent snaps
+        """
+        received_snaps, sent_snaps = [], []
+
+        for sender, receiver, snap_type, timestamp, _ in self.__select(SNAP_KIND):
+            snap = Snap(sender, receiver, snap_type, timestamp)
+            (sent_snaps if sender == my_name else received_snaps).append(snap)
+
+        return received_snaps, sent_snaps
+
+    def get_chats(self, my_name: str) -> Tuple[List[Chat], List[Chat]]:
+        """
+        Returns every stored chat in descending timestamp order, the order of a chat history file.
+
+        :param my_name: your snapchat account username
+        :return: two lists of chat objects, the first is the received chats, the second is the sent chats
+        """
+        received_chats, sent_chats = [], []
+
+        for sender, receiver, chat_type, timestamp, text in self.__select(CHAT_KIND):
+            chat = Chat(sender, receiver, chat_type, text, timestamp)
+            (sent_chats if sender == my_name else received_chats).append(chat)
+
+        return received_chats, sent_chats
+
+    def __select(self, kind: str) -> sqlite3.Cursor:
+        return self.connection.execute(
+            "SELECT sender, receiver, type, timestamp, text FROM events WHERE kind = ? "
+            "ORDER BY timestamp DESC, occurrence",
+            (kind,),
+        )
+
+    def __len__(self) -> int:
+        (count,) = self.connection.execute("SELECT COUNT(*) FROM events").fetchone()
+        return count
+
+    def __repr__(self):
+        return f"EventStore(database_path={self.database_path}, num_events={len(self)})"
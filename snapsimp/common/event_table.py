@@ -0,0 +1,200 @@
+from array import array
+from collections import Counter
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class EventRow:
+    """
+    A zero-copy, read only view of a single row of an EventTable. A row exposes the same sender, receiver,
+    type, and timestamp attributes as a Snap or Chat so it may be passed to the filtering and statistics functions.
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "EventTable", index: int):
+        self._table = table
+        self._index = index
+
+    @property
+    def sender(self) -> str:
+        return self._table.usernames[self._table.senders[self._index]]
+
+    @property
+    def receiver(self) -> str:
+        return self._table.usernames[self._table.receivers[self._index]]
+
+    @property
+    def type(self) -> Enum:
+        return self._table.EVENT_TYPES[self._table.types[self._index]]
+
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp(self._table.timestamps[self._index], timezone.utc)
+
+
+class EventTable:
+    """
+    Columnar storage for a list of snaps or chats. Usernames are interned into integer ids and every column is
+    backed by a compact array so a single event costs 17 bytes: two 4 byte user ids, a 1 byte type code, and
+    an 8 byte epoch second timestamp. Subclasses define the event type enum and the row view class.
+    """
+
+    EVENT_TYPES: List[Enum] = []
+    ROW_CLASS = EventRow
+
+    def __init__(self):
+        self.usernames: List[str] = []
+        self.username_ids: Dict[str, int] = {}
+        self.senders = array("I")
+        self.receivers = array("I")
+        self.types = bytearray()
+        self.timestamps = array("q")
+        self.__type_codes = {
+            event_type: code for code, event_type in enumerate(self.EVENT_TYPES)
+        }
+
+    def intern_username(self, username: str) -> int:
+        """
+        Returns the id of the provided username, assigning a new id if the username has not been seen before.
+
+        :param username: the username to intern
+        :return: the integer id of the username
+        """
+        username_id = self.username_ids.get(username)
+
+        if username_id is None:
+            username_id = len(self.usernames)
+            self.username_ids[username] = username_id
+            self.usernames.append(username)
+
+        return username_id
+
+    def get_username_id(self, username: str) -> Optional[int]:
+        """
+        Returns the interned id of the provided username.
+
+        :param username: the username to look up
+        :return: the id of the username or None if the username is not part of this table
+        """
+        return self.username_ids.get(username)
+
+    def append(self, event) -> None:
+        """
+        Appends the provided snap or chat to the end of this table.
+
+        :param event: the snap or chat to append
+        """
+        self.senders.append(self.intern_username(event.sender))
+        self.receivers.append(self.intern_username(event.receiver))
+        self.types.append(self.__type_codes[event.type])
+        self.timestamps.append(int(event.timestamp.timestamp()))
+
+    def extend(self, events: Iterable) -> None:
+        """
+        Appends all the provided snaps or chats to the end of this table.
+
+        :param events: the snaps or chats to append
+        """
+        for event in events:
+            self.append(event)
+
+    @classmethod
+    def from_events(cls, events: Iterable) -> "EventTable":
+        """
+        Creates a new table containing the provided snaps or chats.
+
+        :param events: the snaps or chats to store
+        :return: the new table
+        """
+        table = cls()
+        table.extend(events)
+        return table
+
+    def sender_indices(self, username: str) -> List[int]:
+        """
+        Returns the row indices of the events sent by the provided user by scanning the sender column.
+
+        :param username: the username of the sender
+        :return: the ascending row indices of the events sent by the user
+        """
+        return self.__column_indices(self.senders, username)
+
+    def receiver_indices(self, username: str) -> List[int]:
+        """
+        Returns the row indices of the events received by the provided user by scanning the receiver column.
+
+        :param username: the username of the receiver
+        :return: the ascending row indices of the events received by the user
+        """
+        return self.__column_indices(self.receivers, username)
+
+    def __column_indices(self, column: array, username: str) -> List[int]:
+        username_id = self.username_ids.get(username)
+        if username_id is None:
+            return []
+
+        return [index for index, value in enumerate(column) if value == username_id]
+
+    def get_sender_counts(self) -> Dict[str, int]:
+        """
+        Returns the number of events sent by each sender.
+
+        :return: a dictionary of sender usernames to their event counts
+        """
+        return {
+            self.usernames[username_id]: count
+            for username_id, count in Counter(self.senders).items()
+        }
+
+    def get_receiver_counts(self) -> Dict[str, int]:
+        """
+        Returns the number of events received by each receiver.
+
+        :return: a dictionary of receiver usernames to their event counts
+        """
+        return {
+            self.usernames[username_id]: count
+            for username_id, count in Counter(self.receivers).items()
+        }
+
+    def get_type_counts(self) -> Dict[Enum, int]:
+        """
+        Returns the number of events of each type.
+
+        :return: a dictionary of event types to their counts
+        """
+        return {
+            self.EVENT_TYPES[code]: count for code, count in Counter(self.types).items()
+        }
+
+    def row(self, index: int) -> EventRow:
+        """
+        Returns a view of the row at the provided index.
+
+        :param index: the index of the row, negative indices are supported
+        :return: a view of the row
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Row index out of range: {index}")
+
+        return self.ROW_CLASS(self, index)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, index: int | slice) -> EventRow | List[EventRow]:
+        if isinstance(index, slice):
+            return [self.ROW_CLASS(self, i) for i in range(*index.indices(len(self)))]
+
+        return self.row(index)
+
+    def __iter__(self) -> Iterator[EventRow]:
+        for index in range(len(self)):
+            yield self.ROW_CLASS(self, index)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(num_events={len(self)}, num_users={len(self.usernames)})"
@@ -0,0 +1,67 @@
+import os
+import stat
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+
+DEFAULT_FILE_MODE = 0o666
+
+
+def __get_new_file_mode(file_path: str) -> int:
+    """
+    :return: the permission bits of the existing file at the path, or those open() would create a new file with
+    """
+    try:
+        return stat.S_IMODE(os.stat(file_path).st_mode)
+    except FileNotFoundError:
+        # The umask can only be read by setting it, so it is immediately restored.
+        umask = os.umask(0)
+        os.umask(umask)
+        return DEFAULT_FILE_MODE & ~umask
+
+
+@contextmanager
+def open_file_atomically(file_path: str, mode: str = "w", **kwargs) -> Iterator[IO]:
+    """
+    Opens a temporary file next to the destination for writing and renames it into place once the block exits,
+    so readers never observe a partially written file even if the write is interrupted. Content may be streamed
+    to the file rather than held in memory. The temporary file is removed if the block raises.
+
+    The file is given the mode of the file it replaces, or the mode open() would create it with under the
+    current umask, rather than the owner only mode of temporary files.
+
+    :param file_path: the path of the file to write
+    :param mode: the mode to open the temporary file with, 'w' or 'wb'
+    :param kwargs: any further arguments to os.fdopen such as encoding
+    :return: a context manager yielding the open temporary file
+    """
+
+    directory = os.path.dirname(os.path.abspath(file_path))
+    file_descriptor, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(file_path)}.", suffix=".tmp"
+    )
+
+    try:
+        with os.fdopen(file_descriptor, mode, **kwargs) as f:
+            yield f
+        os.chmod(temp_path, __get_new_file_mode(file_path))
+        os.replace(temp_path, file_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def write_file_atomically(file_path: str, content: str | bytes) -> None:
+    """
+    Writes the provided content to a temporary file next to the destination and renames it into place, so
+    readers never observe a partially written file even if the write is interrupted.
+
+    :param file_path: the path of the file to write
+    :param content: the text or bytes to write
+    """
+
+    with open_file_atomically(
+        file_path, "wb" if isinstance(content, bytes) else "w"
+    ) as f:
+        f.write(content)
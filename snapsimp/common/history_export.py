@@ -0,0 +1,42 @@
+import json
+from typing import List
+
+from common.file_helpers import write_file_atomically
+from common.json_constants import INDENT
+
+
+def event_to_json_dict(snap_or_chat) -> dict:
+    """
+    Returns a snap or chat as a dictionary of JSON primitives. Chats include their text, snaps do not.
+
+    :param snap_or_chat: the snap or chat to convert
+    :return: the dictionary of the snap or chat's sender, receiver, type, timestamp, and text
+    """
+    json_dict = {
+        "sender": snap_or_chat.sender,
+        "receiver": snap_or_chat.receiver,
+        "type": snap_or_chat.type.value,
+        "timestamp": snap_or_chat.timestamp.isoformat(),
+    }
+
+    text = getattr(snap_or_chat, "text", None)
+    if text is not None:
+        json_dict["text"] = text
+
+    return json_dict
+
+
+def write_history_json(file_path: str, received: List, sent: List) -> None:
+    """
+    Saves a snap or chat history to a single JSON file holding its received and sent lists.
+
+    :param file_path: the path to the JSON file
+    :param received: the received snaps or chats
+    :param sent: the sent snaps or chats
+    """
+    history = {
+        "received": [event_to_json_dict(snap_or_chat) for snap_or_chat in received],
+        "sent": [event_to_json_dict(snap_or_chat) for snap_or_chat in sent],
+    }
+
+    write_file_atomically(file_path, json.dumps(history, indent=INDENT))
@@ -1 +1,7 @@
 INDENT = 4
+
+# The format names and versions written into saved conversations so loaders can tell chat from snap conversations
+CHAT_CONVERSATION_FORMAT = "snapsimp-chat-conversation"
+CHAT_CONVERSATION_VERSION = 1
+SNAP_CONVERSATION_FORMAT = "snapsimp-snap-conversation"
+SNAP_CONVERSATION_VERSION = 1
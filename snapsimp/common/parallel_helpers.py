@@ -0,0 +1,26 @@
+import os
+from typing import Optional
+
+CHUNKS_PER_WORKER = 8
+
+
+def get_num_workers(max_workers: Optional[int] = None) -> int:
+    """
+    Returns the number of worker processes a ProcessPoolExecutor created with max_workers runs.
+
+    :param max_workers: the requested number of workers, None for one per core
+    :return: the number of workers
+    """
+    return max_workers or os.cpu_count() or 1
+
+
+def get_map_chunksize(num_items: int, max_workers: Optional[int] = None) -> int:
+    """
+    Returns the chunksize for ProcessPoolExecutor.map that splits the items into about CHUNKS_PER_WORKER
+    chunks per worker, batching the round trips to each worker while still balancing uneven items.
+
+    :param num_items: the number of items mapped
+    :param max_workers: the max_workers the pool was created with, None for one per core
+    :return: the chunksize, at least 1
+    """
+    return max(1, num_items // (CHUNKS_PER_WORKER * get_num_workers(max_workers)))
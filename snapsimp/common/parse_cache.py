@@ -0,0 +1,316 @@
+import hashlib
+import json
+import os
+import pickle
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from common.file_helpers import write_file_atomically
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = ".snapsimp-cache"
+DEFAULT_MAX_SIZE_BYTES = 512 * 1024 * 1024
+ENTRY_EXTENSION = ".pickle"
+FINGERPRINTS_FILE_NAME = "fingerprints.json"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Returned by ParseCache.get when no entry is cached, as None may be a cached result.
+CACHE_MISS = object()
+
+# Keyword arguments that only change how a file is parsed, such as across how many processes, and never the
+# result, so they are left out of entry keys rather than caching the same result once per value
+UNKEYED_KWARGS = frozenset({"max_workers"})
+
+
+class ParseCache:
+    """
+    An on disk cache of parsed export files. Entries are keyed by the sha256 digest of the parsed file's content,
+    the parse function, and its extra arguments, and are stored with pickle protocol 5.
+
+    Hashing a large export on every run would cost a noticeable fraction of parsing it, so the digest of each file
+    is remembered alongside its size and modification time and only recomputed when either changes. The cache is
+    bounded by the total size of its entries; reading an entry marks it as recently used and the least recently
+    used entries are evicted first.
+
+    Several processes may share a cache directory, such as the workers of a concurrent or batch parse, so entries
+    removed or replaced by another process while this one lists, reads, or evicts them are skipped.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+    ):
+        """
+        Creates a new ParseCache, creating the cache directory if it does not exist.
+
+        :param cache_dir: the directory the cache entries are stored in
+        :param max_size_bytes: the maximum total size of the cache entries
+        """
+        if max_size_bytes <= 0:
+            raise ValueError(
+                f"Max size must be positive, max_size_bytes={max_size_bytes}"
+            )
+
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self.fingerprints_path = os.path.join(cache_dir, FINGERPRINTS_FILE_NAME)
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.fingerprints = self.__load_fingerprints()
+
+    def __load_fingerprints(self) -> Dict[str, list]:
+        try:
+            with open(self.fingerprints_path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def get_file_digest(self, file_path: str, verify: bool = False) -> str:
+        """
+        Returns the sha256 digest of the provided file's content. The digest is reused without reading the file
+        when its size and modification time are unchanged since it was last hashed.
+
+        :param file_path: the path to the file
+        :param verify: whether to always hash the file, ignoring the size and modification time fast path
+        :return: the hex digest of the file's content
+        """
+        absolute_path = os.path.abspath(file_path)
+        stat = os.stat(absolute_path)
+        fingerprint = self.fingerprints.get(absolute_path)
+
+        if (
+            not verify
+            and fingerprint
+            and fingerprint[:2] == [stat.st_size, stat.st_mtime_ns]
+        ):
+            return fingerprint[2]
+
+        sha256 = hashlib.sha256()
+        with open(absolute_path, "rb") as f:
+            while chunk := f.read(HASH_CHUNK_SIZE):
+                sha256.update(chunk)
+        digest = sha256.hexdigest()
+
+        self.fingerprints[absolute_path] = [stat.st_size, stat.st_mtime_ns, digest]
+        write_file_atomically(self.fingerprints_path, json.dumps(self.fingerprints))
+
+        return digest
+
+    def get_entry_key(
+        self,
+        file_path: str,
+        parse_function: Callable,
+        *args,
+        verify: bool = False,
+        **kwargs,
+    ) -> str:
+        """
+        Returns the key of the entry holding the result of parsing the provided file with the provided function.
+
+        :param file_path: the path to the parsed file
+        :param parse_function: the function parsing the file
+        :param args: the extra arguments passed to the parse function after the file path
+        :param verify: whether to fully hash the file instead of trusting its size and modification time
+        :param kwargs: the keyword arguments passed to the parse function, of which UNKEYED_KWARGS are ignored
+        :return: the hex key of the entry
+        """
+        keyed_kwargs = sorted(
+            (name, value)
+            for name, value in kwargs.items()
+            if name not in UNKEYED_KWARGS
+        )
+        key_source = "|".join(
+            (
+                str(CACHE_VERSION),
+                f"{parse_function.__module__}.{parse_function.__qualname__}",
+                repr(args),
+                repr(keyed_kwargs),
+                self.get_file_digest(file_path, verify),
+            )
+        )
+
+        return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+    def __get_entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ENTRY_EXTENSION)
+
+    def get(
+        self,
+        file_path: str,
+        parse_function: Callable,
+        *args,
+        verify: bool = False,
+        **kwargs,
+    ) -> Any:
+        """
+        Returns the cached result of parse_function(file_path, *args, **kwargs) without parsing on a miss.
+
+        :param file_path: the path to the parsed file
+        :param parse_function: the function parsing the file
+        :param args: the extra arguments passed to the parse function after the file path
+        :param verify: whether to fully hash the file instead of trusting its size and modification time
+        :param kwargs: the keyword arguments passed to the parse function
+        :return: the cached result or CACHE_MISS if there is no usable entry
+        """
+        entry_path = self.__get_entry_path(
+            self.get_entry_key(
+                file_path, parse_function, *args, verify=verify, **kwargs
+            )
+        )
+
+        try:
+            with open(entry_path, "rb") as f:
+                result = pickle.load(f)
+        except FileNotFoundError:
+            return CACHE_MISS
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            self.__remove_entry(entry_path)
+            return CACHE_MISS
+
+        try:
+            os.utime(entry_path)
+        except FileNotFoundError:
+            pass
+
+        return result
+
+    def put(
+        self,
+        file_path: str,
+        parse_function: Callable,
+        result: Any,
+        *args,
+        **kwargs,
+    ) -> None:
+        """
+        Caches the result of parse_function(file_path, *args, **kwargs), evicting old entries if needed.
+
+        :param file_path: the path to the parsed file
+        :param parse_function: the function that parsed the file
+        :param result: the parsed result, which must be picklable
+        :param args: the extra arguments passed to the parse function after the file path
+        :param kwargs: the keyword arguments passed to the parse function
+        """
+        entry_path = self.__get_entry_path(
+            self.get_entry_key(file_path, parse_function, *args, **kwargs)
+        )
+        write_file_atomically(entry_path, pickle.dumps(result, protocol=5))
+        self.evict()
+
+    def get_or_parse(
+        self,
+        file_path: str,
+        parse_function: Callable,
+        *args,
+        verify: bool = False,
+        **kwargs,
+    ) -> Any:
+        """
+        Returns the cached result of parse_function(file_path, *args, **kwargs), parsing and caching it on a miss.
+
+        :param file_path: the path to the file to parse
+        :param parse_function: the function parsing the file, its result must be picklable
+        :param args: the extra arguments passed to the parse function after the file path
+        :param verify: whether to fully hash the file instead of trusting its size and modification time
+        :param kwargs: the keyword arguments passed to the parse function
+        :return: the parsed result
+        """
+        result = self.get(file_path, parse_function, *args, verify=verify, **kwargs)
+        if result is not CACHE_MISS:
+            return result
+
+        result = parse_function(file_path, *args, **kwargs)
+        self.put(file_path, parse_function, result, *args, **kwargs)
+
+        return result
+
+    def get_size(self) -> int:
+        """
+        :return: the total size in bytes of the cache entries
+        """
+        return sum(stat.st_size for stat, _ in self.__stat_entries())
+
+    def __get_entry_paths(self):
+        return [
+            entry.path
+            for entry in os.scandir(self.cache_dir)
+            if entry.is_file() and entry.name.endswith(ENTRY_EXTENSION)
+        ]
+
+    def __stat_entries(self) -> List[Tuple[os.stat_result, str]]:
+        """
+        :return: the stat and path of each cache entry, skipping entries removed since the directory was listed
+        """
+        entries = []
+        for path in self.__get_entry_paths():
+            try:
+                entries.append((os.stat(path), path))
+            except FileNotFoundError:
+                pass
+
+        return entries
+
+    @staticmethod
+    def __remove_entry(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def evict(self) -> int:
+        """
+        Removes the least recently used entries until the total size of the cache is within its maximum size.
+
+        :return: the number of removed entries
+        """
+        entries = sorted(
+            self.__stat_entries(),
+            key=lambda stat_and_path: stat_and_path[0].st_mtime_ns,
+        )
+        total_size = sum(stat.st_size for stat, _ in entries)
+
+        num_removed = 0
+        for stat, path in entries:
+            if total_size <= self.max_size_bytes:
+                break
+            self.__remove_entry(path)
+            total_size -= stat.st_size
+            num_removed += 1
+
+        return num_removed
+
+    def clear(self) -> None:
+        """
+        Removes every cache entry and remembered file digest.
+        """
+        for path in self.__get_entry_paths():
+            self.__remove_entry(path)
+
+        self.fingerprints = {}
+        self.__remove_entry(self.fingerprints_path)
+
+    def __repr__(self):
+        return f"ParseCache(cache_dir={self.cache_dir}, max_size_bytes={self.max_size_bytes}, size={self.get_size()})"
+
+
+def get_or_parse(
+    cache: Optional[ParseCache],
+    file_path: str,
+    parse_function: Callable,
+    *args,
+    **kwargs,
+) -> Any:
+    """
+    Parses the provided file through the cache if one is provided, otherwise parses it directly.
+
+    :param cache: the cache to use or None to always parse
+    :param file_path: the path to the file to parse
+    :param parse_function: the function parsing the file
+    :param args: the extra arguments passed to the parse function after the file path
+    :param kwargs: the keyword arguments passed to the parse function
+    :return: the parsed result
+    """
+    if cache is None:
+        return parse_function(file_path, *args, **kwargs)
+
+    return cache.get_or_parse(file_path, parse_function, *args, **kwargs)
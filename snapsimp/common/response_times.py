@@ -0,0 +1,177 @@
+import math
+from datetime import timedelta
+from typing import Dict, List, Sequence
+
+from common.descriptive_stats import ResponseTimeDistribution
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+DEFAULT_RELATIVE_ACCURACY = 0.01
+HISTOGRAM_EDGES = (
+    timedelta(0),
+    timedelta(minutes=1),
+    timedelta(minutes=5),
+    timedelta(minutes=15),
+    timedelta(hours=1),
+    timedelta(hours=6),
+    timedelta(days=1),
+    timedelta(weeks=1),
+)
+
+
+class ResponseTimeSketch:
+    """
+    A streaming summary of response times using constant memory. The count, mean, and standard deviation are tracked
+    exactly with Welford's algorithm, and quantiles are estimated by a logarithmically bucketed sketch whose estimates
+    are within the relative accuracy of the true value. The number of sketch buckets depends only on the range of the
+    values, never on how many values were added.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        """
+        Creates a new empty sketch.
+
+        :param relative_accuracy: the maximum relative error of the quantile estimates
+        """
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.squared_deviations = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.histogram_counts = [0] * len(HISTOGRAM_EDGES)
+
+    def add(self, seconds: float) -> None:
+        """
+        Adds a response time to this sketch.
+
+        :param seconds: the response time in seconds
+        """
+        self.count += 1
+        self.total += seconds
+        delta = seconds - self.mean
+        self.mean += delta / self.count
+        self.squared_deviations += delta * (seconds - self.mean)
+        self.minimum = min(self.minimum, seconds)
+        self.maximum = max(self.maximum, seconds)
+
+        if seconds <= 0:
+            self.zero_count += 1
+        else:
+            bucket = math.ceil(math.log(seconds) / self.log_gamma)
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+        for edge_index in range(len(HISTOGRAM_EDGES) - 1, -1, -1):
+            if seconds >= HISTOGRAM_EDGES[edge_index].total_seconds():
+                self.histogram_counts[edge_index] += 1
+                break
+
+    def quantile(self, quantile: float) -> float:
+        """
+        Returns the estimated value at the provided quantile.
+
+        :param quantile: the quantile between 0 and 1 such as 0.9
+        :return: the estimated response time in seconds at the quantile
+        """
+        if not self.count:
+            raise ValueError("Cannot compute a quantile of an empty sketch")
+
+        rank = quantile * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return max(0.0, self.minimum)
+
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if rank < seen:
+                estimate = 2 * self.gamma**bucket / (self.gamma + 1)
+                return min(max(estimate, self.minimum), self.maximum)
+
+        return self.maximum
+
+    def standard_deviation(self) -> float:
+        """
+        Returns the population standard deviation of the added response times.
+
+        :return: the standard deviation in seconds
+        """
+        return math.sqrt(self.squared_deviations / self.count) if self.count else 0.0
+
+    def to_distribution(
+        self, percentiles: Sequence[int] = DEFAULT_PERCENTILES
+    ) -> ResponseTimeDistribution:
+        """
+        Summarizes this sketch as a ResponseTimeDistribution.
+
+        :param percentiles: the percentiles to estimate such as 50, 90, and 99
+        :return: the distribution of the added response times
+        """
+        if not self.count:
+            raise ValueError("Cannot summarize an empty sketch")
+
+        histogram = []
+        for edge_index, count in enumerate(self.histogram_counts):
+            lower = HISTOGRAM_EDGES[edge_index]
+            upper = (
+                HISTOGRAM_EDGES[edge_index + 1]
+                if edge_index + 1 < len(HISTOGRAM_EDGES)
+                else timedelta.max
+            )
+            histogram.append((lower, upper, count))
+
+        return ResponseTimeDistribution(
+            timedelta(seconds=self.minimum),
+            timedelta(seconds=self.total / self.count),
+            timedelta(seconds=self.maximum),
+            self.count,
+            timedelta(seconds=self.standard_deviation()),
+            {
+                percentile: timedelta(seconds=self.quantile(percentile / 100))
+                for percentile in percentiles
+            },
+            histogram,
+        )
+
+
+def compute_response_time_distributions(
+    snaps_or_chats: List, percentiles: Sequence[int] = DEFAULT_PERCENTILES
+) -> Dict[str, ResponseTimeDistribution]:
+    """
+    Computes the response time distributions of every sender of a time ordered conversation in a single pass.
+
+    The last snap or chat a user sends before the other user takes over is a switching point. A user's response time
+    is the time between two of their consecutive switching points, the same measure used by the conversations'
+    calculate_descriptive_response_stats_of_receiver.
+
+    :param snaps_or_chats: the snaps or chats of a conversation in ascending timestamp order
+    :param percentiles: the percentiles to estimate such as 50, 90, and 99
+    :return: a dictionary of usernames to their response time distributions, users without a response are omitted
+    """
+
+    sketches: Dict[str, ResponseTimeSketch] = {}
+    last_switch_times = {}
+    num_items = len(snaps_or_chats)
+
+    for position, snap_or_chat in enumerate(snaps_or_chats):
+        sender = snap_or_chat.sender
+
+        if position + 1 < num_items and snaps_or_chats[position + 1].sender == sender:
+            continue
+
+        last_switch_time = last_switch_times.get(sender)
+        if last_switch_time is not None:
+            if sender not in sketches:
+                sketches[sender] = ResponseTimeSketch()
+            sketches[sender].add(
+                (snap_or_chat.timestamp - last_switch_time).total_seconds()
+            )
+
+        last_switch_times[sender] = snap_or_chat.timestamp
+
+    return {
+        sender: sketch.to_distribution(percentiles)
+        for sender, sketch in sketches.items()
+    }
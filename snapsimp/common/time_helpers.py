@@ -1,6 +1,42 @@
 from datetime import timedelta
+from functools import lru_cache
 import datetime
-from typing import List
+from typing import Iterable, List, Optional, Tuple
+
+SNAPCHAT_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S %Z"
+__SNAPCHAT_TIMESTAMP_LENGTH = len("YYYY-MM-DD HH:MM:SS UTC")
+__SNAPCHAT_TIMESTAMP_SUFFIX = " UTC"
+__UTC_OFFSET = "+00:00"
+
+
+@lru_cache(maxsize=8192)
+def parse_snapchat_timestamp(timestamp: str) -> datetime.datetime:
+    """
+    Parses a timestamp from a Snapchat export into a timezone aware UTC datetime.
+
+    Snapchat exports always use the fixed 'YYYY-MM-DD HH:MM:SS UTC' layout so the zone name is sliced off
+    and the remainder is converted by the C level datetime.fromisoformat. Any other layout falls back to
+    datetime.strptime with the SNAPCHAT_TIMESTAMP_FORMAT format. Results are cached as many snaps and
+    chats of an export share the same second.
+
+    :param timestamp: the timestamp string such as '2023-07-28 19:42:10 UTC'
+    :return: a timezone aware datetime in UTC
+    """
+
+    if (
+        len(timestamp) == __SNAPCHAT_TIMESTAMP_LENGTH
+        and timestamp.endswith(__SNAPCHAT_TIMESTAMP_SUFFIX)
+        and timestamp[10] == " "
+    ):
+        try:
+            return datetime.datetime.fromisoformat(
+                timestamp[: -len(__SNAPCHAT_TIMESTAMP_SUFFIX)] + __UTC_OFFSET
+            )
+        except ValueError:
+            pass
+
+    parsed = datetime.datetime.strptime(timestamp, SNAPCHAT_TIMESTAMP_FORMAT)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=datetime.timezone.utc)
 
 
 def _daterange(start_date: datetime.date, end_date: datetime.date) -> datetime.date:
@@ -19,6 +55,34 @@ def _daterange(start_date: datetime.date, end_date: datetime.date) -> datetime.d
         current_date += timedelta(days=1)
 
 
+@lru_cache(maxsize=8192)
+def parse_iso_timestamp(timestamp: str) -> datetime.datetime:
+    """
+    Parses an ISO 8601 timestamp, as written by datetime.isoformat when conversations are saved, into a
+    timezone aware datetime with the C level datetime.fromisoformat. Naive timestamps are assumed to be in UTC.
+    Results are cached as many chats of a conversation share the same second.
+
+    :param timestamp: the timestamp string such as '2023-07-28T19:42:10+00:00'
+    :return: a timezone aware datetime
+    """
+    parsed = datetime.datetime.fromisoformat(timestamp)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=datetime.timezone.utc)
+
+
+def format_snapchat_timestamp(timestamp: datetime.datetime) -> str:
+    """
+    Formats a datetime in the layout used by Snapchat exports, the inverse of parse_snapchat_timestamp.
+    Timestamps in this layout sort lexicographically in time order.
+
+    :param timestamp: the datetime to format, naive datetimes are assumed to be in UTC
+    :return: the timestamp string such as '2023-07-28 19:42:10 UTC'
+    """
+    if timestamp.tzinfo:
+        timestamp = timestamp.astimezone(datetime.timezone.utc)
+
+    return timestamp.strftime("%Y-%m-%d %H:%M:%S") + __SNAPCHAT_TIMESTAMP_SUFFIX
+
+
 def generate_ordered_date_range(
     min_date: datetime.date, max_date: datetime.date, ascending=True
 ) -> List[datetime.date]:
@@ -32,7 +96,176 @@ def generate_ordered_date_range(
     :return: a list of dates between the start and end date, ordered according to the 'ascending' parameter
     """
 
-    all_days = set(_daterange(min_date, max_date))
-    all_days_list = list(all_days)
-    all_days_sorted = sorted(all_days_list, reverse=(not ascending))
-    return all_days_sorted
+    all_days = list(_daterange(min_date, max_date))
+    if not ascending:
+        all_days.reverse()
+    return all_days
+
+
+class DayBitmap:
+    """
+    A bitmap of the days between a first and last day, inclusive, with one byte per day keyed by the day's ordinal.
+    Presence, gap, streak, and run queries scan the bitmap with bytes level searches instead of building sets of
+    dates. Bitmaps of several users may share the same bounds, such as the date range of an entire account, so
+    their results line up with one another.
+    """
+
+    __PRESENT = b"\x01"
+    __MISSING = b"\x00"
+
+    def __init__(self, first_day: datetime.date, last_day: datetime.date):
+        """
+        Creates a new bitmap with every day between the first and last day marked as missing.
+
+        :param first_day: the first day (inclusive) covered by the bitmap
+        :param last_day: the last day (inclusive) covered by the bitmap
+        """
+        if first_day > last_day:
+            raise ValueError(
+                f"First day must not be after the last day, first={first_day}, last={last_day}"
+            )
+
+        self.first_ordinal = first_day.toordinal()
+        self.days = bytearray(last_day.toordinal() - self.first_ordinal + 1)
+
+    @classmethod
+    def from_dates(
+        cls,
+        dates: Iterable[datetime.date],
+        first_day: Optional[datetime.date] = None,
+        last_day: Optional[datetime.date] = None,
+    ) -> "DayBitmap":
+        """
+        Creates a new bitmap with the provided dates marked as present.
+
+        :param dates: the dates to mark as present, which must be within the provided bounds
+        :param first_day: the first day of the bitmap, the earliest date by default
+        :param last_day: the last day of the bitmap, the latest date by default
+        :return: the new bitmap
+        """
+        dates = set(dates)
+
+        bitmap = cls(first_day or min(dates), last_day or max(dates))
+        for day in dates:
+            bitmap.add(day)
+
+        return bitmap
+
+    def add(self, day: datetime.date) -> None:
+        """
+        Marks the provided day as present.
+
+        :param day: the day to mark, which must be within the bitmap's bounds
+        """
+        offset = day.toordinal() - self.first_ordinal
+        if not 0 <= offset < len(self.days):
+            raise ValueError(f"{day} is outside of the bitmap's bounds")
+
+        self.days[offset] = 1
+
+    def __contains__(self, day: datetime.date) -> bool:
+        offset = day.toordinal() - self.first_ordinal
+        return 0 <= offset < len(self.days) and self.days[offset] == 1
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def get_first_day(self) -> datetime.date:
+        """
+        :return: the first day covered by this bitmap
+        """
+        return datetime.date.fromordinal(self.first_ordinal)
+
+    def get_last_day(self) -> datetime.date:
+        """
+        :return: the last day covered by this bitmap
+        """
+        return datetime.date.fromordinal(self.first_ordinal + len(self.days) - 1)
+
+    def get_num_present_days(self) -> int:
+        """
+        :return: the number of days marked as present
+        """
+        return self.days.count(self.__PRESENT)
+
+    def get_present_days(self) -> List[datetime.date]:
+        """
+        :return: the ascending days marked as present
+        """
+        return self.__get_days(self.__PRESENT)
+
+    def get_missing_days(self) -> List[datetime.date]:
+        """
+        :return: the ascending days not marked as present
+        """
+        return self.__get_days(self.__MISSING)
+
+    def __get_days(self, value: bytes) -> List[datetime.date]:
+        return [
+            datetime.date.fromordinal(self.first_ordinal + offset)
+            for start, end in self.__get_offset_runs(value)
+            for offset in range(start, end)
+        ]
+
+    def __get_offset_runs(self, value: bytes) -> List[Tuple[int, int]]:
+        """
+        Returns the half open offset ranges of the consecutive days holding the provided value.
+        """
+        other = self.__MISSING if value == self.__PRESENT else self.__PRESENT
+        runs = []
+        start = self.days.find(value)
+
+        while start != -1:
+            end = self.days.find(other, start)
+            if end == -1:
+                end = len(self.days)
+            runs.append((start, end))
+            start = self.days.find(value, end)
+
+        return runs
+
+    def get_runs(
+        self, present: bool = True
+    ) -> List[Tuple[datetime.date, datetime.date]]:
+        """
+        Returns the runs of consecutive present, or missing, days.
+
+        :param present: whether to return the runs of present days, otherwise the runs of missing days
+        :return: the ascending first and last day (inclusive) of each run
+        """
+        return [
+            (
+                datetime.date.fromordinal(self.first_ordinal + start),
+                datetime.date.fromordinal(self.first_ordinal + end - 1),
+            )
+            for start, end in self.__get_offset_runs(
+                self.__PRESENT if present else self.__MISSING
+            )
+        ]
+
+    def get_longest_streak(self) -> int:
+        """
+        :return: the number of days of the longest run of consecutive present days
+        """
+        return max(
+            (end - start for start, end in self.__get_offset_runs(self.__PRESENT)),
+            default=0,
+        )
+
+    def get_longest_gap(self) -> int:
+        """
+        :return: the number of days of the longest run of consecutive missing days
+        """
+        return max(
+            (end - start for start, end in self.__get_offset_runs(self.__MISSING)),
+            default=0,
+        )
+
+    def get_current_streak(self) -> int:
+        """
+        :return: the number of consecutive present days ending on the bitmap's last day
+        """
+        return len(self.days) - self.days.rfind(self.__MISSING) - 1
+
+    def __repr__(self):
+        return f"DayBitmap(first_day={self.get_first_day()}, last_day={self.get_last_day()}, num_present_days={self.get_num_present_days()})"
@@ -1,16 +1,26 @@
 import argparse
-from soup.snap_history_parsing import extract_snap_history
-from soup.account_parsing import parse_all
-from soup.chat_history_parsing import extract_chat_history
-from chats.conversation_generator import generate_and_save_all_conversations
-from argparse import ArgumentParser
+import os
+import sys
+import time
+from argparse import ArgumentParser, Namespace
+from typing import List, Optional
 
+from soup.parser_backend import ParserBackend
+from common.parse_cache import DEFAULT_CACHE_DIR, ParseCache, get_or_parse
+from common.columnar_backend import ColumnarBackend
 
-def parse_args() -> ArgumentParser:
+# Only light modules are imported here so printing help, or a parse served from the cache, starts without
+# importing BeautifulSoup and the analysis modules. Each command imports the modules it needs when it runs.
+
+COMMANDS = ("parse", "conversations", "stats", "export")
+DEFAULT_COMMAND = "conversations"
+
+
+def __create_export_arguments_parser() -> ArgumentParser:
     """
-    Parses the command line arguments to this python program and returns an argparse instance.
+    Returns a parser of the arguments locating and parsing a single export, shared by every command.
     """
-    parser = argparse.ArgumentParser(description="A parser for Snapchat data exports")
+    parser = argparse.ArgumentParser(add_help=False)
     parser.add_argument(
         "-shf",
         "--snap-history-file",
@@ -29,31 +39,332 @@ def parse_args() -> ArgumentParser:
         help="The path to the Snapchat account HTML file",
         default="html/account.html",
     )
+    parser.add_argument(
+        "-cw",
+        "--chat-workers",
+        help="The number of processes the chat history file is split across while parsing, not split by default",
+        type=int,
+        default=None,
+    )
+    parser.add_argument(
+        "-pb",
+        "--parser-backend",
+        help="The parser used for the export files, auto uses lxml if installed and html.parser otherwise",
+        choices=[backend.value for backend in ParserBackend],
+        default=ParserBackend.AUTO.value,
+    )
+    parser.add_argument(
+        "-es",
+        "--event-store",
+        help="The path to a SQLite event store the snap and chat histories are incrementally ingested into and then read from",
+        default=None,
+    )
+    parser.add_argument(
+        "-nc",
+        "--no-cache",
+        help="Always parse the export files instead of reading previously parsed results from the cache",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-cd",
+        "--cache-dir",
+        help="The directory previously parsed export files are cached in",
+        default=DEFAULT_CACHE_DIR,
+    )
 
-    return parser.parse_args()
+    return parser
 
 
-def main():
-    args = parse_args()
+def parse_args(argv: Optional[List[str]] = None) -> Namespace:
+    """
+    Parses the command line arguments to this python program and returns an argparse namespace.
+    Arguments without a command run the conversations command, as snap simp did before it had commands.
+
+    :param argv: the arguments to parse, sys.argv by default
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS + ("-h", "--help"):
+        argv = [DEFAULT_COMMAND] + argv
+
+    export_arguments_parser = __create_export_arguments_parser()
+    parser = argparse.ArgumentParser(description="A parser for Snapchat data exports")
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
 
-    basic_user_info, device_information, device_history, login_history = parse_all(
-        args.account_file
+    subparsers.add_parser(
+        "parse",
+        parents=[export_arguments_parser],
+        help="Parse an export, filling the parse cache, and print what was parsed",
     )
 
-    received_snaps, sent_snaps = extract_snap_history(
-        args.snap_history_file, basic_user_info.username
+    conversations_parser = subparsers.add_parser(
+        "conversations",
+        parents=[export_arguments_parser],
+        help="Save the chat conversations of an export, or of a batch of exports, as JSON or JSON Lines (the default command)",
+    )
+    conversations_parser.add_argument(
+        "-ew",
+        "--export-workers",
+        help="The number of processes used to save conversations, one per core by default",
+        type=int,
+        default=None,
+    )
+    conversations_parser.add_argument(
+        "-cf",
+        "--conversations-folder",
+        help="The folder the conversations of a single export are saved to",
+        default="all-chat-conversations",
+    )
+    conversations_parser.add_argument(
+        "-ff",
+        "--file-format",
+        help="The format conversations are saved in, jsonl streams one chat per line and jsonl.gz also compresses it",
+        choices=["json", "jsonl", "jsonl.gz"],
+        default="json",
+    )
+    conversations_parser.add_argument(
+        "-b",
+        "--batch",
+        help="A folder of export folders or a manifest file listing one export folder per line to process instead of a single export",
+        default=None,
+    )
+    conversations_parser.add_argument(
+        "-of",
+        "--output-folder",
+        help="The folder each account's results and the summary of a batch are saved under",
+        default="batch-output",
+    )
+    conversations_parser.add_argument(
+        "-bw",
+        "--batch-workers",
+        help="The number of exports of a batch processed at once, one per core by default",
+        type=int,
+        default=None,
     )
-    all_snaps = received_snaps + sent_snaps
 
-    received_chats, sent_chats = extract_chat_history(
-        args.chat_history_file, basic_user_info.username
+    stats_parser = subparsers.add_parser(
+        "stats",
+        parents=[export_arguments_parser],
+        help="Print summary statistics of the snaps and chats of an export",
+    )
+    stats_parser.add_argument(
+        "-k",
+        "--top",
+        help="The number of top senders and receivers to print",
+        type=int,
+        default=5,
     )
-    all_chats = received_chats + sent_chats
 
-    our_conversation = generate_and_save_all_conversations(
-        basic_user_info.username, sent_chats, received_chats, "all-chat-conversations"
+    export_parser = subparsers.add_parser(
+        "export",
+        parents=[export_arguments_parser],
+        help="Save the parsed snap and chat histories of an export to files",
+    )
+    export_parser.add_argument(
+        "-of",
+        "--output-folder",
+        help="The folder the snap and chat histories are saved to",
+        default="export",
+    )
+    export_parser.add_argument(
+        "-f",
+        "--format",
+        help="json saves the snap and chat histories as JSON, columnar saves the snaps, chats, and logins as columnar binary files",
+        choices=["json", "columnar"],
+        default="json",
+    )
+    export_parser.add_argument(
+        "-cb",
+        "--columnar-backend",
+        help="The columnar file format, auto writes Arrow IPC files if pyarrow is installed and packed column files otherwise",
+        choices=[backend.value for backend in ColumnarBackend],
+        default=ColumnarBackend.AUTO.value,
     )
 
+    args = parser.parse_args(argv)
+
+    if args.command == "conversations" and args.batch:
+        # Exports of a batch are each parsed and saved serially in their own process
+        if args.export_workers is not None:
+            conversations_parser.error("--export-workers cannot be used with --batch")
+        if args.chat_workers is not None:
+            conversations_parser.error("--chat-workers cannot be used with --batch")
+
+    return args
+
+
+def load_export(args: Namespace):
+    """
+    Parses the export located by the provided arguments, through the parse cache and event store if enabled.
+
+    :param args: the parsed command line arguments
+    :return: the ParsedExport
+    """
+    from soup.export_parsing import ParsedExport, parse_export_concurrently
+
+    cache = None if args.no_cache else ParseCache(args.cache_dir)
+    backend = ParserBackend(args.parser_backend)
+
+    if not args.event_store:
+        return parse_export_concurrently(
+            args.account_file,
+            args.snap_history_file,
+            args.chat_history_file,
+            cache,
+            args.chat_workers,
+            backend,
+        )
+
+    from common.event_store import EventStore
+    from soup.account_parsing import parse_all
+
+    start_time = time.perf_counter()
+    account = get_or_parse(cache, args.account_file, parse_all, backend=backend)
+    account_seconds = time.perf_counter() - start_time
+    username = account[0].username
+
+    start_time = time.perf_counter()
+    with EventStore(args.event_store) as event_store:
+        num_new_snaps = event_store.ingest_snap_history(
+            args.snap_history_file, username
+        )
+        num_new_chats = event_store.ingest_chat_history(
+            args.chat_history_file, username
+        )
+        print(
+            f"Ingested {num_new_snaps} new snaps and {num_new_chats} new chats into {args.event_store}"
+        )
+
+        snap_history = event_store.get_snaps(username)
+        chat_history = event_store.get_chats(username)
+
+    return ParsedExport(
+        account,
+        snap_history,
+        chat_history,
+        {"account": account_seconds, "event store": time.perf_counter() - start_time},
+    )
+
+
+def __run_parse(args: Namespace) -> None:
+    parsed_export = load_export(args)
+    print(parsed_export)
+    print(f"Parsing stage timings: {parsed_export.format_stage_timings()}")
+
+
+def __run_conversations(args: Namespace) -> None:
+    from chats.conversation_file_format import ConversationFileFormat
+
+    if args.batch:
+        from common.batch_processing import (
+            find_export_folders,
+            format_summary,
+            process_exports,
+        )
+
+        results = process_exports(
+            find_export_folders(args.batch),
+            args.output_folder,
+            args.batch_workers,
+            ParserBackend(args.parser_backend),
+            None if args.no_cache else ParseCache(args.cache_dir),
+            ConversationFileFormat(args.file_format),
+        )
+        print(format_summary(results))
+        return
+
+    from chats.conversation_generator import generate_and_save_all_conversations
+
+    parsed_export = load_export(args)
+    start_time = time.perf_counter()
+    num_conversations = generate_and_save_all_conversations(
+        parsed_export.basic_user_info.username,
+        parsed_export.sent_chats,
+        parsed_export.received_chats,
+        args.conversations_folder,
+        args.export_workers,
+        ConversationFileFormat(args.file_format),
+    )
+    print(
+        f"Saved {num_conversations} conversations to {args.conversations_folder} in "
+        f"{time.perf_counter() - start_time:.2f}s"
+    )
+    print(f"Parsing stage timings: {parsed_export.format_stage_timings()}")
+
+
+def __format_top_users(top_users) -> str:
+    return ", ".join(f"{username} ({count})" for username, count in top_users)
+
+
+def __run_stats(args: Namespace) -> None:
+    from snaps.statistics import top_k_receivers, top_k_senders
+
+    parsed_export = load_export(args)
+    print(f"Account: {parsed_export.basic_user_info.username}")
+
+    for label, received, sent in (
+        ("Snaps", parsed_export.received_snaps, parsed_export.sent_snaps),
+        ("Chats", parsed_export.received_chats, parsed_export.sent_chats),
+    ):
+        print(f"{label}: {len(received)} received, {len(sent)} sent")
+
+        snaps_or_chats = received + sent
+        if not snaps_or_chats:
+            continue
+
+        timestamps = [snap_or_chat.timestamp for snap_or_chat in snaps_or_chats]
+        print(f"  From {min(timestamps)} to {max(timestamps)}")
+        print(
+            f"  Top senders: {__format_top_users(top_k_senders(snaps_or_chats, args.top))}"
+        )
+        print(
+            f"  Top receivers: {__format_top_users(top_k_receivers(snaps_or_chats, args.top))}"
+        )
+
+
+def __run_export(args: Namespace) -> None:
+    parsed_export = load_export(args)
+
+    if args.format == "columnar":
+        from common.columnar_export import write_columnar_export
+
+        file_paths = write_columnar_export(
+            args.output_folder,
+            parsed_export.basic_user_info.username,
+            parsed_export.received_snaps + parsed_export.sent_snaps,
+            parsed_export.received_chats + parsed_export.sent_chats,
+            parsed_export.login_history,
+            ColumnarBackend(args.columnar_backend),
+        )
+        print(f"Saved {', '.join(file_paths)}")
+        return
+
+    from common.history_export import write_history_json
+
+    os.makedirs(args.output_folder, exist_ok=True)
+
+    snap_history_path = os.path.join(args.output_folder, "snap_history.json")
+    chat_history_path = os.path.join(args.output_folder, "chat_history.json")
+    write_history_json(
+        snap_history_path, parsed_export.received_snaps, parsed_export.sent_snaps
+    )
+    write_history_json(
+        chat_history_path, parsed_export.received_chats, parsed_export.sent_chats
+    )
+    print(f"Saved {snap_history_path} and {chat_history_path}")
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+
+    if args.command == "parse":
+        __run_parse(args)
+    elif args.command == "stats":
+        __run_stats(args)
+    elif args.command == "export":
+        __run_export(args)
+    else:
+        __run_conversations(args)
+
     print("End Program")
 
 
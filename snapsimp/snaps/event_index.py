@@ -0,0 +1,115 @@
+from collections import Counter
+from typing import Dict, List, Tuple
+from snaps.snap import Snap
+from chats.chat import Chat
+
+
+class EventIndex:
+    """
+    An index over a list of snaps or chats mapping each sender and receiver to the ascending positions of their
+    snaps or chats within the list. The index is built in a single pass so lookups by user are answered in time
+    proportional to the result rather than the size of the list. The indexed list must not be mutated afterwards.
+    """
+
+    def __init__(self, snaps_or_chats: List[Snap | Chat]):
+        """
+        Builds a new EventIndex over the provided list.
+
+        :param snaps_or_chats: the list of snaps or chats to index
+        """
+        self.snaps_or_chats = snaps_or_chats
+        self.sender_positions: Dict[str, List[int]] = {}
+        self.receiver_positions: Dict[str, List[int]] = {}
+
+        for position, snap_or_chat in enumerate(snaps_or_chats):
+            self.sender_positions.setdefault(snap_or_chat.sender, []).append(position)
+            self.receiver_positions.setdefault(snap_or_chat.receiver, []).append(
+                position
+            )
+
+        self.sender_counts = Counter(
+            {
+                username: len(positions)
+                for username, positions in self.sender_positions.items()
+            }
+        )
+        self.receiver_counts = Counter(
+            {
+                username: len(positions)
+                for username, positions in self.receiver_positions.items()
+            }
+        )
+        self.__top_senders: Dict[int, List[Tuple[str, int]]] = {}
+        self.__top_receivers: Dict[int, List[Tuple[str, int]]] = {}
+
+    def get_by_sender(self, username: str) -> List[Snap | Chat]:
+        """
+        Returns the snaps or chats sent by the provided user in their original order.
+
+        :param username: the username of the sender
+        :return: a list of the snaps or chats sent by the user
+        """
+        return [
+            self.snaps_or_chats[position]
+            for position in self.sender_positions.get(username, [])
+        ]
+
+    def get_by_receiver(self, username: str) -> List[Snap | Chat]:
+        """
+        Returns the snaps or chats received by the provided user in their original order.
+
+        :param username: the username of the receiver
+        :return: a list of the snaps or chats received by the user
+        """
+        return [
+            self.snaps_or_chats[position]
+            for position in self.receiver_positions.get(username, [])
+        ]
+
+    def get_sender_count(self, username: str) -> int:
+        """
+        Returns the number of snaps or chats sent by the provided user.
+
+        :param username: the username of the sender
+        :return: the number of snaps or chats sent by the user
+        """
+        return self.sender_counts.get(username, 0)
+
+    def get_receiver_count(self, username: str) -> int:
+        """
+        Returns the number of snaps or chats received by the provided user.
+
+        :param username: the username of the receiver
+        :return: the number of snaps or chats received by the user
+        """
+        return self.receiver_counts.get(username, 0)
+
+    def get_top_senders(self, k: int) -> List[Tuple[str, int]]:
+        """
+        Returns the k users who sent the most snaps or chats, memoized per k.
+
+        :param k: the number of users to return
+        :return: a list of username and count pairs ordered from the most to the fewest sent
+        """
+        if k not in self.__top_senders:
+            self.__top_senders[k] = self.sender_counts.most_common(k)
+
+        return list(self.__top_senders[k])
+
+    def get_top_receivers(self, k: int) -> List[Tuple[str, int]]:
+        """
+        Returns the k users who received the most snaps or chats, memoized per k.
+
+        :param k: the number of users to return
+        :return: a list of username and count pairs ordered from the most to the fewest received
+        """
+        if k not in self.__top_receivers:
+            self.__top_receivers[k] = self.receiver_counts.most_common(k)
+
+        return list(self.__top_receivers[k])
+
+    def __len__(self) -> int:
+        return len(self.snaps_or_chats)
+
+    def __repr__(self):
+        return f"EventIndex(num_events={len(self)}, num_senders={len(self.sender_counts)}, num_receivers={len(self.receiver_counts)})"
@@ -1,22 +1,29 @@
-from typing import List, Set, Tuple
+from typing import List, Optional, Set, Tuple
 from snaps.snap import Snap
 import snaps.statistics as stats
 from snaps.snap_type import SnapType
 from chats.chat import Chat
 from chats.chat_type import ChatType
+from snaps.event_index import EventIndex
 
 
 def get_by_sending_user(
-    snaps_or_chats: List[Snap | Chat], username: str
+    snaps_or_chats: List[Snap | Chat],
+    username: str,
+    index: Optional[EventIndex] = None,
 ) -> List[Snap | Chat]:
     """
     Returns all snaps or chats sent by a specific user from the given list.
 
     :param snaps_or_chats: the list of Snap or Chat objects to analyze
     :param username: the username of the sender
+    :param index: an optional EventIndex over the list whose positions of each sender are looked up instead of filtering the list
     :return: a list of Snap or Chat objects sent by the specified user
     """
 
+    if index:
+        return index.get_by_sender(username)
+
     return [
         snap_or_chat
         for snap_or_chat in snaps_or_chats
@@ -25,16 +32,22 @@ def get_by_sending_user(
 
 
 def get_by_receiving_user(
-    snaps_or_chats: List[Snap | Chat], username: str
+    snaps_or_chats: List[Snap | Chat],
+    username: str,
+    index: Optional[EventIndex] = None,
 ) -> List[Snap | Chat]:
     """
     Returns all snaps or chats received by a specific user from the given list.
 
     :param snaps_or_chats: the list of Snap or Chat objects to analyze
     :param username: the username of the receiver
+    :param index: an optional EventIndex over the list whose positions of each receiver are looked up instead of filtering the list
     :return: a list of Snap or Chat objects received by the specified user
     """
 
+    if index:
+        return index.get_by_receiver(username)
+
     return [
         snap_or_chat
         for snap_or_chat in snaps_or_chats
@@ -42,52 +55,70 @@ def get_by_receiving_user(
     ]
 
 
-def get_top_sender_username(snaps_or_chats: List[Snap | Chat]) -> str:
+def get_top_sender_username(
+    snaps_or_chats: List[Snap | Chat], index: Optional[EventIndex] = None
+) -> str:
     """
     Returns the username of the person whos name appears on the most snaps or chats of the provided list.
 
     :param snaps_or_chats: the list of snaps or chats
+    :param index: an optional EventIndex over the list whose memoized top sender is used instead of counting the list
     :return: the username of the person who sends/receives the most snaps or chats to/from you
     """
 
-    sorted_sender_username_dict, _ = stats.get_count(snaps_or_chats)
-    return next(iter(sorted_sender_username_dict))
+    top_senders = stats.top_k_senders(snaps_or_chats, 1, index)
+    return top_senders[0][0]
 
 
-def get_top_receiver_username(snaps: List[Snap]) -> str:
+def get_top_receiver_username(
+    snaps: List[Snap], index: Optional[EventIndex] = None
+) -> str:
     """
     Returns the username of the person whos name appears on the most snaps of the provided list.
 
     :param snaps: the list of snaps
+    :param index: an optional EventIndex over the snaps whose memoized top receiver is used instead of counting the list
     :return: the username of the person who sends/receives the most snaps to/from you
     """
 
-    _, sorted_receiver_username_dict = stats.get_count(snaps)
-    return next(iter(sorted_receiver_username_dict))
+    top_receivers = stats.top_k_receivers(snaps, 1, index)
+    return top_receivers[0][0]
 
 
-def get_by_top_sender(snaps_or_chats: List[Snap | Chat]) -> List[Snap | Chat]:
+def get_by_top_sender(
+    snaps_or_chats: List[Snap | Chat], index: Optional[EventIndex] = None
+) -> List[Snap | Chat]:
     """
     Returns a subset of the provided list of snaps or chats containing only the snaps or chats from the top sender
 
     :param snaps_or_chats: the list of snaps or chats
+    :param index: an optional EventIndex over the list used to find the top sender and look up their snaps or chats, built once here when not provided
     :return: a list of snaps containing the snaps or chats from the top sender
     """
 
-    top_sender = get_top_sender_username(snaps_or_chats)
-    return get_by_sending_user(snaps_or_chats, top_sender)
+    if index is None:
+        index = EventIndex(snaps_or_chats)
 
+    top_sender = get_top_sender_username(snaps_or_chats, index)
+    return get_by_sending_user(snaps_or_chats, top_sender, index)
 
-def get_by_top_receiver(snaps: List[Snap | Chat]) -> List[Snap | Chat]:
+
+def get_by_top_receiver(
+    snaps: List[Snap | Chat], index: Optional[EventIndex] = None
+) -> List[Snap | Chat]:
     """
     Returns a subset of the provided list of snaps or chats containing only the snaps or chats to the top receiver
 
     :param snaps: the list of snaps or chats
+    :param index: an optional EventIndex over the list used to find the top receiver and look up their snaps or chats, built once here when not provided
     :return: a list of snaps or chats containing the snaps or chats to the top receiver
     """
 
-    top_receiver = get_top_receiver_username(snaps)
-    return get_by_receiving_user(snaps, top_receiver)
+    if index is None:
+        index = EventIndex(snaps)
+
+    top_receiver = get_top_receiver_username(snaps, index)
+    return get_by_receiving_user(snaps, top_receiver, index)
 
 
 def filter_snaps_by_type(snaps: List[Snap]) -> Tuple[List[Snap], List[Snap]]:
@@ -113,7 +144,7 @@ def filter_chats_by_type(chats: List[Chat]) -> Tuple[List[Chat], List[Chat]]:
     """
 
     text_chats = [chat for chat in chats if chat.type == ChatType.TEXT]
-    media_chats = [chat for chat in chats if chats.type == ChatType.MEDIA]
+    media_chats = [chat for chat in chats if chat.type == ChatType.MEDIA]
 
     return text_chats, media_chats
 
@@ -0,0 +1,37 @@
+from typing import Iterable
+
+from common.event_table import EventRow, EventTable
+from snaps.snap import Snap
+from snaps.snap_type import SnapType
+
+
+class SnapRow(EventRow):
+    """
+    A zero-copy view of a single snap stored within a SnapTable. It quacks like a Snap.
+    """
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return f"Snap(sender='{self.sender}', receiver='{self.receiver}', type='{self.type}', timestamp='{self.timestamp}')"
+
+
+class SnapTable(EventTable):
+    """
+    A columnar container of snaps, storing millions of snaps at 17 bytes per snap. Iterating or indexing
+    the table yields SnapRow views which may be passed anywhere a Snap is expected by the filtering and
+    statistics functions.
+    """
+
+    EVENT_TYPES = list(SnapType)
+    ROW_CLASS = SnapRow
+
+    @classmethod
+    def from_snaps(cls, snaps: Iterable[Snap]) -> "SnapTable":
+        """
+        Creates a new SnapTable containing the provided snaps.
+
+        :param snaps: the snaps to store
+        :return: the new SnapTable
+        """
+        return cls.from_events(snaps)
@@ -1,11 +1,21 @@
 from datetime import timedelta
 import datetime
-from statistics import mean
-from typing import List, Set
+import json
+from typing import Dict, List, Optional, Set
 from collections import Counter
 
 from snaps.snap import Snap
-from common.descriptive_stats import DescriptiveStatsTimedelta
+from common.descriptive_stats import (
+    DescriptiveStatsTimedelta,
+    ResponseTimeDistribution,
+)
+from common.response_times import compute_response_time_distributions
+from common.json_constants import (
+    INDENT,
+    SNAP_CONVERSATION_FORMAT,
+    SNAP_CONVERSATION_VERSION,
+)
+from common.time_helpers import parse_iso_timestamp
 
 
 class SnapchatSnapConversation:
@@ -13,20 +23,33 @@ class SnapchatSnapConversation:
     A snapchat snap conversation stores a list of snaps between two users for a designated period of time.
     """
 
-    def __init__(self, snaps: List[Snap]):
+    def __init__(
+        self,
+        snaps: List[Snap],
+        is_sorted: bool = False,
+        users: Optional[Set[str]] = None,
+    ):
         """
         Initializes a SnapchatSnapConversation instance.
 
         :param snaps: the list of Snap objects for this conversation.
         It is expected that this list contains snaps between two and only two users
+        :param is_sorted: whether the snaps are already in ascending timestamp order, skipping the sort
+        :param users: the users of this conversation if already known, such as from the header of a saved
+        conversation, skipping the pass over the snaps that collects and validates them
         """
-        sending_users = {snap.sender for snap in snaps}
-        receiving_users = {snap.receiver for snap in snaps}
+        if users is None:
+            sending_users = {snap.sender for snap in snaps}
+            receiving_users = {snap.receiver for snap in snaps}
 
-        self.__check_initialization_constraints(sending_users, receiving_users)
+            self.__check_initialization_constraints(sending_users, receiving_users)
+            users = sending_users
 
-        self.snaps = sorted(snaps, key=lambda snap: snap.timestamp)
-        self.users = sending_users
+        self.snaps = (
+            list(snaps) if is_sorted else sorted(snaps, key=lambda snap: snap.timestamp)
+        )
+        self.__response_time_distributions = None
+        self.users = set(users)
 
     def __check_initialization_constraints(
         self, sending_users: Set[str], receiving_users: Set[str]
@@ -186,19 +209,23 @@ class SnapchatSnapConversation:
         received_snaps_by_user = self.get_received_snaps_by_user(username)
         return len(received_snaps_by_user) if received_snaps_by_user else 0
 
-    def __get_switching_snaps(self) -> List[Snap]:
-        switching_snaps = []
-
-        for i in range(len(self.snaps) - 1):
-            current_snap = self.snaps[i]
-            next_snap = self.snaps[i + 1]
+    def calculate_response_time_distributions(
+        self,
+    ) -> Dict[str, ResponseTimeDistribution]:
+        """
+        Computes and returns the response time distributions of both users in a single pass over this conversation.
+        Besides the minimum, average, and maximum, each distribution holds the standard deviation, the 50th, 90th,
+        and 99th percentiles, and a histogram. The result is cached on this conversation.
 
-            if current_snap.sender != next_snap.sender:
-                switching_snaps.append(current_snap)
+        :return: a dictionary of usernames to their response time distributions, users without a response are omitted
+        """
 
-        switching_snaps.append(self.snaps[-1])
+        if self.__response_time_distributions is None:
+            self.__response_time_distributions = compute_response_time_distributions(
+                self.snaps
+            )
 
-        return switching_snaps
+        return self.__response_time_distributions
 
     def calculate_descriptive_response_stats_of_receiver(
         self, receiver: str
@@ -213,26 +240,96 @@ class SnapchatSnapConversation:
         if receiver not in self.users:
             raise AssertionError(f"{receiver} should be in list of users: {self.users}")
 
-        latest_snaps_before_sender_switch = self.__get_switching_snaps()
+        distribution = self.calculate_response_time_distributions().get(receiver)
+
+        if distribution is None:
+            raise ValueError(f"{receiver} has not responded within this conversation")
+
+        return DescriptiveStatsTimedelta(
+            distribution.minimum, distribution.average, distribution.maximum
+        )
+
+    def to_json_dict(self) -> dict:
+        """
+        Returns this snap conversation as a dictionary of JSON primitives. The format and version header marks
+        the snaps as sorted and between the listed users, so from_json_dict can trust them.
+
+        :return: a dictionary containing the format, version, users, and snaps of this conversation
+        """
+
+        snaps_list = [
+            {
+                "sender": snap.sender,
+                "receiver": snap.receiver,
+                "type": snap.type.value,
+                "timestamp": snap.timestamp.isoformat(),
+            }
+            for snap in self.snaps
+        ]
+
+        return {
+            "format": SNAP_CONVERSATION_FORMAT,
+            "version": SNAP_CONVERSATION_VERSION,
+            "users": list(self.users),
+            "snaps": snaps_list,
+        }
+
+    def to_json(self, file_path):
+        """
+        Saves the snap conversation to a JSON file.
+
+        :param file_path: the path to the JSON file
+        """
+
+        with open(file_path, "w") as f:
+            json.dump(self.to_json_dict(), f, indent=INDENT)
+
+    @classmethod
+    def from_json_dict(cls, json_dict: dict) -> "SnapchatSnapConversation":
+        """
+        Creates a snap conversation from a dictionary returned by to_json_dict. Dictionaries carrying the format
+        and version header skip the sort and the validation of their users.
+
+        :param json_dict: the dictionary containing the users and snaps of the conversation
+        :return: the snap conversation
+        """
 
-        # Extract the timestamps of snaps sent by the receiver
-        receiver_snap_times = [
-            snap.timestamp
-            for snap in latest_snaps_before_sender_switch
-            if snap.sender == receiver
+        is_trusted = "format" in json_dict
+        if is_trusted and (
+            json_dict["format"] != SNAP_CONVERSATION_FORMAT
+            or json_dict.get("version") != SNAP_CONVERSATION_VERSION
+        ):
+            raise ValueError(
+                f"Unsupported snap conversation format {json_dict['format']} version {json_dict.get('version')}"
+            )
+
+        snaps = [
+            Snap(
+                snap["sender"],
+                snap["receiver"],
+                snap["type"],
+                parse_iso_timestamp(snap["timestamp"]),
+            )
+            for snap in json_dict["snaps"]
         ]
-        # Pair each snap time with the next one (if it exists)
-        paired_snap_times = list(zip(receiver_snap_times, receiver_snap_times[1:]))
-        # Compute the time differences
-        awaiting_response_times = [(t2 - t1) for t1, t2 in paired_snap_times]
-
-        min_diff = min(awaiting_response_times)
-        max_diff = max(awaiting_response_times)
-        avg_diff = timedelta(
-            seconds=mean([diff.total_seconds() for diff in awaiting_response_times])
+
+        return cls(
+            snaps,
+            is_sorted=is_trusted,
+            users=set(json_dict["users"]) if is_trusted else None,
         )
 
-        return DescriptiveStatsTimedelta(min_diff, avg_diff, max_diff)
+    @classmethod
+    def from_json(cls, file_path: str) -> "SnapchatSnapConversation":
+        """
+        Loads a snap conversation saved by to_json.
+
+        :param file_path: the path to the JSON file
+        :return: the snap conversation
+        """
+
+        with open(file_path, "r") as f:
+            return cls.from_json_dict(json.load(f))
 
     def __str__(self):
         return f"SnapchatSnapConversation(users={self.users}, num_snaps={len(self.snaps)}, earliest_snap_date={self.get_earlist_snap_date()}, latest_snap_date={self.get_latest_snap_date()})"
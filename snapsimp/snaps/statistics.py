@@ -1,19 +1,22 @@
 from datetime import timedelta
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from collections import Counter
+from operator import attrgetter
 import snaps.filtering as filtering
 from snaps.snap import Snap
 import snaps.filtering as filtering
 from common.date_range import DateRange
 from snaps.snap_type import SnapType
-from common.time_helpers import generate_ordered_date_range
+from common.time_helpers import DayBitmap
 from chats.chat import Chat
 from chats.chat_type import ChatType
+from snaps.event_index import EventIndex
 
 
 def get_count(
     snaps_or_chats: List[Snap | Chat],
+    index: Optional[EventIndex] = None,
 ) -> Tuple[Dict[str, int], Dict[str, int]]:
     """
     Computes and returns a dictionary detailing the count of each unique sender and receiver.
@@ -33,24 +36,79 @@ def get_count(
     )
 
     :param snaps_or_chats: the list of snaps or chats to compute the sender count of
+    :param index: an optional EventIndex over the list whose precomputed sender and receiver counts are returned
     :return: a tuple containing two dictionaries, the first details the snap or chat counts
     of the sender usernames and the second details the snap or chat counts of the receiving usernames
     """
 
-    sender_username_count = Counter(item.sender for item in snaps_or_chats)
-    receiver_username_count = Counter(item.receiver for item in snaps_or_chats)
+    if index:
+        sender_username_count = index.sender_counts
+        receiver_username_count = index.receiver_counts
+    else:
+        sender_username_count, receiver_username_count = __count_senders_and_receivers(
+            snaps_or_chats
+        )
 
-    sorted_sender_username_counts = sorted(
-        sender_username_count.items(), key=lambda item: item[1], reverse=True
+    return dict(sender_username_count.most_common()), dict(
+        receiver_username_count.most_common()
     )
-    sorted_receiver_username_counts = sorted(
-        receiver_username_count.items(), key=lambda item: item[1], reverse=True
+
+
+def __count_senders_and_receivers(
+    snaps_or_chats: List[Snap | Chat],
+) -> Tuple[Counter, Counter]:
+    """
+    Counts the snaps or chats of each sender and each receiver. Each counter is filled from an attrgetter map so
+    the counting loop runs in C.
+
+    :param snaps_or_chats: the list of snaps or chats to count
+    :return: a tuple containing the sender counter and the receiver counter
+    """
+
+    return (
+        Counter(map(attrgetter("sender"), snaps_or_chats)),
+        Counter(map(attrgetter("receiver"), snaps_or_chats)),
     )
 
-    sorted_sender_username_dict = dict(sorted_sender_username_counts)
-    sorted_receiver_username_dict = dict(sorted_receiver_username_counts)
 
-    return sorted_sender_username_dict, sorted_receiver_username_dict
+def top_k_senders(
+    snaps_or_chats: List[Snap | Chat], k: int, index: Optional[EventIndex] = None
+) -> List[Tuple[str, int]]:
+    """
+    Returns the k users who sent the most snaps or chats using heap selection rather than a full sort.
+    Ties are broken by which user appears first in the list. Only the senders are counted, and results are
+    memoized on the index when one is provided.
+
+    :param snaps_or_chats: the list of snaps or chats
+    :param k: the number of users to return
+    :param index: an optional EventIndex over the list whose sender counts are selected from, memoized per k
+    :return: a list of username and count pairs ordered from the most to the fewest sent
+    """
+
+    if index:
+        return index.get_top_senders(k)
+
+    return Counter(map(attrgetter("sender"), snaps_or_chats)).most_common(k)
+
+
+def top_k_receivers(
+    snaps_or_chats: List[Snap | Chat], k: int, index: Optional[EventIndex] = None
+) -> List[Tuple[str, int]]:
+    """
+    Returns the k users who received the most snaps or chats using heap selection rather than a full sort.
+    Ties are broken by which user appears first in the list. Only the receivers are counted, and results are
+    memoized on the index when one is provided.
+
+    :param snaps_or_chats: the list of snaps or chats
+    :param k: the number of users to return
+    :param index: an optional EventIndex over the list whose receiver counts are selected from, memoized per k
+    :return: a list of username and count pairs ordered from the most to the fewest received
+    """
+
+    if index:
+        return index.get_top_receivers(k)
+
+    return Counter(map(attrgetter("receiver"), snaps_or_chats)).most_common(k)
 
 
 def get_type_count(snaps_or_chats: List[Snap | Chat]) -> Dict[SnapType | ChatType, int]:
@@ -71,134 +129,182 @@ def get_type_count(snaps_or_chats: List[Snap | Chat]) -> Dict[SnapType | ChatTyp
     return type_counts
 
 
-def get_image_to_video_ratio_by_sending_user(snaps: List[Snap], username: str) -> float:
+def get_image_to_video_ratio_by_sending_user(
+    snaps: List[Snap], username: str, index: Optional[EventIndex] = None
+) -> float:
     """
     Returns the image to video snap ratio of the provided sending user.
 
     :param snaps: the list of snaps
     :param username: the username to return the image to video snap ratio of from within the provided snaps list
+    :param index: an optional EventIndex over the snaps used to look up the user's sent snaps
     """
 
-    snaps_by_username = filtering.get_by_sending_user(snaps, username)
+    snaps_by_username = filtering.get_by_sending_user(snaps, username, index)
     image_snaps, video_snaps = filtering.filter_snaps_by_type(snaps_by_username)
     return len(image_snaps) / len(video_snaps)
 
 
-def get_text_to_media_ratio_by_sending_user(chats: List[Chat], username: str) -> float:
+def get_text_to_media_ratio_by_sending_user(
+    chats: List[Chat], username: str, index: Optional[EventIndex] = None
+) -> float:
     """
     Returns the text to media chat ratio of the provided sending user.
 
     :param snaps: the list of chats
     :param username: the username to return the text to media chat ratio from within the provided chats list
+    :param index: an optional EventIndex over the chats used to look up the user's sent chats
     """
 
-    chats_by_username = filtering.get_by_sending_user(chats, username)
-    text_chats, media_chats = filtering.filter_snaps_by_type(chats_by_username)
+    chats_by_username = filtering.get_by_sending_user(chats, username, index)
+    text_chats, media_chats = filtering.filter_chats_by_type(chats_by_username)
     return len(text_chats) / len(media_chats)
 
 
 def get_image_to_video_ratio_by_receiving_user(
-    snaps: List[Snap], username: str
+    snaps: List[Snap], username: str, index: Optional[EventIndex] = None
 ) -> float:
     """
     Returns the image to video snap ratio of the provided receiving user.
 
     :param snaps: the list of snaps
     :param username: the username to return the image to video snap ratio of from within the provided snaps list
+    :param index: an optional EventIndex over the snaps used to look up the user's received snaps
     """
 
-    snaps_by_username = filtering.get_by_receiving_user(snaps, username)
+    snaps_by_username = filtering.get_by_receiving_user(snaps, username, index)
     image_snaps, video_snaps = filtering.filter_snaps_by_type(snaps_by_username)
     return len(image_snaps) / len(video_snaps)
 
 
 def get_text_to_media_ratio_by_receiving_user(
-    chats: List[Chat], username: str
+    chats: List[Chat], username: str, index: Optional[EventIndex] = None
 ) -> float:
     """
     Returns the text to media chat ratio of the provided receiving user.
 
     :param snaps: the list of chats
     :param username: the username to return the text to media chat ratio of from within the provided chats list
+    :param index: an optional EventIndex over the chats used to look up the user's received chats
     """
-    chats_by_username = filtering.get_by_receiving_user(chats, username)
+    chats_by_username = filtering.get_by_receiving_user(chats, username, index)
     text_chats, media_chats = filtering.filter_chats_by_type(chats_by_username)
     return len(text_chats) / len(media_chats)
 
 
-def get_image_to_video_ratio_by_top_sender(snaps: List[Snap]) -> float:
+def get_image_to_video_ratio_by_top_sender(
+    snaps: List[Snap], index: Optional[EventIndex] = None
+) -> float:
     """
     Returns the image to video snap ratio of top sender of snaps from within the provided list.
 
     :param snaps: the list of snaps
+    :param index: an optional EventIndex over the snaps used to find the top sender and their snaps, built once here when not provided
     :return: the image to video snap ratio of top sender of snaps from within the provided list
     """
 
+    if index is None:
+        index = EventIndex(snaps)
+
     return get_image_to_video_ratio_by_sending_user(
-        snaps, filtering.get_top_sender_username(snaps)
+        snaps, filtering.get_top_sender_username(snaps, index), index
     )
 
 
-def get_text_to_media_ratio_by_top_sender(chats: List[Chat]) -> float:
+def get_text_to_media_ratio_by_top_sender(
+    chats: List[Chat], index: Optional[EventIndex] = None
+) -> float:
     """
     Returns the text to media chat ratio of top sender of chats from within the provided list.
 
     :param chats: the list of chats
+    :param index: an optional EventIndex over the chats used to find the top sender and their chats, built once here when not provided
     :return: the text to media chat ratio of top sender of chats from within the provided list
     """
 
+    if index is None:
+        index = EventIndex(chats)
+
     return get_text_to_media_ratio_by_sending_user(
-        chats, filtering.get_top_sender_username(chats)
+        chats, filtering.get_top_sender_username(chats, index), index
     )
 
 
-def get_image_to_video_ratio_by_top_receiver(snaps: List[Snap]) -> float:
+def get_image_to_video_ratio_by_top_receiver(
+    snaps: List[Snap], index: Optional[EventIndex] = None
+) -> float:
     """
     Returns the image to video snap ratio of top recipient of snaps from within the provided list.
 
     :param snaps: the list of snaps
+    :param index: an optional EventIndex over the snaps used to find the top receiver and their snaps, built once here when not provided
     :return: the image to video snap ratio of top recipient of snaps from within the provided list
     """
 
+    if index is None:
+        index = EventIndex(snaps)
+
     return get_image_to_video_ratio_by_receiving_user(
-        snaps, filtering.get_top_receiver_username(snaps)
+        snaps, filtering.get_top_receiver_username(snaps, index), index
     )
 
 
-def get_text_to_media_ratio_by_top_receiver(chats: List[Chat]) -> float:
+def get_text_to_media_ratio_by_top_receiver(
+    chats: List[Chat], index: Optional[EventIndex] = None
+) -> float:
     """
     Returns the text to media chat ratio of top recipient of chats from within the provided list.
 
     :param chats: the list of chats
+    :param index: an optional EventIndex over the chats used to find the top receiver and their chats, built once here when not provided
     :return: the text to media chat ratio of top recipient of chats from within the provided list
     """
 
+    if index is None:
+        index = EventIndex(chats)
+
     return get_text_to_media_ratio_by_receiving_user(
-        chats, filtering.get_top_receiver_username(chats)
+        chats, filtering.get_top_receiver_username(chats, index), index
     )
 
 
-def get_number_by_sender(snaps_or_chats: List[Snap | Chat], username: str):
+def get_number_by_sender(
+    snaps_or_chats: List[Snap | Chat],
+    username: str,
+    index: Optional[EventIndex] = None,
+):
     """
     Returns the number of snaps or chats the provided user sent.
 
     :param snaps_or_chats: the list of snaps or chats
     :param username: the username to filter on
+    :param index: an optional EventIndex over the list whose sender count of the user is returned
     :return: the number of snaps or chats the provided user sent
     """
 
+    if index:
+        return index.get_sender_count(username)
+
     return len(filtering.get_by_sending_user(snaps_or_chats, username))
 
 
-def get_number_by_receiver(snaps_or_chats: List[Snap | Chat], username: str):
+def get_number_by_receiver(
+    snaps_or_chats: List[Snap | Chat],
+    username: str,
+    index: Optional[EventIndex] = None,
+):
     """
     Returns the number of snaps or chats the provided user received.
 
     :param snaps_or_chats: the list of snaps or chats
     :param username: the username to filter on
+    :param index: an optional EventIndex over the list whose receiver count of the user is returned
     :return: the number of snaps or chats the provided user received
     """
 
+    if index:
+        return index.get_receiver_count(username)
+
     return len(filtering.get_by_receiving_user(snaps_or_chats, username))
 
 
@@ -240,94 +346,91 @@ def get_date_range(snaps_or_chats: List[Snap | Chat]) -> DateRange:
     return DateRange(time_ordered[0].timestamp, time_ordered[-1].timestamp)
 
 
-def get_duration_with_top_sender(snaps_or_chats: List[Snap | Chat]) -> timedelta:
+def get_duration_with_top_sender(
+    snaps_or_chats: List[Snap | Chat], index: Optional[EventIndex] = None
+) -> timedelta:
     """
     Returns the duration of the snaps or chats sent by the top sender from within the list.
 
     :param snaps: the list of snaps or chats
+    :param index: an optional EventIndex over the list used to find the top sender's snaps or chats
     :return: the duration of snaps or chats with the top sender in the provided list
     """
 
-    top_sender = filtering.get_by_top_sender(snaps_or_chats)
+    top_sender = filtering.get_by_top_sender(snaps_or_chats, index)
     return get_date_range(top_sender).duration()
 
 
-def get_duration_with_top_receiver(snaps_or_chats: List[Snap | Chat]) -> timedelta:
+def get_duration_with_top_receiver(
+    snaps_or_chats: List[Snap | Chat], index: Optional[EventIndex] = None
+) -> timedelta:
     """
     Returns the duration of the snaps or chats received by the top receiver from within the list.
 
     :param snaps_or_chats: the list of snaps or chats
+    :param index: an optional EventIndex over the list used to find the top receiver's snaps or chats
     :return: the duration of snaps or chats with the top receiver in the provided list
     """
 
-    top_receiver = filtering.get_by_top_receiver(snaps_or_chats)
+    top_receiver = filtering.get_by_top_receiver(snaps_or_chats, index)
     return get_date_range(top_receiver).duration()
 
 
 def get_days_top_sender_did_not_send(
     snaps_or_chats: List[Snap | Chat],
+    index: Optional[EventIndex] = None,
 ) -> List[datetime]:
     """
     Returns the days from the provided list of which the top sender did not send a snap or chat.
 
     :param snaps_or_chats: the list of snaps or chats
+    :param index: an optional EventIndex over the list used to find the top sender's snaps or chats
     :return: the days from the provided list of which the top sender did not send a snap or chat
     """
-    days_top_sender_sent = get_days_top_sender_sent(snaps_or_chats)
+    days_top_sender_sent = get_days_top_sender_sent(snaps_or_chats, index)
+    return DayBitmap.from_dates(days_top_sender_sent).get_missing_days()
 
-    min_date = min(days_top_sender_sent)
-    max_date = max(days_top_sender_sent)
 
-    all_days_sorted = generate_ordered_date_range(min_date, max_date)
-    days_top_sender_did_not_send = list(
-        set(all_days_sorted) - set(days_top_sender_sent)
-    )
-    days_top_sender_did_not_send_sorted = sorted(days_top_sender_did_not_send)
-
-    return days_top_sender_did_not_send_sorted
-
-
-def get_days_top_receiver_did_not_receive(snaps_or_chats: List[Snap]) -> List[datetime]:
+def get_days_top_receiver_did_not_receive(
+    snaps_or_chats: List[Snap], index: Optional[EventIndex] = None
+) -> List[datetime]:
     """
     Returns the days from the provided list of which the top receiver did not receive a snap or chat.
 
     :param snaps_or_chats: the list of snaps or chats
+    :param index: an optional EventIndex over the list used to find the top receiver's snaps or chats
     :return: the days from the provided list of which the top receiver did not receive a snap or chat
     """
-    days_top_receiver_received = get_days_top_receiver_received(snaps_or_chats)
+    days_top_receiver_received = get_days_top_receiver_received(snaps_or_chats, index)
+    return DayBitmap.from_dates(days_top_receiver_received).get_missing_days()
 
-    min_date = min(days_top_receiver_received)
-    max_date = max(days_top_receiver_received)
 
-    all_days_sorted = generate_ordered_date_range(min_date, max_date)
-    days_top_receiver_did_not_receive = list(
-        set(all_days_sorted) - set(days_top_receiver_received)
-    )
-    days_top_receiver_did_not_receive_sorted = sorted(days_top_receiver_did_not_receive)
-
-    return days_top_receiver_did_not_receive_sorted
-
-
-def get_days_top_sender_sent(snaps_or_chats: List[Snap | Chat]) -> List[datetime]:
+def get_days_top_sender_sent(
+    snaps_or_chats: List[Snap | Chat], index: Optional[EventIndex] = None
+) -> List[datetime]:
     """
     Returns the days the top sender of the list of snaps or chats sent at least one snap or chat.
 
     :param snap_or_chats: the list of snaps or chats
+    :param index: an optional EventIndex over the list used to find the top sender's snaps or chats
     :return: the days the top sender of the list of snaps or chats sent at least one snap or chat
     """
-    top_sender_snaps_or_chats = filtering.get_by_top_sender(snaps_or_chats)
+    top_sender_snaps_or_chats = filtering.get_by_top_sender(snaps_or_chats, index)
     days_top_sender_sent = {snap.timestamp.date() for snap in top_sender_snaps_or_chats}
     return sorted(list(days_top_sender_sent))
 
 
-def get_days_top_receiver_received(snaps_or_chats: List[Snap | Chat]) -> List[datetime]:
+def get_days_top_receiver_received(
+    snaps_or_chats: List[Snap | Chat], index: Optional[EventIndex] = None
+) -> List[datetime]:
     """
     Returns the days the top receiver of the list of snaps or chats received at least one snap or chat.
 
     :param snap_or_chats: the list of snaps or chats
+    :param index: an optional EventIndex over the list used to find the top receiver's snaps or chats
     :return: the days the top receiver of the list of snaps or chats received at least one snap or chat
     """
-    top_receiver_snaps_or_chats = filtering.get_by_top_receiver(snaps_or_chats)
+    top_receiver_snaps_or_chats = filtering.get_by_top_receiver(snaps_or_chats, index)
     days_top_receiver_received = {
         snap.timestamp.date() for snap in top_receiver_snaps_or_chats
     }
@@ -0,0 +1,125 @@
+import datetime
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+from common.time_helpers import DayBitmap
+from snaps.snap import Snap
+from chats.chat import Chat
+
+
+class ActivityStreaks:
+    """
+    The daily activity of a single counterparty, that is the days on which at least one snap or chat was exchanged
+    with them, summarized as streaks of consecutive active days and gaps of consecutive silent days. The active
+    days are held in a DayBitmap spanning the counterparty's first to last active day.
+    """
+
+    def __init__(self, counterparty: str, active_days: DayBitmap):
+        """
+        Creates a new ActivityStreaks.
+
+        :param counterparty: the username of the other snapchatter
+        :param active_days: the bitmap of the days on which a snap or chat was exchanged with the counterparty
+        """
+        self.counterparty = counterparty
+        self.active_days = active_days
+        self.first_day = active_days.get_first_day()
+        self.last_day = active_days.get_last_day()
+
+    def get_num_active_days(self) -> int:
+        """
+        :return: the number of days on which a snap or chat was exchanged with the counterparty
+        """
+        return self.active_days.get_num_present_days()
+
+    def get_longest_streak(self) -> int:
+        """
+        :return: the number of days of the longest streak of consecutive active days
+        """
+        return self.active_days.get_longest_streak()
+
+    def get_longest_streak_range(self) -> Tuple[datetime.date, datetime.date]:
+        """
+        :return: the first and last day (inclusive) of the earliest longest streak
+        """
+        return max(
+            self.active_days.get_runs(),
+            key=lambda run: run[1] - run[0],
+        )
+
+    def get_gaps(self) -> List[Tuple[datetime.date, datetime.date]]:
+        """
+        :return: the ascending first and last day (inclusive) of each silence between two active days
+        """
+        return self.active_days.get_runs(present=False)
+
+    def get_longest_gap(self) -> int:
+        """
+        :return: the number of days of the longest silence between two active days
+        """
+        return self.active_days.get_longest_gap()
+
+    def get_current_streak(self, as_of: datetime.date) -> int:
+        """
+        Returns the number of consecutive active days ending on the provided day.
+
+        :param as_of: the day the streak must reach, usually the last day of the data
+        :return: the length of the streak ending on the day or 0 if the counterparty was not active on the day
+        """
+        return self.active_days.get_current_streak() if self.last_day == as_of else 0
+
+    def get_days_since_last_active(self, as_of: datetime.date) -> int:
+        """
+        :param as_of: the day to measure up to, usually the last day of the data
+        :return: the number of days between the last active day and the provided day
+        """
+        return (as_of - self.last_day).days
+
+    def __repr__(self):
+        return (
+            f"ActivityStreaks(counterparty={self.counterparty}, first_day={self.first_day}, last_day={self.last_day}, "
+            f"active_days={self.get_num_active_days()}, longest_streak={self.get_longest_streak()}, "
+            f"longest_gap={self.get_longest_gap()})"
+        )
+
+
+def compute_streaks(
+    snaps_or_chats: List[Snap | Chat], my_name: str
+) -> Dict[str, ActivityStreaks]:
+    """
+    Computes the streaks, gaps, and active days of every counterparty. A single pass over the provided list
+    collects each counterparty's active days, in any order, which are then marked in one DayBitmap per
+    counterparty. The counterparty of a snap or chat is its receiver if you sent it and its sender otherwise,
+    so both the snaps of a SnapchatSnapConversation and an entire snap or chat history may be provided.
+
+    :param snaps_or_chats: the list of snaps or chats
+    :param my_name: your snapchat username
+    :return: a dictionary of counterparty usernames to their activity streaks
+    """
+
+    active_days: Dict[str, Set[datetime.date]] = defaultdict(set)
+
+    for snap_or_chat in snaps_or_chats:
+        counterparty = (
+            snap_or_chat.receiver
+            if snap_or_chat.sender == my_name
+            else snap_or_chat.sender
+        )
+        active_days[counterparty].add(snap_or_chat.timestamp.date())
+
+    return {
+        counterparty: ActivityStreaks(counterparty, DayBitmap.from_dates(days))
+        for counterparty, days in active_days.items()
+    }
+
+
+def get_last_day(streaks: Dict[str, ActivityStreaks]) -> Optional[datetime.date]:
+    """
+    Returns the last active day across all the provided streaks, the natural day to measure current streaks against.
+
+    :param streaks: the streaks returned by compute_streaks
+    :return: the last active day or None if no streaks were provided
+    """
+    return max(
+        (counterparty_streaks.last_day for counterparty_streaks in streaks.values()),
+        default=None,
+    )
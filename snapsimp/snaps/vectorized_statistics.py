@@ -0,0 +1,355 @@
+from collections import Counter
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import snaps.statistics as statistics
+from chats.chat import Chat
+from chats.chat_table import ChatTable
+from chats.chat_type import ChatType
+from common.event_table import EventTable
+from snaps.snap import Snap
+from snaps.snap_table import SnapTable
+from snaps.snap_type import SnapType
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUMPY_AVAILABLE = np is not None
+SECONDS_PER_DAY = 24 * 60 * 60
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class EventArrays:
+    """
+    NumPy arrays over a list of snaps or chats. The list is converted once into an EventTable whose columns are then
+    viewed as arrays without copying: categorical user and type codes, int64 epoch second timestamps, and UTC day
+    numbers. Requires NumPy. While the arrays are alive the underlying table cannot be appended to.
+    """
+
+    def __init__(self, snaps_or_chats: List[Snap | Chat] | EventTable):
+        """
+        Converts the provided snaps or chats into arrays.
+
+        :param snaps_or_chats: the list of snaps or chats, or an already built SnapTable or ChatTable
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("EventArrays requires NumPy to be installed")
+
+        if isinstance(snaps_or_chats, EventTable):
+            table = snaps_or_chats
+        elif len(snaps_or_chats) and isinstance(snaps_or_chats[0].type, ChatType):
+            table = ChatTable.from_events(snaps_or_chats)
+        else:
+            table = SnapTable.from_events(snaps_or_chats)
+
+        self.table = table
+        self.usernames = table.usernames
+        self.event_types = table.EVENT_TYPES
+        self.senders = np.frombuffer(table.senders, dtype=np.uint32)
+        self.receivers = np.frombuffer(table.receivers, dtype=np.uint32)
+        self.types = np.frombuffer(table.types, dtype=np.uint8)
+        self.timestamps = np.frombuffer(table.timestamps, dtype=np.int64)
+        self.days = self.timestamps // SECONDS_PER_DAY
+
+    def get_username_id(self, username: str) -> Optional[int]:
+        """
+        Returns the categorical code of the provided username.
+
+        :param username: the username to look up
+        :return: the code of the username or None if the username is not part of these arrays
+        """
+        return self.table.get_username_id(username)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+def __get_event_arrays(
+    snaps_or_chats: List[Snap | Chat], arrays: Optional[EventArrays]
+) -> Optional[EventArrays]:
+    """
+    Returns the provided arrays, converting the list when none are provided, or None when NumPy is not installed.
+    """
+    if not NUMPY_AVAILABLE:
+        return None
+
+    return arrays if arrays is not None else EventArrays(snaps_or_chats)
+
+
+def __get_top_user_id(column) -> int:
+    """
+    Returns the code appearing most in the provided user column. Ties go to the user appearing first in the column,
+    matching the ordering of statistics.get_count.
+    """
+    counts = np.bincount(column)
+    candidates = np.flatnonzero(counts == counts.max())
+
+    if len(candidates) == 1:
+        return int(candidates[0])
+
+    first_positions = [int(np.argmax(column == candidate)) for candidate in candidates]
+    return int(candidates[int(np.argmin(first_positions))])
+
+
+def __to_dates(days) -> List[date]:
+    """
+    Converts an array of epoch day numbers into dates.
+    """
+    return [date.fromordinal(int(day) + EPOCH_ORDINAL) for day in days]
+
+
+def __sorted_count_dict(arrays: EventArrays, column) -> Dict[str, int]:
+    """
+    Counts the provided user column, returning a dictionary ordered by descending count with ties ordered by
+    first appearance.
+    """
+    codes, first_positions, counts = np.unique(
+        column, return_index=True, return_counts=True
+    )
+    order = np.lexsort((first_positions, -counts))
+    return {arrays.usernames[int(codes[i])]: int(counts[i]) for i in order}
+
+
+def get_count(
+    snaps_or_chats: List[Snap | Chat], arrays: Optional[EventArrays] = None
+) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    Vectorized statistics.get_count.
+
+    :param snaps_or_chats: the list of snaps or chats to compute the sender count of
+    :param arrays: optional EventArrays already converted from the provided list
+    :return: a tuple of the sender and receiver count dictionaries ordered by descending count
+    """
+    arrays = __get_event_arrays(snaps_or_chats, arrays)
+    if arrays is None:
+        return statistics.get_count(snaps_or_chats)
+
+    return __sorted_count_dict(arrays, arrays.senders), __sorted_count_dict(
+        arrays, arrays.receivers
+    )
+
+
+def get_type_count(
+    snaps_or_chats: List[Snap | Chat], arrays: Optional[EventArrays] = None
+) -> Dict[SnapType | ChatType, int]:
+    """
+    Vectorized statistics.get_type_count.
+
+    :param snaps_or_chats: the list of Snap or Chat objects to analyze
+    :param arrays: optional EventArrays already converted from the provided list
+    :return: a dictionary mapping each snap or chat type to its count
+    """
+    arrays = __get_event_arrays(snaps_or_chats, arrays)
+    if arrays is None:
+        return statistics.get_type_count(snaps_or_chats)
+
+    counts = np.bincount(arrays.types, minlength=len(arrays.event_types))
+    return Counter(
+        {
+            arrays.event_types[code]: int(count)
+            for code, count in enumerate(counts)
+            if count
+        }
+    )
+
+
+def __get_type_ratio(arrays: EventArrays, column, username: str) -> float:
+    """
+    Returns the ratio of the first event type to the second event type of the events whose user column matches
+    the provided username, such as image to video for snaps or text to media for chats.
+    """
+    username_id = arrays.get_username_id(username)
+    user_types = (
+        arrays.types[column == username_id]
+        if username_id is not None
+        else arrays.types[:0]
+    )
+    counts = np.bincount(user_types, minlength=2)
+    return int(counts[0]) / int(counts[1])
+
+
+def get_image_to_video_ratio_by_sending_user(
+    snaps: List[Snap], username: str, arrays: Optional[EventArrays] = None
+) -> float:
+    """
+    Vectorized statistics.get_image_to_video_ratio_by_sending_user.
+
+    :param snaps: the list of snaps
+    :param username: the username of the sender
+    :param arrays: optional EventArrays already converted from the provided list
+    """
+    arrays = __get_event_arrays(snaps, arrays)
+    if arrays is None:
+        return statistics.get_image_to_video_ratio_by_sending_user(snaps, username)
+
+    return __get_type_ratio(arrays, arrays.senders, username)
+
+
+def get_image_to_video_ratio_by_receiving_user(
+    snaps: List[Snap], username: str, arrays: Optional[EventArrays] = None
+) -> float:
+    """
+    Vectorized statistics.get_image_to_video_ratio_by_receiving_user.
+
+    :param snaps: the list of snaps
+    :param username: the username of the receiver
+    :param arrays: optional EventArrays already converted from the provided list
+    """
+    arrays = __get_event_arrays(snaps, arrays)
+    if arrays is None:
+        return statistics.get_image_to_video_ratio_by_receiving_user(snaps, username)
+
+    return __get_type_ratio(arrays, arrays.receivers, username)
+
+
+def get_text_to_media_ratio_by_sending_user(
+    chats: List[Chat], username: str, arrays: Optional[EventArrays] = None
+) -> float:
+    """
+    Vectorized statistics.get_text_to_media_ratio_by_sending_user.
+
+    :param chats: the list of chats
+    :param username: the username of the sender
+    :param arrays: optional EventArrays already converted from the provided list
+    """
+    arrays = __get_event_arrays(chats, arrays)
+    if arrays is None:
+        return statistics.get_text_to_media_ratio_by_sending_user(chats, username)
+
+    return __get_type_ratio(arrays, arrays.senders, username)
+
+
+def get_text_to_media_ratio_by_receiving_user(
+    chats: List[Chat], username: str, arrays: Optional[EventArrays] = None
+) -> float:
+    """
+    Vectorized statistics.get_text_to_media_ratio_by_receiving_user.
+
+    :param chats: the list of chats
+    :param username: the username of the receiver
+    :param arrays: optional EventArrays already converted from the provided list
+    """
+    arrays = __get_event_arrays(chats, arrays)
+    if arrays is None:
+        return statistics.get_text_to_media_ratio_by_receiving_user(chats, username)
+
+    return __get_type_ratio(arrays, arrays.receivers, username)
+
+
+def get_image_to_video_ratio_by_top_sender(
+    snaps: List[Snap], arrays: Optional[EventArrays] = None
+) -> float:
+    """
+    Vectorized statistics.get_image_to_video_ratio_by_top_sender.
+
+    :param snaps: the list of snaps
+    :param arrays: optional EventArrays already converted from the provided list
+    """
+    arrays = __get_event_arrays(snaps, arrays)
+    if arrays is None:
+        return statistics.get_image_to_video_ratio_by_top_sender(snaps)
+
+    top_sender = arrays.usernames[__get_top_user_id(arrays.senders)]
+    return __get_type_ratio(arrays, arrays.senders, top_sender)
+
+
+def get_image_to_video_ratio_by_top_receiver(
+    snaps: List[Snap], arrays: Optional[EventArrays] = None
+) -> float:
+    """
+    Vectorized statistics.get_image_to_video_ratio_by_top_receiver.
+
+    :param snaps: the list of snaps
+    :param arrays: optional EventArrays already converted from the provided list
+    """
+    arrays = __get_event_arrays(snaps, arrays)
+    if arrays is None:
+        return statistics.get_image_to_video_ratio_by_top_receiver(snaps)
+
+    top_receiver = arrays.usernames[__get_top_user_id(arrays.receivers)]
+    return __get_type_ratio(arrays, arrays.receivers, top_receiver)
+
+
+def __get_top_user_days(arrays: EventArrays, column):
+    """
+    Returns the sorted unique day numbers on which the top user of the provided user column appears.
+    """
+    return np.unique(arrays.days[column == __get_top_user_id(column)])
+
+
+def __get_gap_days(days):
+    """
+    Returns the day numbers between the first and last of the provided sorted unique days that are not present.
+    """
+    all_days = np.arange(days[0], days[-1] + 1, dtype=days.dtype)
+    return all_days[~np.isin(all_days, days, assume_unique=True)]
+
+
+def get_days_top_sender_sent(
+    snaps_or_chats: List[Snap | Chat], arrays: Optional[EventArrays] = None
+) -> List[date]:
+    """
+    Vectorized statistics.get_days_top_sender_sent.
+
+    :param snaps_or_chats: the list of snaps or chats
+    :param arrays: optional EventArrays already converted from the provided list
+    :return: the sorted days the top sender sent at least one snap or chat
+    """
+    arrays = __get_event_arrays(snaps_or_chats, arrays)
+    if arrays is None:
+        return statistics.get_days_top_sender_sent(snaps_or_chats)
+
+    return __to_dates(__get_top_user_days(arrays, arrays.senders))
+
+
+def get_days_top_receiver_received(
+    snaps_or_chats: List[Snap | Chat], arrays: Optional[EventArrays] = None
+) -> List[date]:
+    """
+    Vectorized statistics.get_days_top_receiver_received.
+
+    :param snaps_or_chats: the list of snaps or chats
+    :param arrays: optional EventArrays already converted from the provided list
+    :return: the sorted days the top receiver received at least one snap or chat
+    """
+    arrays = __get_event_arrays(snaps_or_chats, arrays)
+    if arrays is None:
+        return statistics.get_days_top_receiver_received(snaps_or_chats)
+
+    return __to_dates(__get_top_user_days(arrays, arrays.receivers))
+
+
+def get_days_top_sender_did_not_send(
+    snaps_or_chats: List[Snap | Chat], arrays: Optional[EventArrays] = None
+) -> List[date]:
+    """
+    Vectorized statistics.get_days_top_sender_did_not_send.
+
+    :param snaps_or_chats: the list of snaps or chats
+    :param arrays: optional EventArrays already converted from the provided list
+    :return: the sorted days between the top sender's first and last day on which they did not send
+    """
+    arrays = __get_event_arrays(snaps_or_chats, arrays)
+    if arrays is None:
+        return statistics.get_days_top_sender_did_not_send(snaps_or_chats)
+
+    return __to_dates(__get_gap_days(__get_top_user_days(arrays, arrays.senders)))
+
+
+def get_days_top_receiver_did_not_receive(
+    snaps_or_chats: List[Snap | Chat], arrays: Optional[EventArrays] = None
+) -> List[date]:
+    """
+    Vectorized statistics.get_days_top_receiver_did_not_receive.
+
+    :param snaps_or_chats: the list of snaps or chats
+    :param arrays: optional EventArrays already converted from the provided list
+    :return: the sorted days between the top receiver's first and last day on which they did not receive
+    """
+    arrays = __get_event_arrays(snaps_or_chats, arrays)
+    if arrays is None:
+        return statistics.get_days_top_receiver_did_not_receive(snaps_or_chats)
+
+    return __to_dates(__get_gap_days(__get_top_user_days(arrays, arrays.receivers)))
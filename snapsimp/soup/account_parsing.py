@@ -1,5 +1,5 @@
 import re
-from typing import List, Tuple
+from typing import TYPE_CHECKING, Dict, List, Tuple
 from common.basic_user_info import BasicUserInfo
 from common.device_info import DeviceInformation
 from common.device_history import DeviceHistory
@@ -11,33 +11,245 @@ from common.login_history_label import LoginHistoryLabel
 from common.device_history_label import DeviceHistoryLabel
 from soup.html_headers import HtmlHeaders
 from soup.table_elements import TableElements
-from bs4 import BeautifulSoup
+from soup.parser_backend import ParserBackend
+from soup.table_row_reader import TableRowReader
 
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+__USERNAME_SCAN_CHUNK_SIZE = 4 * 1024
 
-def __get_soup_and_check_headers(filename: str) -> BeautifulSoup:
-    """
-    Reads the html file provided and confirms it looks like a standard account.html file.
 
-    :param filename: the path to the account.html file
-    :return: a beautiful soup object
+class AccountDocument:
+    """
+    A parsed account.html file. The file is read and parsed a single time and its tables are indexed by
+    AccountTableIndicie so each section can be extracted without parsing the document again.
     """
-    with open(filename, "r") as f:
-        soup = BeautifulSoup(f.read(), "html.parser")
 
-    headers = soup.find_all(HtmlHeaders.H3.value)
+    __DEVICE_HISTORY_LABEL_PATTERN = re.compile(
+        "^(" + "|".join(re.escape(label.value) for label in DeviceHistoryLabel) + ")"
+    )
+    __LOGIN_HISTORY_LABEL_PATTERN = re.compile(
+        "^(" + "|".join(re.escape(label.value) for label in LoginHistoryLabel) + ")"
+    )
+
+    def __init__(
+        self, filename: str, backend: ParserBackend = ParserBackend.HTML_PARSER
+    ):
+        """
+        Reads and parses the provided account.html file and confirms it looks like a standard account.html file.
 
-    if len(headers) != len(AccountTableIndicie):
-        raise ValueError(
-            f"Unexpected number of {HtmlHeaders.H3.value} headers. Expected {len(AccountTableIndicie)}, found {len(headers)}"
-        )
+        :param filename: the path to the account.html file
+        :param backend: the parser backend whose tree builder is used
+        """
+        from bs4 import BeautifulSoup
+
+        with open(filename, "r") as f:
+            soup = BeautifulSoup(f.read(), backend.get_tree_builder())
+
+        self.__check_headers(soup)
+
+        tables = soup.find_all(TableElements.TABLE.value)
+        self.tables = {
+            info_table: tables[info_table.value] for info_table in AccountTableIndicie
+        }
 
-    for i, info_table in enumerate(AccountTableIndicie):
-        if headers[i].text.lower() != info_table.name.replace("_", " ").lower():
+    def __check_headers(self, soup: "BeautifulSoup") -> None:
+        """
+        Confirms the headers of the provided soup match those of a standard account.html file.
+
+        :param soup: the beautiful soup object of the account.html file
+        """
+        headers = soup.find_all(HtmlHeaders.H3.value)
+
+        if len(headers) != len(AccountTableIndicie):
             raise ValueError(
-                f"Unexpected {HtmlHeaders.H3.value} header at position {i}. Expected '{info_table.name.replace('_', ' ')}', found '{headers[i].text}'"
+                f"Unexpected number of {HtmlHeaders.H3.value} headers. Expected {len(AccountTableIndicie)}, found {len(headers)}"
             )
 
-    return soup
+        for i, info_table in enumerate(AccountTableIndicie):
+            if headers[i].text.lower() != info_table.name.replace("_", " ").lower():
+                raise ValueError(
+                    f"Unexpected {HtmlHeaders.H3.value} header at position {i}. Expected '{info_table.name.replace('_', ' ')}', found '{headers[i].text}'"
+                )
+
+    def __get_rows(self, info_table: AccountTableIndicie):
+        """
+        Returns the rows of the provided table.
+
+        :param info_table: the table to return the rows of
+        :return: the table's row elements
+        """
+        return self.tables[info_table].find_all(TableElements.TABLE_ROW.value)
+
+    def __extract_labeled_values(self, row, pattern: re.Pattern) -> Dict[str, str]:
+        """
+        Extracts the label and value pairs of a row in a single pass over its bold tags. A value is the
+        sibling directly following the bold label. Only the first occurrence of each label is used.
+
+        :param row: BeautifulSoup object representing a table row of labeled values
+        :param pattern: the precompiled pattern matching any of the row's expected labels
+        :return: a dictionary of label values to their stripped values
+        """
+        values = {}
+
+        for tag in row.find_all("b"):
+            text = tag.string
+            if text is None:
+                continue
+
+            match = pattern.search(text)
+            if not match or match.group(1) in values:
+                continue
+
+            value = tag.next_sibling
+            values[match.group(1)] = value.strip() if value else None
+
+        return values
+
+    def parse_basic_user_info(self) -> BasicUserInfo:
+        """
+        Extracts the basic information of this account document.
+
+        :return: a BasicUserInfo object
+        """
+        rows = self.__get_rows(AccountTableIndicie.BASIC_INFORMATION)
+
+        username_row = rows[BasicUserInfoRowIndicie.USERNAME_ROW.value]
+        name_row = rows[BasicUserInfoRowIndicie.NAME_ROW.value]
+        creation_date_row = rows[BasicUserInfoRowIndicie.CREATION_DATE_ROW.value]
+
+        username = (
+            username_row.find_all(TableElements.TABLE_HEADER.value)[1]
+            .get_text()
+            .strip()
+        )
+        name = name_row.find_all(TableElements.TABLE_HEADER.value)[1].get_text().strip()
+        creation_date = (
+            creation_date_row.find_all(TableElements.TABLE_HEADER.value)[1]
+            .get_text()
+            .strip()
+        )
+
+        return BasicUserInfo(username, name, creation_date)
+
+    def parse_device_information(self) -> DeviceInformation:
+        """
+        Extracts the device information of this account document.
+
+        :return: a DeviceInformation object
+        """
+        rows = self.__get_rows(AccountTableIndicie.DEVICE_INFORMATION)
+
+        make_row = rows[DeviceInformationRowIndicie.MAKE_ROW.value]
+        model_row = rows[DeviceInformationRowIndicie.MODEL_ROW.value]
+        model_name_row = rows[DeviceInformationRowIndicie.MODEL_NAME_ROW.value]
+        user_agent_row = rows[DeviceInformationRowIndicie.USER_AGENT_ROW.value]
+        language_row = rows[DeviceInformationRowIndicie.LANGUAGE_ROW.value]
+        os_type_row = rows[DeviceInformationRowIndicie.OS_TYPE_ROW.value]
+        os_version_row = rows[DeviceInformationRowIndicie.OS_VERSION_ROW.value]
+        connection_type_row = rows[
+            DeviceInformationRowIndicie.CONNECTION_TYPE_ROW.value
+        ]
+
+        make = make_row.find_all(TableElements.TABLE_HEADER.value)[1].text
+        model_id = model_row.find_all(TableElements.TABLE_HEADER.value)[1].text
+        model_name = model_name_row.find_all(TableElements.TABLE_HEADER.value)[1].text
+        user_agent = user_agent_row.find_all(TableElements.TABLE_HEADER.value)[1].text
+        language = language_row.find_all(TableElements.TABLE_HEADER.value)[1].text
+        os_type = os_type_row.find_all(TableElements.TABLE_HEADER.value)[1].text
+        os_version = os_version_row.find_all(TableElements.TABLE_HEADER.value)[1].text
+        connection_type = [
+            type.strip()
+            for type in connection_type_row.find_all(TableElements.TABLE_HEADER.value)[
+                1
+            ].text.split(",")
+        ]
+
+        return DeviceInformation(
+            make,
+            model_id,
+            model_name,
+            user_agent,
+            language,
+            os_type,
+            os_version,
+            connection_type,
+        )
+
+    def __parse_device_history_row(self, row) -> DeviceHistory:
+        """
+        Extracts the device history from a BeautifulSoup row object.
+
+        :param row: BeautifulSoup object representing a table row containing the device history data
+        :return: a DeviceHistory object
+        """
+        device_info = self.__extract_labeled_values(
+            row, self.__DEVICE_HISTORY_LABEL_PATTERN
+        )
+
+        device_type = device_info.get(DeviceHistoryLabel.DEVICE_TYPE.value, None)
+
+        return DeviceHistory(
+            make=device_info.get(DeviceHistoryLabel.MAKE.value, None),
+            model=device_info.get(DeviceHistoryLabel.MODEL.value, None),
+            start_time=device_info.get(DeviceHistoryLabel.START_TIME.value, None),
+            device_type=device_type.lower() if device_type else device_type,
+        )
+
+    def parse_device_history(self) -> List[DeviceHistory]:
+        """
+        Extracts the device history of this account document.
+
+        :return: a list of DeviceHistory objects
+        """
+        rows = self.__get_rows(AccountTableIndicie.DEVICE_HISTORY)
+        return [self.__parse_device_history_row(row) for row in rows]
+
+    def __parse_login_history_row(self, row) -> LoginHistory:
+        """
+        Extracts the login history from a BeautifulSoup row object.
+
+        :param row: BeautifulSoup object representing a table row containing the login history data
+        :return: a LoginHistory object
+        """
+        login_info = self.__extract_labeled_values(
+            row, self.__LOGIN_HISTORY_LABEL_PATTERN
+        )
+
+        return LoginHistory(
+            ip=login_info.get(LoginHistoryLabel.IP.value, None),
+            country=login_info.get(LoginHistoryLabel.COUNTRY.value, None),
+            created=login_info.get(LoginHistoryLabel.CREATED.value, None),
+            status=login_info.get(LoginHistoryLabel.STATUS.value, None),
+            device=login_info.get(LoginHistoryLabel.DEVICE.value, None),
+        )
+
+    def parse_login_history(self) -> List[LoginHistory]:
+        """
+        Extracts the login history of this account document.
+
+        :return: a list of LoginHistory objects
+        """
+        rows = self.__get_rows(AccountTableIndicie.LOGIN_HISTORY)
+        return [self.__parse_login_history_row(row) for row in rows]
+
+    def parse_all(
+        self,
+    ) -> Tuple[
+        BasicUserInfo, DeviceInformation, List[DeviceHistory], List[LoginHistory]
+    ]:
+        """
+        Extracts all data tables of this account document.
+
+        :return: a tuple containing the basic user info, device information, device history, and login history
+        """
+        return (
+            self.parse_basic_user_info(),
+            self.parse_device_information(),
+            self.parse_device_history(),
+            self.parse_login_history(),
+        )
 
 
 def parse_basic_user_info(filename: str) -> BasicUserInfo:
@@ -47,25 +259,7 @@ def parse_basic_user_info(filename: str) -> BasicUserInfo:
     :param filename: the path to the html file containing the account data
     :return: a BasicUserInfo object
     """
-    tables = __get_soup_and_check_headers(filename).find_all(TableElements.TABLE.value)
-    basic_user_info_table = tables[AccountTableIndicie.BASIC_INFORMATION.value]
-    rows = basic_user_info_table.find_all(TableElements.TABLE_ROW.value)
-
-    username_row = rows[BasicUserInfoRowIndicie.USERNAME_ROW.value]
-    name_row = rows[BasicUserInfoRowIndicie.NAME_ROW.value]
-    creation_date_row = rows[BasicUserInfoRowIndicie.CREATION_DATE_ROW.value]
-
-    username = (
-        username_row.find_all(TableElements.TABLE_HEADER.value)[1].get_text().strip()
-    )
-    name = name_row.find_all(TableElements.TABLE_HEADER.value)[1].get_text().strip()
-    creation_date = (
-        creation_date_row.find_all(TableElements.TABLE_HEADER.value)[1]
-        .get_text()
-        .strip()
-    )
-
-    return BasicUserInfo(username, name, creation_date)
+    return AccountDocument(filename).parse_basic_user_info()
 
 
 def parse_device_information(filename: str) -> DeviceInformation:
@@ -75,72 +269,7 @@ def parse_device_information(filename: str) -> DeviceInformation:
     :param filename: the path to the html file containing the device information data
     :return: a DeviceInformation object
     """
-    tables = __get_soup_and_check_headers(filename).find_all(TableElements.TABLE.value)
-    device_information_table = tables[AccountTableIndicie.DEVICE_INFORMATION.value]
-    rows = device_information_table.find_all(TableElements.TABLE_ROW.value)
-
-    make_row = rows[DeviceInformationRowIndicie.MAKE_ROW.value]
-    model_row = rows[DeviceInformationRowIndicie.MODEL_ROW.value]
-    model_name_row = rows[DeviceInformationRowIndicie.MODEL_NAME_ROW.value]
-    user_agent_row = rows[DeviceInformationRowIndicie.USER_AGENT_ROW.value]
-    language_row = rows[DeviceInformationRowIndicie.LANGUAGE_ROW.value]
-    os_type_row = rows[DeviceInformationRowIndicie.OS_TYPE_ROW.value]
-    os_version_row = rows[DeviceInformationRowIndicie.OS_VERSION_ROW.value]
-    connection_type_row = rows[DeviceInformationRowIndicie.CONNECTION_TYPE_ROW.value]
-
-    make = make_row.find_all(TableElements.TABLE_HEADER.value)[1].text
-    model_id = model_row.find_all(TableElements.TABLE_HEADER.value)[1].text
-    model_name = model_name_row.find_all(TableElements.TABLE_HEADER.value)[1].text
-    user_agent = user_agent_row.find_all(TableElements.TABLE_HEADER.value)[1].text
-    language = language_row.find_all(TableElements.TABLE_HEADER.value)[1].text
-    os_type = os_type_row.find_all(TableElements.TABLE_HEADER.value)[1].text
-    os_version = os_version_row.find_all(TableElements.TABLE_HEADER.value)[1].text
-    connection_type = [
-        type.strip()
-        for type in connection_type_row.find_all(TableElements.TABLE_HEADER.value)[
-            1
-        ].text.split(",")
-    ]
-
-    return DeviceInformation(
-        make,
-        model_id,
-        model_name,
-        user_agent,
-        language,
-        os_type,
-        os_version,
-        connection_type,
-    )
-
-
-def __parse_device_history_row(row) -> DeviceHistory:
-    """
-    Extracts the device history from a BeautifulSoup row object.
-
-    :param row: BeautifulSoup object representing a table row containing the device history data
-    :return: a DeviceHistory object
-    """
-    device_info = {}
-
-    soup = BeautifulSoup(str(row), "html.parser")
-
-    for label in DeviceHistoryLabel.values():
-        tag = soup.find("b", text=re.compile(f"^{label.value}"))
-        if tag:
-            value = tag.next_sibling
-            if value:
-                if label == DeviceHistoryLabel.DEVICE_TYPE:
-                    device_info[label.value] = value.strip().lower()
-                else:
-                    device_info[label.value] = value.strip()
-
-    return DeviceHistory(
-        make=device_info.get(DeviceHistoryLabel.MAKE.value, None),
-        model=device_info.get(DeviceHistoryLabel.MODEL.value, None),
-        start_time=device_info.get(DeviceHistoryLabel.START_TIME.value, None),
-        device_type=device_info.get(DeviceHistoryLabel.DEVICE_TYPE.value, None),
-    )
+    return AccountDocument(filename).parse_device_information()
 
 
 def parse_device_history(filename: str) -> List[DeviceHistory]:
@@ -150,39 +279,7 @@ def parse_device_history(filename: str) -> List[DeviceHistory]:
     :param filename: the path to the html file containing the device history data
     :return: a DeviceHistory object
     """
-    tables = __get_soup_and_check_headers(filename).find_all(TableElements.TABLE.value)
-    device_history_table = tables[AccountTableIndicie.DEVICE_HISTORY.value]
-    rows = device_history_table.find_all(TableElements.TABLE_ROW.value)
-
-    device_histories = [__parse_device_history_row(row) for row in rows]
-    return device_histories
-
-
-def __parse_login_history_row(row) -> LoginHistory:
-    """
-    Extracts the login history from a BeautifulSoup row object.
-
-    :param row: BeautifulSoup object representing a table row containing the login history data
-    :return: a LoginHistory object
-    """
-    login_info = {}
-
-    soup = BeautifulSoup(str(row), "html.parser")
-
-    for label in LoginHistoryLabel.values():
-        tag = soup.find("b", text=re.compile(f"^{label.value}"))
-        if tag:
-            value = tag.next_sibling
-            if value:
-                login_info[label.value] = value.strip()
-
-    return LoginHistory(
-        ip=login_info.get(LoginHistoryLabel.IP.value, None),
-        country=login_info.get(LoginHistoryLabel.COUNTRY.value, None),
-        created=login_info.get(LoginHistoryLabel.CREATED.value, None),
-        status=login_info.get(LoginHistoryLabel.STATUS.value, None),
-        device=login_info.get(LoginHistoryLabel.DEVICE.value, None),
-    )
+    return AccountDocument(filename).parse_device_history()
 
 
 def parse_login_history(filename: str) -> List[LoginHistory]:
@@ -192,26 +289,43 @@ def parse_login_history(filename: str) -> List[LoginHistory]:
     :param filename: the path to the html file containing the login history data
     :return: a LoginHistory object
     """
-    tables = __get_soup_and_check_headers(filename).find_all(TableElements.TABLE.value)
-    device_history_table = tables[AccountTableIndicie.LOGIN_HISTORY.value]
-    rows = device_history_table.find_all(TableElements.TABLE_ROW.value)
-
-    login_histories = [__parse_login_history_row(row) for row in rows]
-    return login_histories
+    return AccountDocument(filename).parse_login_history()
 
 
 def parse_all(
-    filename: str,
+    filename: str, backend: ParserBackend = ParserBackend.HTML_PARSER
 ) -> Tuple[BasicUserInfo, DeviceInformation, List[DeviceHistory], List[LoginHistory]]:
     """
-    Parses and returns all data tables from the provided account.html file.
+    Parses and returns all data tables from the provided account.html file. The file is parsed only once.
 
     :param filename: the path to the html file
+    :param backend: the parser backend whose tree builder is used
     :return: a tuple containing the basic user info, device information, device history, and login history
     """
-    basic_user_info = parse_basic_user_info(filename)
-    device_information = parse_device_information(filename)
-    device_history = parse_device_history(filename)
-    login_history = parse_login_history(filename)
+    return AccountDocument(filename, backend).parse_all()
+
+
+def scan_username(filename: str, chunk_size: int = __USERNAME_SCAN_CHUNK_SIZE) -> str:
+    """
+    Extracts only the username from a standard account.html file. The leading basic information table is
+    streamed by a TableRowReader and reading stops at its username row, so this is much cheaper than
+    parse_basic_user_info for large account files and needs no document tree.
+
+    :param filename: the path to the html file containing the account data
+    :param chunk_size: the number of characters to read at a time while looking for the username row
+    :return: the account's username
+    """
+
+    rows = TableRowReader(
+        filename,
+        chunk_size,
+        (TableElements.TABLE_HEADER.value, TableElements.TABLE_DATA_CELL.value),
+    )
+
+    for row_index, row in enumerate(rows):
+        if row.table_index != AccountTableIndicie.BASIC_INFORMATION.value:
+            break
+        if row_index == BasicUserInfoRowIndicie.USERNAME_ROW.value:
+            return row.cells[1].strip()
 
-    return basic_user_info, device_information, device_history, login_history
+    raise ValueError(f"No basic information table found in {filename}")
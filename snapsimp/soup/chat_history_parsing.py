@@ -1,10 +1,25 @@
-from typing import List, Tuple
-from bs4 import BeautifulSoup
+import datetime
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple
 from common.snap_simp_enum import SnapSimpEnum
 from chats.chat import Chat
 from chats.chat_type import ChatType
 from chats.chat_history_table_column_indicie import ChatHistoryTableColumnIndicie
 from soup.table_elements import TableElements
+from soup.parser_backend import ParserBackend
+from soup.mapped_table_row_reader import MappedTableRowReader, scan_table_rows
+from soup.table_row_reader import TableRow, TableRowReader
+from common.time_helpers import format_snapchat_timestamp
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+DEFAULT_PARALLEL_CHUNK_SIZE = 4 * 1024 * 1024
+__TABLE_START_PATTERN = re.compile(rb"<table[\s>]", re.IGNORECASE)
+__ROW_START_PATTERN = re.compile(rb"<tr[\s>]", re.IGNORECASE)
 
 
 class __ChatDirection(SnapSimpEnum):
@@ -19,7 +34,7 @@ class __ChatDirection(SnapSimpEnum):
 
 
 def __parse_chat_history_table(
-    table: BeautifulSoup, chat_direction: __ChatDirection, my_name: str
+    table: "BeautifulSoup", chat_direction: __ChatDirection, my_name: str
 ) -> List[Chat]:
     """
     Parses a chat history table using the provided table. All chats are tagged with the provided direction.
@@ -38,27 +53,18 @@ def __parse_chat_history_table(
     rows = table.find_all(TableElements.TABLE_ROW.value)
 
     for row in rows:
-        columns = row.find_all(TableElements.TABLE_DATA_CELL.value)
+        columns = [
+            column.get_text()
+            for column in row.find_all(TableElements.TABLE_DATA_CELL.value)
+        ]
         len_cols = len(columns)
 
         if not len_cols:
             continue
         elif len_cols == 1:
-            previous_chat_text = columns[0].get_text()
-            previous_chat = chats[-1]
-            if len(previous_chat_text) and previous_chat.type == ChatType.TEXT:
-                previous_chat.text = previous_chat_text.strip()
+            __apply_continuation_row_text(chats[-1], columns[0])
         elif len_cols == 3:
-            (
-                other_account_username,
-                chat_type,
-                timestamp,
-            ) = __extract_standard_chat_row_data(columns)
-            sender = __get_sender(chat_direction, my_name, other_account_username)
-            receiver = __get_receiver(chat_direction, my_name, other_account_username)
-
-            chat = Chat(sender, receiver, chat_type, "", timestamp)
-            chats.append(chat)
+            chats.append(__parse_standard_chat_row(columns, chat_direction, my_name))
         else:
             raise AssertionError(
                 f"Column length not supported, length={len_cols}, columns={columns}"
@@ -67,11 +73,45 @@ def __parse_chat_history_table(
     return chats
 
 
-def __extract_standard_chat_row_data(columns) -> Tuple[str, ChatType, str]:
+def __apply_continuation_row_text(previous_chat: Chat, previous_chat_text: str) -> None:
+    """
+    Applies the text of a single cell continuation row to the chat of the row preceding it.
+    Only text chats receive the content of continuation rows.
+
+    :param previous_chat: the chat parsed from the row preceding the continuation row
+    :param previous_chat_text: the text of the continuation row's single cell
+    """
+    if len(previous_chat_text) and previous_chat.type == ChatType.TEXT:
+        previous_chat.text = previous_chat_text.strip()
+
+
+def __parse_standard_chat_row(
+    columns: List[str], chat_direction: __ChatDirection, my_name: str
+) -> Chat:
+    """
+    Parses a standard three cell chat row into a Chat with empty text.
+
+    :param columns: the text of each of the row's cells
+    :param chat_direction: the direction of the table this row belongs to
+    :param my_name: your snapchat account username
+    :return: the parsed Chat object
+    """
+    (
+        other_account_username,
+        chat_type,
+        timestamp,
+    ) = __extract_standard_chat_row_data(columns)
+    sender = __get_sender(chat_direction, my_name, other_account_username)
+    receiver = __get_receiver(chat_direction, my_name, other_account_username)
+
+    return Chat(sender, receiver, chat_type, "", timestamp)
+
+
+def __extract_standard_chat_row_data(columns: List[str]) -> Tuple[str, ChatType, str]:
     """
     Extracts the sender, chat type, and timestamp of a standard chat row.
 
-    :param columns: the row's columns, expected to be of length 3
+    :param columns: the text of the row's columns, expected to be of length 3
     :return: the sender, chat type, and timestamp
     """
 
@@ -80,16 +120,13 @@ def __extract_standard_chat_row_data(columns) -> Tuple[str, ChatType, str]:
             f"Invalid column length for standard chat row, length={len(columns)}, expected={len(ChatHistoryTableColumnIndicie.values())}"
         )
 
-    other_account_username = columns[
-        ChatHistoryTableColumnIndicie.SENDER.value
-    ].get_text()
+    other_account_username = columns[ChatHistoryTableColumnIndicie.SENDER.value]
     chat_type = (
         ChatType.TEXT
-        if columns[ChatHistoryTableColumnIndicie.TYPE.value].get_text()
-        == ChatType.TEXT.value
+        if columns[ChatHistoryTableColumnIndicie.TYPE.value] == ChatType.TEXT.value
         else ChatType.MEDIA
     )
-    timestamp = columns[ChatHistoryTableColumnIndicie.TIME_STAMP.value].get_text()
+    timestamp = columns[ChatHistoryTableColumnIndicie.TIME_STAMP.value]
 
     return other_account_username, chat_type, timestamp
 
@@ -118,8 +155,126 @@ def __get_receiver(
     return my_name if chat_direction == __ChatDirection.RECEIVED else other_name
 
 
+def __iter_chat_history_with_direction(
+    chat_history_file_name: str,
+    my_name: str,
+    since: Optional[datetime.datetime] = None,
+    mapped: bool = False,
+) -> Iterator[Tuple[__ChatDirection, Chat]]:
+    """
+    Streams the chat history file row by row and yields each completed chat alongside the direction of the
+    table it was found in. A single pending chat is buffered so the text of a following single cell
+    continuation row can be merged into it before it is yielded. The unsaved chat tables are skipped
+    without parsing their rows, matching extract_chat_history.
+
+    :param chat_history_file_name: the path to the local chat_history.html file
+    :param my_name: your snapchat account username
+    :param since: if provided, rows sent before this time and their continuation rows are skipped without building a Chat
+    :param mapped: whether to scan a memory map of the file instead of decoding and parsing it in chunks
+    :return: a generator of direction and Chat tuples in document order
+    """
+
+    directions = __ChatDirection.values()
+    yielded_directions = (__ChatDirection.RECEIVED, __ChatDirection.SENT)
+    reader = (
+        MappedTableRowReader(chat_history_file_name)
+        if mapped
+        else TableRowReader(chat_history_file_name)
+    )
+    since_timestamp = format_snapchat_timestamp(since) if since else None
+
+    pending_direction = None
+    pending_chat = None
+    skipping_chat = False
+
+    for row in reader:
+        if row.table_index < 0:
+            continue
+        if row.table_index >= len(directions):
+            raise AssertionError(
+                f"Error: A table amount not equal to {len(directions)} tables found in {chat_history_file_name}; num tables: {reader.table_count}"
+            )
+
+        chat_direction = directions[row.table_index]
+
+        if pending_chat and chat_direction != pending_direction:
+            yield pending_direction, pending_chat
+            pending_chat = None
+
+        if chat_direction not in yielded_directions:
+            reader.skip_table()
+            continue
+
+        columns = row.cells
+        len_cols = len(columns)
+
+        if not len_cols:
+            continue
+        elif len_cols == 1:
+            if skipping_chat:
+                continue
+            if not pending_chat:
+                raise AssertionError(
+                    f"Continuation row found without a preceding chat, columns={columns}"
+                )
+            __apply_continuation_row_text(pending_chat, columns[0])
+        elif len_cols == 3:
+            if pending_chat:
+                yield pending_direction, pending_chat
+                pending_chat = None
+            skipping_chat = bool(
+                since_timestamp
+                and columns[ChatHistoryTableColumnIndicie.TIME_STAMP.value]
+                < since_timestamp
+            )
+            if skipping_chat:
+                continue
+            pending_direction = chat_direction
+            pending_chat = __parse_standard_chat_row(columns, chat_direction, my_name)
+        else:
+            raise AssertionError(
+                f"Column length not supported, length={len_cols}, columns={columns}"
+            )
+
+    if pending_chat:
+        yield pending_direction, pending_chat
+
+    if reader.table_count != len(directions):
+        raise AssertionError(
+            f"Error: A table amount not equal to {len(directions)} tables found in {chat_history_file_name}; num tables: {reader.table_count}"
+        )
+
+
+def iter_chat_history(
+    chat_history_file_name: str,
+    my_name: str,
+    since: Optional[datetime.datetime] = None,
+    mapped: bool = False,
+) -> Iterator[Chat]:
+    """
+    Streams the chat history from the provided chat history html file with constant memory, yielding
+    the received chats followed by the sent chats as the file is read. Each chat is yielded only once
+    any continuation row holding its text has been merged into it.
+
+    :param chat_history_file_name: the path to the local chat_history.html file
+    :param my_name: your snapchat account username, for me this is nathanvcheshire
+    :param since: if provided, only chats sent at or after this time are yielded
+    :param mapped: whether to scan a memory map of the file, decoding only the table cells, instead of parsing it in chunks
+    :return: a generator of Chat objects
+    """
+
+    for _, chat in __iter_chat_history_with_direction(
+        chat_history_file_name, my_name, since, mapped
+    ):
+        yield chat
+
+
 def extract_chat_history(
-    chat_history_file_name: str, my_name: str
+    chat_history_file_name: str,
+    my_name: str,
+    streaming: bool = False,
+    mapped: bool = False,
+    backend: Optional[ParserBackend] = None,
 ) -> Tuple[List[Chat], List[Chat]]:
     """
     Extracts the chat history, both sent and received chats, from the provided chat history html file.
@@ -128,11 +283,38 @@ def extract_chat_history(
 
     :param chat_history_file_name: the path to the local chat_history.html file
     :param my_name: your snapchat account username, for me this is nathanvcheshire
+    :param streaming: whether to stream the file row by row instead of building a full BeautifulSoup tree
+    :param mapped: whether to scan a memory map of the file, decoding only the table cells, instead of building a full BeautifulSoup tree
+    :param backend: the parser backend to use, overriding streaming and mapped, html.parser by default
     :returns: two lists of chat objects, the first is the received chats, the second is the sent chats
     """
 
+    if backend is None:
+        backend = (
+            ParserBackend.MAPPED
+            if mapped
+            else ParserBackend.STREAMING
+            if streaming
+            else ParserBackend.HTML_PARSER
+        )
+
+    if not backend.is_tree_builder():
+        received_chats, sent_chats = [], []
+
+        for chat_direction, chat in __iter_chat_history_with_direction(
+            chat_history_file_name, my_name, mapped=backend == ParserBackend.MAPPED
+        ):
+            if chat_direction == __ChatDirection.RECEIVED:
+                received_chats.append(chat)
+            else:
+                sent_chats.append(chat)
+
+        return received_chats, sent_chats
+
+    from bs4 import BeautifulSoup
+
     with open(chat_history_file_name, "r") as file:
-        soup = BeautifulSoup(file.read(), "html.parser")
+        soup = BeautifulSoup(file.read(), backend.get_tree_builder())
 
     tables = soup.find_all(TableElements.TABLE.value)
 
@@ -149,3 +331,167 @@ def extract_chat_history(
     )
 
     return received_chats, sent_chats
+
+
+def __find_chat_history_chunks(
+    chat_history_file_name: str, chunk_size: int
+) -> List[Tuple[__ChatDirection, int, int]]:
+    """
+    Splits the received and sent chat tables of a chat history file into byte ranges of roughly the provided size.
+    Every range lies within a single table and every range but the first of a table starts at a <tr> tag.
+
+    :param chat_history_file_name: the path to the local chat_history.html file
+    :param chunk_size: the approximate number of bytes of each range
+    :return: the direction, start offset, and end offset of each range in document order
+    """
+
+    directions = __ChatDirection.values()
+
+    with open(chat_history_file_name, "rb") as file:
+        if not os.fstat(file.fileno()).st_size:
+            raise AssertionError(
+                f"Error: A table amount not equal to {len(directions)} tables found in {chat_history_file_name}; num tables: 0"
+            )
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as contents:
+            table_starts = [
+                match.start() for match in __TABLE_START_PATTERN.finditer(contents)
+            ]
+            if len(table_starts) != len(directions):
+                raise AssertionError(
+                    f"Error: A table amount not equal to {len(directions)} tables found in {chat_history_file_name}; num tables: {len(table_starts)}"
+                )
+            table_ends = table_starts[1:] + [len(contents)]
+
+            chunks = []
+            for chat_direction in (__ChatDirection.RECEIVED, __ChatDirection.SENT):
+                chunk_start = table_starts[chat_direction.table_index]
+                table_end = table_ends[chat_direction.table_index]
+
+                while chunk_start + chunk_size < table_end:
+                    row_start = __ROW_START_PATTERN.search(
+                        contents, chunk_start + chunk_size, table_end
+                    )
+                    if not row_start:
+                        break
+                    chunks.append((chat_direction, chunk_start, row_start.start()))
+                    chunk_start = row_start.start()
+
+                chunks.append((chat_direction, chunk_start, table_end))
+
+    return chunks
+
+
+def __parse_chat_rows(
+    rows: List[TableRow], chat_direction: __ChatDirection, my_name: str
+) -> Tuple[List[str], List[Chat]]:
+    """
+    Parses a range of consecutive rows of a single chat table. Continuation rows found before the first chat of
+    the range belong to the last chat of the preceding range, so their text is returned rather than applied.
+
+    :param rows: the rows of the range
+    :param chat_direction: the direction of the table the rows belong to
+    :param my_name: your snapchat account username
+    :return: the text of the leading continuation rows and the parsed chats
+    """
+
+    leading_continuation_texts = []
+    chats = []
+
+    for row in rows:
+        columns = row.cells
+        len_cols = len(columns)
+
+        if not len_cols:
+            continue
+        elif len_cols == 1:
+            if chats:
+                __apply_continuation_row_text(chats[-1], columns[0])
+            else:
+                leading_continuation_texts.append(columns[0])
+        elif len_cols == 3:
+            chats.append(__parse_standard_chat_row(columns, chat_direction, my_name))
+        else:
+            raise AssertionError(
+                f"Column length not supported, length={len_cols}, columns={columns}"
+            )
+
+    return leading_continuation_texts, chats
+
+
+def __parse_chat_history_chunk(
+    chat_history_file_name: str,
+    start: int,
+    end: int,
+    table_index: int,
+    my_name: str,
+) -> Tuple[List[str], List[Chat]]:
+    """
+    Scans and parses a single byte range of a memory map of a chat history file, run in a worker process.
+
+    :return: the text of the leading continuation rows and the parsed chats of the range
+    """
+
+    with open(chat_history_file_name, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as contents:
+            rows = [
+                TableRow(table_index, cells)
+                for cells in scan_table_rows(contents, start, end)
+            ]
+
+    return __parse_chat_rows(rows, __ChatDirection.values()[table_index], my_name)
+
+
+def extract_chat_history_in_parallel(
+    chat_history_file_name: str,
+    my_name: str,
+    max_workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_PARALLEL_CHUNK_SIZE,
+) -> Tuple[List[Chat], List[Chat]]:
+    """
+    Extracts the chat history like extract_chat_history but parses the file across a process pool. The received
+    and sent chat tables are split into byte ranges at <tr> boundaries, each range of a memory map of the file is
+    scanned in a worker, and the results are stitched back together in document order. Continuation rows at the
+    start of a range are applied to the last chat of the previous range of the same table.
+
+    :param chat_history_file_name: the path to the local chat_history.html file
+    :param my_name: your snapchat account username, for me this is nathanvcheshire
+    :param max_workers: the number of worker processes, one per core by default
+    :param chunk_size: the approximate number of bytes parsed by each task
+    :returns: two lists of chat objects, the first is the received chats, the second is the sent chats
+    """
+
+    chunks = __find_chat_history_chunks(chat_history_file_name, chunk_size)
+    chats_by_direction = {
+        __ChatDirection.RECEIVED: [],
+        __ChatDirection.SENT: [],
+    }
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        chunk_results = executor.map(
+            __parse_chat_history_chunk,
+            [chat_history_file_name] * len(chunks),
+            [start for _, start, _ in chunks],
+            [end for _, _, end in chunks],
+            [chat_direction.table_index for chat_direction, _, _ in chunks],
+            [my_name] * len(chunks),
+        )
+
+        for (chat_direction, _, _), (leading_continuation_texts, chats) in zip(
+            chunks, chunk_results
+        ):
+            direction_chats = chats_by_direction[chat_direction]
+
+            for continuation_text in leading_continuation_texts:
+                if not direction_chats:
+                    raise AssertionError(
+                        f"Continuation row found without a preceding chat, columns={[continuation_text]}"
+                    )
+                __apply_continuation_row_text(direction_chats[-1], continuation_text)
+
+            direction_chats.extend(chats)
+
+    return (
+        chats_by_direction[__ChatDirection.RECEIVED],
+        chats_by_direction[__ChatDirection.SENT],
+    )
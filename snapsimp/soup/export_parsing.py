@@ -0,0 +1,200 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from common.parse_cache import CACHE_MISS, ParseCache, get_or_parse
+from soup.account_parsing import parse_all, scan_username
+from soup.parser_backend import ParserBackend
+from soup.chat_history_parsing import (
+    extract_chat_history,
+    extract_chat_history_in_parallel,
+)
+from soup.snap_history_parsing import extract_snap_history
+
+USERNAME_SCAN_STAGE = "username scan"
+ACCOUNT_STAGE = "account"
+SNAP_HISTORY_STAGE = "snap history"
+CHAT_HISTORY_STAGE = "chat history"
+TOTAL_STAGE = "total"
+
+
+class ParsedExport:
+    """
+    The parsed contents of the account, snap history, and chat history files of a single Snapchat export,
+    along with the wall clock seconds spent in each parsing stage.
+    """
+
+    def __init__(
+        self,
+        account: Tuple,
+        snap_history: Tuple,
+        chat_history: Tuple,
+        stage_timings: Dict[str, float],
+    ):
+        (
+            self.basic_user_info,
+            self.device_information,
+            self.device_history,
+            self.login_history,
+        ) = account
+        self.received_snaps, self.sent_snaps = snap_history
+        self.received_chats, self.sent_chats = chat_history
+        self.stage_timings = stage_timings
+
+    def format_stage_timings(self) -> str:
+        """
+        :return: the stage timings as a single human readable line
+        """
+        return ", ".join(
+            f"{stage} {seconds:.2f}s" for stage, seconds in self.stage_timings.items()
+        )
+
+    def __repr__(self):
+        return (
+            f"ParsedExport(username={self.basic_user_info.username}, num_received_snaps={len(self.received_snaps)}, "
+            f"num_sent_snaps={len(self.sent_snaps)}, num_received_chats={len(self.received_chats)}, "
+            f"num_sent_chats={len(self.sent_chats)})"
+        )
+
+
+def __timed_parse(
+    cache: Optional[ParseCache],
+    file_path: str,
+    parse_function: Callable,
+    *args,
+    **kwargs,
+) -> Tuple[Any, float]:
+    """
+    Parses the provided file, through the cache if provided, and measures how long it took.
+
+    :return: the parsed result and the elapsed seconds
+    """
+    start_time = time.perf_counter()
+    result = get_or_parse(cache, file_path, parse_function, *args, **kwargs)
+    return result, time.perf_counter() - start_time
+
+
+def __timed_get(
+    cache: Optional[ParseCache],
+    file_path: str,
+    parse_function: Callable,
+    *args,
+    **kwargs,
+) -> Tuple[Any, float]:
+    """
+    Looks the provided file up in the cache, if provided, and measures how long it took.
+
+    :return: the cached result or CACHE_MISS, and the elapsed seconds
+    """
+    if cache is None:
+        return CACHE_MISS, 0.0
+
+    start_time = time.perf_counter()
+    result = cache.get(file_path, parse_function, *args, **kwargs)
+    return result, time.perf_counter() - start_time
+
+
+def parse_export_concurrently(
+    account_file: str,
+    snap_history_file: str,
+    chat_history_file: str,
+    cache: Optional[ParseCache] = None,
+    chat_workers: Optional[int] = None,
+    backend: ParserBackend = ParserBackend.AUTO,
+) -> ParsedExport:
+    """
+    Parses the three files of a Snapchat export concurrently. Cached files are loaded in this process first,
+    and the username needed by the snap and chat history parsers is read from the cached account or otherwise
+    extracted by a cheap scan of the account file's basic information table. The remaining files are each
+    parsed in their own process as parsing is CPU bound, or in this process when only one remains, and no
+    process is started when every file is cached. Results are merged in this process.
+
+    :param account_file: the path to the account.html file
+    :param snap_history_file: the path to the snap_history.html file
+    :param chat_history_file: the path to the chat_history.html file
+    :param cache: an optional cache of previously parsed files
+    :param chat_workers: if provided, the chat history is itself split across this many processes, always scanning a memory map
+    :param backend: the parser backend used for each file
+    :return: the parsed export
+    """
+
+    start_time = time.perf_counter()
+    stage_timings = {}
+    results = {}
+
+    account_parse = (account_file, parse_all)
+    account_kwargs = {"backend": backend}
+    results[ACCOUNT_STAGE], stage_timings[ACCOUNT_STAGE] = __timed_get(
+        cache, *account_parse, **account_kwargs
+    )
+
+    if results[ACCOUNT_STAGE] is CACHE_MISS:
+        scan_start_time = time.perf_counter()
+        my_name = scan_username(account_file)
+        stage_timings[USERNAME_SCAN_STAGE] = time.perf_counter() - scan_start_time
+    else:
+        my_name = results[ACCOUNT_STAGE][0].username
+
+    # Each stage's file, parse function, and arguments, which together form its cache key
+    parses = {
+        ACCOUNT_STAGE: (account_parse, account_kwargs),
+        SNAP_HISTORY_STAGE: (
+            (snap_history_file, extract_snap_history, my_name),
+            {"backend": backend},
+        ),
+        CHAT_HISTORY_STAGE: (
+            (
+                chat_history_file,
+                extract_chat_history_in_parallel
+                if chat_workers
+                else extract_chat_history,
+                my_name,
+            ),
+            # The worker count is one of the cache's unkeyed arguments so any count reuses the same entry
+            {"max_workers": chat_workers} if chat_workers else {"backend": backend},
+        ),
+    }
+
+    for stage in (SNAP_HISTORY_STAGE, CHAT_HISTORY_STAGE):
+        parse_args, parse_kwargs = parses[stage]
+        results[stage], stage_timings[stage] = __timed_get(
+            cache, *parse_args, **parse_kwargs
+        )
+
+    missed_stages = [stage for stage in parses if results[stage] is CACHE_MISS]
+
+    if len(missed_stages) == 1:
+        stage = missed_stages[0]
+        parse_args, parse_kwargs = parses[stage]
+        results[stage], elapsed = __timed_parse(cache, *parse_args, **parse_kwargs)
+        stage_timings[stage] += elapsed
+    elif missed_stages:
+        if cache is not None:
+            # Hash every missed file up front so worker processes share the remembered digests rather than
+            # each rewriting the cache's fingerprints file
+            for stage in missed_stages:
+                cache.get_file_digest(parses[stage][0][0])
+
+        with ProcessPoolExecutor(max_workers=len(missed_stages)) as executor:
+            futures = {
+                stage: executor.submit(
+                    __timed_parse, cache, *parses[stage][0], **parses[stage][1]
+                )
+                for stage in missed_stages
+            }
+
+            for stage, future in futures.items():
+                results[stage], elapsed = future.result()
+                stage_timings[stage] += elapsed
+
+    stage_timings[TOTAL_STAGE] = time.perf_counter() - start_time
+
+    account = results[ACCOUNT_STAGE]
+    if account[0].username != my_name:
+        raise AssertionError(
+            f"Scanned username does not match the parsed username, scanned={my_name}, parsed={account[0].username}"
+        )
+
+    return ParsedExport(
+        account, results[SNAP_HISTORY_STAGE], results[CHAT_HISTORY_STAGE], stage_timings
+    )
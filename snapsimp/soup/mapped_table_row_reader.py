@@ -0,0 +1,106 @@
+import html
+import mmap
+import os
+import re
+from typing import Iterator, List, Optional
+from soup.table_row_reader import TableRow
+
+_TABLE_START_PATTERN = re.compile(rb"<table[\s>]", re.IGNORECASE)
+_ROW_PATTERN = re.compile(rb"<tr[\s>].*?</tr\s*>", re.IGNORECASE | re.DOTALL)
+_CELL_PATTERN = re.compile(rb"<td(?:\s[^>]*)?>(.*?)</td\s*>", re.IGNORECASE | re.DOTALL)
+_TAG_PATTERN = re.compile(r"<[^>]*>")
+
+
+def decode_cell(raw_cell: bytes) -> str:
+    """
+    Decodes the raw bytes between a cell's opening and closing tags into its text content, equivalent to
+    BeautifulSoup's get_text(). Nested tags are removed and character references are unescaped.
+
+    :param raw_cell: the raw bytes of the cell's content
+    :return: the text content of the cell
+    """
+    text = raw_cell.decode("utf-8")
+
+    if "<" in text:
+        text = _TAG_PATTERN.sub("", text)
+    if "&" in text:
+        text = html.unescape(text)
+
+    return text
+
+
+def scan_table_rows(
+    contents, start: int = 0, end: Optional[int] = None
+) -> Iterator[List[str]]:
+    """
+    Scans the rows within a byte range of an HTML document, such as a memory map of it.
+
+    :param contents: the bytes like contents of the document
+    :param start: the offset to start scanning from, which must not be inside of a row
+    :param end: the offset to stop scanning at, the end of the contents by default
+    :return: a generator of the decoded cells of each row in document order
+    """
+    end = len(contents) if end is None else end
+
+    for row in _ROW_PATTERN.finditer(contents, start, end):
+        yield [
+            decode_cell(cell.group(1))
+            for cell in _CELL_PATTERN.finditer(contents, row.start(), row.end())
+        ]
+
+
+class MappedTableRowReader:
+    """
+    Reads the table rows of an HTML file by scanning a read only memory map of it for table, row, and data cell
+    tags at the byte level. The file is never decoded as a whole; only the content of each data cell is decoded,
+    so memory use stays flat regardless of the file's size and the tags and markup between cells cost no decoding.
+
+    Unlike TableRowReader this expects well formed rows and cells, each closed by a matching end tag, as found
+    in Snapchat exports. The rest of a table may be skipped with skip_table.
+    """
+
+    def __init__(self, file_name: str):
+        """
+        Creates a new MappedTableRowReader.
+
+        :param file_name: the path to the HTML file to scan
+        """
+        self.file_name = file_name
+        self.table_count = 0
+        self.__skipping_table = False
+
+    def skip_table(self) -> None:
+        """
+        Skips the remaining rows of the table of the row last yielded. Scanning resumes at the next table's
+        start tag so the skipped rows are never matched or decoded.
+        """
+        self.__skipping_table = True
+
+    def __iter__(self) -> Iterator[TableRow]:
+        with open(self.file_name, "rb") as file:
+            if not os.fstat(file.fileno()).st_size:
+                return
+
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as contents:
+                table_starts = [
+                    match.start() for match in _TABLE_START_PATTERN.finditer(contents)
+                ]
+                self.table_count = len(table_starts)
+
+                # Rows before the first table belong to table -1
+                for table_index, (start, end) in enumerate(
+                    zip([0] + table_starts, table_starts + [len(contents)]), -1
+                ):
+                    self.__skipping_table = False
+
+                    for row in _ROW_PATTERN.finditer(contents, start, end):
+                        cells = [
+                            decode_cell(cell.group(1))
+                            for cell in _CELL_PATTERN.finditer(
+                                contents, row.start(), row.end()
+                            )
+                        ]
+                        yield TableRow(table_index, cells)
+
+                        if self.__skipping_table:
+                            break
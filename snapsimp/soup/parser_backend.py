@@ -0,0 +1,63 @@
+from importlib.util import find_spec
+
+from common.snap_simp_enum import SnapSimpEnum
+
+HTML_PARSER_TREE_BUILDER = "html.parser"
+LXML_TREE_BUILDER = "lxml"
+
+
+class ParserBackend(SnapSimpEnum):
+    """
+    The ways an export HTML file may be parsed.
+
+    - AUTO: the fastest available BeautifulSoup tree builder, lxml if installed and html.parser otherwise
+    - HTML_PARSER: a BeautifulSoup tree built by the standard library's html.parser
+    - LXML: a BeautifulSoup tree built by lxml, which must be installed
+    - STREAMING: an incremental standard library parser feeding table rows as the file is read
+    - MAPPED: a byte level scanner over a memory map of the file, decoding only the table cells
+
+    STREAMING and MAPPED only read table rows so documents needing a tree, such as account.html,
+    fall back to the AUTO tree builder.
+    """
+
+    AUTO = "auto"
+    HTML_PARSER = "html.parser"
+    LXML = "lxml"
+    STREAMING = "streaming"
+    MAPPED = "mapped"
+
+    def is_available(self) -> bool:
+        """
+        :return: whether the libraries this backend depends on are installed
+        """
+        return self != ParserBackend.LXML or is_lxml_available()
+
+    def is_tree_builder(self) -> bool:
+        """
+        :return: whether this backend builds a full BeautifulSoup tree
+        """
+        return self not in (ParserBackend.STREAMING, ParserBackend.MAPPED)
+
+    def get_tree_builder(self) -> str:
+        """
+        Returns the BeautifulSoup tree builder to use with this backend when a full tree is needed.
+
+        :return: the tree builder feature name such as 'html.parser'
+        """
+        if self == ParserBackend.HTML_PARSER:
+            return HTML_PARSER_TREE_BUILDER
+        if self == ParserBackend.LXML:
+            if not is_lxml_available():
+                raise ValueError(
+                    "The lxml parser backend was requested but lxml is not installed"
+                )
+            return LXML_TREE_BUILDER
+
+        return LXML_TREE_BUILDER if is_lxml_available() else HTML_PARSER_TREE_BUILDER
+
+
+def is_lxml_available() -> bool:
+    """
+    :return: whether lxml is installed, without importing it
+    """
+    return find_spec("lxml") is not None
@@ -1,10 +1,17 @@
-from typing import List, Tuple
-from bs4 import BeautifulSoup
+import datetime
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple
 from snaps.snap import Snap
 from snaps.snap_history_table_column_indicie import SnapHistoryTableColumnIndicie
 from common.snap_simp_enum import SnapSimpEnum
 from soup.table_elements import TableElements
+from soup.parser_backend import ParserBackend
+from soup.mapped_table_row_reader import MappedTableRowReader
+from soup.table_row_reader import TableRowReader
 from snaps.snap_type import SnapType
+from common.time_helpers import format_snapchat_timestamp
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 
 class __SnapDirection(SnapSimpEnum):
@@ -17,7 +24,7 @@ class __SnapDirection(SnapSimpEnum):
 
 
 def __parse_snap_history_table(
-    table: BeautifulSoup, snap_direction: __SnapDirection, my_name: str
+    table: "BeautifulSoup", snap_direction: __SnapDirection, my_name: str
 ) -> List[Snap]:
     """
     Parses a snap history table using the provided table. All snaps are tagged with the provided direction.
@@ -36,28 +43,45 @@ def __parse_snap_history_table(
     rows = table.find_all(TableElements.TABLE_ROW.value)
 
     for row in rows:
-        columns = row.find_all(TableElements.TABLE_DATA_CELL.value)
+        columns = [
+            column.get_text()
+            for column in row.find_all(TableElements.TABLE_DATA_CELL.value)
+        ]
+        snap = __parse_snap_row(columns, snap_direction, my_name)
 
-        if len(columns) != len(SnapHistoryTableColumnIndicie.values()):
-            continue
+        if snap:
+            snaps.append(snap)
 
-        other_account_username = columns[
-            SnapHistoryTableColumnIndicie.SENDER.value
-        ].get_text()
-        snap_type = (
-            SnapType.IMAGE
-            if columns[SnapHistoryTableColumnIndicie.TYPE.value].get_text()
-            == SnapType.IMAGE.value
-            else SnapType.VIDEO
-        )
-        timestamp = columns[SnapHistoryTableColumnIndicie.TIME_STAMP.value].get_text()
+    return snaps
 
-        sender = __get_sender(snap_direction, my_name, other_account_username)
-        receiver = __get_receiver(snap_direction, my_name, other_account_username)
 
-        snaps.append(Snap(sender, receiver, snap_type, timestamp))
+def __parse_snap_row(
+    columns: List[str], snap_direction: __SnapDirection, my_name: str
+) -> Optional[Snap]:
+    """
+    Parses a single snap history table row from the text of its data cells.
 
-    return snaps
+    :param columns: the text of each data cell of the row
+    :param snap_direction: the direction of the table this row belongs to
+    :param my_name: your snapchat account username
+    :return: the parsed Snap or None if the row is not a snap row, such as the header row
+    """
+
+    if len(columns) != len(SnapHistoryTableColumnIndicie.values()):
+        return None
+
+    other_account_username = columns[SnapHistoryTableColumnIndicie.SENDER.value]
+    snap_type = (
+        SnapType.IMAGE
+        if columns[SnapHistoryTableColumnIndicie.TYPE.value] == SnapType.IMAGE.value
+        else SnapType.VIDEO
+    )
+    timestamp = columns[SnapHistoryTableColumnIndicie.TIME_STAMP.value]
+
+    sender = __get_sender(snap_direction, my_name, other_account_username)
+    receiver = __get_receiver(snap_direction, my_name, other_account_username)
+
+    return Snap(sender, receiver, snap_type, timestamp)
 
 
 def __get_sender(snap_direction: __SnapDirection, my_name: str, other_name: str) -> str:
@@ -84,8 +108,90 @@ def __get_receiver(
     return my_name if snap_direction == __SnapDirection.RECEIVED else other_name
 
 
+def __iter_snap_history_with_direction(
+    snap_history_file_name: str,
+    my_name: str,
+    since: Optional[datetime.datetime] = None,
+    mapped: bool = False,
+) -> Iterator[Tuple[__SnapDirection, Snap]]:
+    """
+    Streams the snap history file row by row, never building a full document tree,
+    and yields each parsed snap alongside the direction of the table it was found in.
+
+    :param snap_history_file_name: the path to the local snap_history.html file
+    :param my_name: your snapchat account username
+    :param since: if provided, rows sent before this time are skipped without building a Snap
+    :param mapped: whether to scan a memory map of the file instead of decoding and parsing it in chunks
+    :return: a generator of direction and Snap tuples in document order
+    """
+
+    directions = __SnapDirection.values()
+    reader = (
+        MappedTableRowReader(snap_history_file_name)
+        if mapped
+        else TableRowReader(snap_history_file_name)
+    )
+    num_columns = len(SnapHistoryTableColumnIndicie.values())
+    since_timestamp = format_snapchat_timestamp(since) if since else None
+
+    for row in reader:
+        if row.table_index < 0:
+            continue
+        if row.table_index >= len(directions):
+            raise AssertionError(
+                f"Error: A table amount not equal to {len(directions)} tables found in {snap_history_file_name}; num tables: {reader.table_count}"
+            )
+
+        if (
+            since_timestamp
+            and len(row.cells) == num_columns
+            and row.cells[SnapHistoryTableColumnIndicie.TIME_STAMP.value]
+            < since_timestamp
+        ):
+            continue
+
+        snap_direction = directions[row.table_index]
+        snap = __parse_snap_row(row.cells, snap_direction, my_name)
+
+        if snap:
+            yield snap_direction, snap
+
+    if reader.table_count != len(directions):
+        raise AssertionError(
+            f"Error: A table amount not equal to {len(directions)} tables found in {snap_history_file_name}; num tables: {reader.table_count}"
+        )
+
+
+def iter_snap_history(
+    snap_history_file_name: str,
+    my_name: str,
+    since: Optional[datetime.datetime] = None,
+    mapped: bool = False,
+) -> Iterator[Snap]:
+    """
+    Streams the snap history from the provided snap history html file, yielding snaps table by table
+    as the file is read. The received snaps are yielded first followed by the sent snaps. Memory use
+    is bounded by the rows of a single read chunk rather than the size of the file.
+
+    :param snap_history_file_name: the path to the local snap_history.html file
+    :param my_name: your snapchat account username, for me this is nathanvcheshire
+    :param since: if provided, only snaps sent at or after this time are yielded
+    :param mapped: whether to scan a memory map of the file, decoding only the table cells, instead of parsing it in chunks
+    :return: a generator of Snap objects
+    """
+
+    for _, snap in __iter_snap_history_with_direction(
+        snap_history_file_name, my_name, since, mapped
+    ):
+        yield snap
+
+
 def extract_snap_history(
-    snap_history_file_name: str, my_name: str
+    snap_history_file_name: str,
+    my_name: str,
+    streaming: bool = False,
+    mapped: bool = False,
+    backend: Optional[ParserBackend] = None,
 ) -> Tuple[List[Snap], List[Snap]]:
     """
     Extracts the snap history, both sent and received snaps, from the provided snap history html file.
@@ -94,11 +200,38 @@ def extract_snap_history(
 
     :param snap_history_file_name: the path to the local snap_history.html file
     :param my_name: your snapchat account username, for me this is nathanvcheshire
+    :param streaming: whether to stream the file row by row instead of building a full BeautifulSoup tree
+    :param mapped: whether to scan a memory map of the file, decoding only the table cells, instead of building a full BeautifulSoup tree
+    :param backend: the parser backend to use, overriding streaming and mapped, html.parser by default
     :returns: two lists of snap objects, the first is the received snaps, the second is the sent snaps
     """
 
+    if backend is None:
+        backend = (
+            ParserBackend.MAPPED
+            if mapped
+            else ParserBackend.STREAMING
+            if streaming
+            else ParserBackend.HTML_PARSER
+        )
+
+    if not backend.is_tree_builder():
+        received_snaps, sent_snaps = [], []
+
+        for snap_direction, snap in __iter_snap_history_with_direction(
+            snap_history_file_name, my_name, mapped=backend == ParserBackend.MAPPED
+        ):
+            if snap_direction == __SnapDirection.RECEIVED:
+                received_snaps.append(snap)
+            else:
+                sent_snaps.append(snap)
+
+        return received_snaps, sent_snaps
+
+    from bs4 import BeautifulSoup
+
     with open(snap_history_file_name, "r") as file:
-        soup = BeautifulSoup(file.read(), "html.parser")
+        soup = BeautifulSoup(file.read(), backend.get_tree_builder())
 
     tables = soup.find_all(TableElements.TABLE.value)
 
@@ -0,0 +1,159 @@
+import re
+from html.parser import HTMLParser
+from typing import Iterator, List, NamedTuple, Tuple
+from soup.table_elements import TableElements
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_CELL_TAGS = (TableElements.TABLE_DATA_CELL.value,)
+
+_TABLE_START_PATTERN = re.compile(r"<table[\s>]", re.IGNORECASE)
+# The characters kept from the end of a chunk while searching for a table's start tag, so a tag split across
+# two chunks is still found
+_TABLE_START_OVERLAP = len("<table ") - 1
+
+
+class TableRow(NamedTuple):
+    """
+    A single <tr> row of an HTML document as emitted by a TableRowReader.
+
+    - table_index: the zero based index of the <table> this row belongs to
+    - cells: the text content of each cell of the row, <td> cells by default, equivalent to BeautifulSoup's get_text()
+    """
+
+    table_index: int
+    cells: List[str]
+
+
+class _TableRowParser(HTMLParser):
+    """
+    An incremental HTML parser which only tracks tables, rows, and cells. Completed rows are
+    buffered until drained so memory use is bounded by the rows contained in a single fed chunk.
+    """
+
+    def __init__(self, cell_tags: Tuple[str, ...] = DEFAULT_CELL_TAGS):
+        super().__init__(convert_charrefs=True)
+        self.cell_tags = cell_tags
+        self.table_count = 0
+        self.completed_rows = []
+        self.current_cells = None
+        self.current_cell_text = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == TableElements.TABLE.value:
+            self.table_count += 1
+        elif tag == TableElements.TABLE_ROW.value:
+            self.current_cells = []
+        elif tag in self.cell_tags:
+            self.__close_cell()
+            self.current_cell_text = []
+
+    def handle_endtag(self, tag):
+        if tag in self.cell_tags:
+            self.__close_cell()
+        elif tag == TableElements.TABLE_ROW.value:
+            self.__close_cell()
+            if self.current_cells is not None:
+                self.completed_rows.append(
+                    TableRow(self.table_count - 1, self.current_cells)
+                )
+            self.current_cells = None
+
+    def handle_data(self, data):
+        if self.current_cell_text is not None:
+            self.current_cell_text.append(data)
+
+    def __close_cell(self):
+        if self.current_cell_text is None:
+            return
+        if self.current_cells is not None:
+            self.current_cells.append("".join(self.current_cell_text))
+        self.current_cell_text = None
+
+    def drain(self) -> List[TableRow]:
+        rows = self.completed_rows
+        self.completed_rows = []
+        return rows
+
+
+class TableRowReader:
+    """
+    Streams the table rows of an HTML file without building a document tree. The file is read and fed
+    to an incremental parser in chunks and rows are yielded as soon as their closing tag is seen. The rest
+    of a table may be skipped with skip_table.
+    """
+
+    def __init__(
+        self,
+        file_name: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        cell_tags: Tuple[str, ...] = DEFAULT_CELL_TAGS,
+    ):
+        """
+        Creates a new TableRowReader.
+
+        :param file_name: the path to the HTML file to stream
+        :param chunk_size: the number of characters to read and feed to the parser at a time
+        :param cell_tags: the tags whose text is read as the cells of a row, such as ('td',) or ('th', 'td')
+        """
+        self.file_name = file_name
+        self.chunk_size = chunk_size
+        self.cell_tags = cell_tags
+        self.table_count = 0
+        self.__current_table = None
+        self.__skipped_table = None
+
+    def skip_table(self) -> None:
+        """
+        Skips the remaining rows of the table of the row last yielded. The file is searched for the start tag
+        of the next table without feeding the skipped rows to the parser.
+        """
+        self.__skipped_table = self.__current_table
+
+    def __skip_to_next_table(self, file, unparsed: str) -> str:
+        """
+        Reads the file until the start tag of the next table.
+
+        :param unparsed: the input the parser was fed but has not consumed yet, such as the start of a tag cut off
+        by the end of a chunk, which is searched before reading further
+        :return: the text from the next table's start tag to the end of the last read chunk or '' at the end of the file
+        """
+        text = unparsed
+
+        while True:
+            match = _TABLE_START_PATTERN.search(text)
+            if match:
+                return text[match.start() :]
+
+            chunk = file.read(self.chunk_size)
+            if not chunk:
+                return ""
+            text = text[-_TABLE_START_OVERLAP:] + chunk
+
+    def __iter__(self) -> Iterator[TableRow]:
+        parser = _TableRowParser(self.cell_tags)
+
+        with open(self.file_name, "r") as file:
+            while chunk := file.read(self.chunk_size):
+                while chunk:
+                    parser.feed(chunk)
+                    self.table_count = parser.table_count
+                    chunk = ""
+
+                    for row in parser.drain():
+                        if row.table_index != self.__skipped_table:
+                            self.__current_table = row.table_index
+                            yield row
+
+                    if self.__skipped_table == parser.table_count - 1:
+                        # The parser is still within the skipped table so its unparsed input is dropped
+                        # and a fresh parser resumes from the next table's start tag
+                        chunk = self.__skip_to_next_table(file, parser.rawdata)
+                        parser = _TableRowParser(self.cell_tags)
+                        parser.table_count = self.table_count
+
+        parser.close()
+        self.table_count = parser.table_count
+        for row in parser.drain():
+            if row.table_index != self.__skipped_table:
+                self.__current_table = row.table_index
+                yield row